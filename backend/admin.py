@@ -1,169 +1,143 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from backend.auth import verify_jwt_token
-from backend.contract import contract, dao_contract, contract_files, get_contract_from_chain
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from backend.auth import verify_admin
+from backend.contract import dao_contract
+from backend.file_registry import contract_files
+from backend.contract import async_dao_contract, tx_submitter, tx_tracker, view_cache, receipt_cache, rpc_pool
+import asyncio
+from backend.indexer import load_trades, load_vote_matrix, has_dao_votes, iter_trade_pages, ndjson_trades_response
+from backend.indexer import resolve_cursor, next_cursor, chain_index
 import logging
 import traceback
-from typing import List
-from web3 import Web3
-from backend.contract import ACCOUNT_ADDRESS, PRIVATE_KEY, w3
-import os
+from typing import List, Optional
+from web3.exceptions import ContractLogicError
 
 admin_router = APIRouter()
 
-ADMIN_ADDRESSES = {
-    "0x7315C7AD21E501faBFc86f3D546a8898be6D39b6".lower(),
-    "0x08ae1529BeBF0eDe319A2A6bd546D1Cd3bD428BD".lower(),
-}
-
 @admin_router.get("/check-admin")
-def check_admin(user_address: str = Depends(verify_jwt_token)):
-    if user_address.lower() in ADMIN_ADDRESSES:
-        return {"is_admin": True}
-    else:
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-    
-def is_admin(address: str) -> bool:
-    return address.lower() in ADMIN_ADDRESSES
+def check_admin(user_address: str = Depends(verify_admin)):
+    return {"is_admin": True}
+
+async def _cursor_to_trade_id(cursor: Optional[str]) -> Optional[str]:
+    try:
+        return await resolve_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
 
 @admin_router.get("/dao-votes/all")
-def get_all_dao_votes(user_address: str = Depends(verify_jwt_token)):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-
-    all_votes = []
-    all_trade_ids = contract.functions.getAllTradeIds().call()
-
-    for trade_id in all_trade_ids:
-        try:
-            party_a, party_b = contract.functions.getVoters(trade_id).call()
-            vote_status = contract.functions.getVoteStatus(trade_id).call()
-            voted_a, voted_b, approved_a, approved_b, finalized = vote_status
-
-            dao_vote = dao_contract.functions.getVoteResult(trade_id).call()
-            processed = dao_vote[2]
-
-            if finalized:
-                data = get_contract_from_chain(trade_id)
-                data.update({
-                    "trade_id": trade_id,
-                    "approvedA": approved_a,
-                    "approvedB": approved_b,
-                    "fileMoved": contract_files.get(trade_id, {}).get("moved", True),
-                    "daoProcessed": processed,
-                    "daoPassed": dao_vote[3] if processed else None,
-                })
-                all_votes.append(data)
-        except Exception:
-            logging.error(f"Error fetching DAO vote for trade_id {trade_id}:\n{traceback.format_exc()}")
-            continue
-
-    return {"dao_votes": all_votes}
+async def get_all_dao_votes(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
+    user_address: str = Depends(verify_admin)
+):
+    after = await _cursor_to_trade_id(cursor)
+
+    def to_dao_votes(trades):
+        all_votes = []
+        files = contract_files.get_many([data["trade_id"] for data in trades])
+        for data in trades:
+            data.pop("finalized")
+            data["fileMoved"] = files.get(data["trade_id"], {}).get("private", True)
+            if not data["daoProcessed"]:
+                data["daoPassed"] = None
+            all_votes.append(data)
+        return all_votes
+
+    # stream=true: 조회되는 대로 한 줄씩 (NDJSON)
+    if stream:
+        return ndjson_trades_response(iter_trade_pages(finalized=True, limit=limit, after=after), to_dao_votes, limit)
+
+    all_votes = to_dao_votes(await load_trades(finalized=True, limit=limit, after=after))
+    return {"dao_votes": all_votes, "next_cursor": next_cursor(all_votes, limit)}
 
 @admin_router.get("/dao-votes/pending")
-def get_pending_dao_votes(user_address: str = Depends(verify_jwt_token)):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-
+async def get_pending_dao_votes(user_address: str = Depends(verify_admin)):
     pending_results = []
-    all_trade_ids = contract.functions.getAllTradeIds().call()
-
-    # 전체 DAO 투표자 목록 조회
-    all_voters = dao_contract.functions.getVotersList().call()
-
-    for trade_id in all_trade_ids:
-        try:
-            vote_status = contract.functions.getVoteStatus(trade_id).call()
-            finalized = vote_status[4]
-
-            if not finalized:
-                continue
-
-            dao_vote = dao_contract.functions.getVoteResult(trade_id).call()
-            processed = dao_vote[2]
-
-            if not processed:
-                yes_voters = []
-                no_voters = []
-                not_voted = []
-
-                # 각 투표자별 투표 상태 조회
-                for voter in all_voters:
-                    voted, approved = dao_contract.functions.getVoterVote(trade_id, voter).call()
-                    if not voted:
-                        not_voted.append(voter)
-                    elif approved:
-                        yes_voters.append(voter)
-                    else:
-                        no_voters.append(voter)
-
-                data = get_contract_from_chain(trade_id)
-                data.update({
-                    "trade_id": trade_id,
-                    "daoProcessed": processed,
-                    "daoPassed": None,
-                    "yesVoters": yes_voters,
-                    "noVoters": no_voters,
-                    "notVoted": not_voted,
-                })
-                pending_results.append(data)
-
-        except Exception:
-            logging.error(f"Error fetching pending DAO vote for trade_id {trade_id}:\n{traceback.format_exc()}")
-            continue
+
+    # 미처리 trade 목록과 전체 DAO 투표자 목록을 동시에 조회한 뒤 trade 별 투표 내역 조회
+    pending_trades, all_voters = await asyncio.gather(
+        load_trades(finalized=True, dao_processed=False),
+        async_dao_contract.functions.getVotersList().call(),
+    )
+    votes = await load_vote_matrix([data["trade_id"] for data in pending_trades], all_voters)
+
+    for data in pending_trades:
+        # 각 투표자별 투표 상태 분류 (투표 행렬의 비트셋으로 메모리에서 계산)
+        yes_voters, no_voters, not_voted = votes.classify(data["trade_id"], all_voters)
+
+        for key in ("approvedA", "approvedB", "finalized"):
+            data.pop(key)
+        data.update({
+            "daoPassed": None,
+            "yesVoters": yes_voters,
+            "noVoters": no_voters,
+            "notVoted": not_voted,
+        })
+        pending_results.append(data)
 
     return {"pending_dao_votes": pending_results}
 
 @admin_router.post("/dao-votes/finalize")
-def finalize_dao_vote(
+async def finalize_dao_vote(
     trade_id: str = Body(...),
     passed: bool = Body(...),
-    user_address: str = Depends(verify_jwt_token)
+    user_address: str = Depends(verify_admin)
 ):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-
     try:
         # ✅ 최소 1명 이상이 vote() 했는지 확인
-        voters = dao_contract.functions.getVotersList().call()
-        voted_count = 0
-        for voter in voters:
-            voted, _ = dao_contract.functions.getVoterVote(trade_id, voter).call()
-            if voted:
-                voted_count += 1
-
-        if voted_count == 0:
+        if not await has_dao_votes(trade_id):
             raise HTTPException(status_code=400, detail="아직 DAO 투표가 시작되지 않았습니다. 최소 한 명 이상이 투표해야 완료할 수 있습니다.")
 
-        # ✅ 트랜잭션 준비
-        nonce = w3.eth.get_transaction_count(ACCOUNT_ADDRESS)
-        tx = dao_contract.functions.finalizeVote(trade_id).build_transaction({
-            "from": ACCOUNT_ADDRESS,
-            "nonce": nonce,
-            "gas": 300000,
-            "gasPrice": w3.to_wei('30', 'gwei'),
-            "chainId": int(os.getenv("CHAIN_ID", "11155111"))  # 기본값: Sepolia
-        })
-
-        signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        # ✅ 제출 큐를 통해 전송 (nonce 는 큐에서 할당)
+        # 결과가 투표 상태에 달려 있으므로 가스 추정 캐시 대신 매번 현재 상태로 실행해 보고 보낸다
+        tx_hash = await tx_submitter.submit(async_dao_contract.functions.finalizeVote(trade_id), simulate=True)
 
-        tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-        if tx_receipt.status != 1:
-            raise RuntimeError("트랜잭션이 실패했습니다. TxHash: " + w3.to_hex(tx_hash))
+        # ⏳ 채굴은 기다리지 않음 → 영수증은 tx_tracker 가 백그라운드에서 확인
+        tx_tracker.track(tx_hash, "finalizeVote", trade_id=trade_id)
 
-        return {"success": True, "message": "2차 DAO 투표가 완료되었습니다.", "tx_hash": w3.to_hex(tx_hash)}
+        return {
+            "success": True,
+            "message": "2차 DAO 투표 완료 트랜잭션이 전송되었습니다.",
+            "tx_hash": tx_hash,
+            "tx_status_url": f"/api/tx/{tx_hash}",
+        }
 
     except HTTPException:
         raise  # 위에서 raise한 HTTP 오류는 그대로 유지
+    except ContractLogicError as e:
+        # 사전 실행에서 revert → 트랜잭션을 보내지 않음
+        raise HTTPException(status_code=400, detail=f"트랜잭션이 거절될 상태입니다: {e}")
     except Exception as e:
         logging.error(f"Error finalizing DAO vote for trade_id {trade_id}:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"트랜잭션 실패: {str(e)}")
 
-@admin_router.post("/add-voter")
-def add_voter(voter: str = Body(...), user_address: str = Depends(verify_jwt_token)):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
+@admin_router.get("/stats")
+def get_trade_stats(
+    days: int = Query(14, ge=1, le=366),
+    weeks: int = Query(8, ge=1, le=104),
+    user_address: str = Depends(verify_admin)
+):
+    # 인덱서가 이벤트를 적용할 때 갱신한 누적 집계만 읽는다 (trade 전체를 다시 세지 않음)
+    return chain_index.get_stats(days, weeks)
 
+@admin_router.get("/tx-queue")
+def get_tx_queue_stats(user_address: str = Depends(verify_admin)):
+    return tx_submitter.stats()
+
+@admin_router.get("/chain-cache")
+def get_chain_cache_stats(user_address: str = Depends(verify_admin)):
+    return {"view_calls": view_cache.stats(), "receipts": receipt_cache.stats()}
+
+@admin_router.get("/rpc-pool")
+def get_rpc_pool_stats(user_address: str = Depends(verify_admin)):
+    return rpc_pool.stats()
+
+@admin_router.get("/file-store")
+def get_file_store_stats(user_address: str = Depends(verify_admin)):
+    return contract_files.stats()
+
+@admin_router.post("/add-voter")
+def add_voter(voter: str = Body(...), user_address: str = Depends(verify_admin)):
     try:
         tx = dao_contract.functions.addVoter(voter).buildTransaction({
             "from": user_address,
@@ -179,67 +153,47 @@ def add_voter(voter: str = Body(...), user_address: str = Depends(verify_jwt_tok
 
 
 @admin_router.get("/dao-votes/voters")
-def get_voters(user_address: str = Depends(verify_jwt_token)) -> List[str]:
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
+async def get_voters(user_address: str = Depends(verify_admin)) -> List[str]:
 
     try:
-        voters = dao_contract.functions.getVotersList().call()
+        voters = await async_dao_contract.functions.getVotersList().call()
         return voters
     except Exception:
         logging.error(f"Error fetching voters list:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail="투표자 목록 조회 실패")
 
 @admin_router.get("/dao-votes/vote-status")
-def get_voter_vote_status(trade_id: str, voter: str, user_address: str = Depends(verify_jwt_token)):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-
+async def get_voter_vote_status(trade_id: str, voter: str, user_address: str = Depends(verify_admin)):
     try:
-        voted, approved = dao_contract.functions.getVoterVote(trade_id, voter).call()
+        voted, approved = await async_dao_contract.functions.getVoterVote(trade_id, voter).call()
         return {"voted": voted, "approved": approved}
     except Exception:
         logging.error(f"Error fetching vote status for voter {voter} and trade_id {trade_id}:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail="투표 상태 조회 실패")
 
 @admin_router.get("/dao-votes/completed")
-def get_completed_dao_votes(user_address: str = Depends(verify_jwt_token)):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-
-    completed_votes = []
-    all_trade_ids = contract.functions.getAllTradeIds().call()
-
-    for trade_id in all_trade_ids:
-        try:
-            vote_status = contract.functions.getVoteStatus(trade_id).call()
-            finalized = vote_status[4]
-
-            if not finalized:
-                continue
-
-            dao_vote = dao_contract.functions.getVoteResult(trade_id).call()
-            processed = dao_vote[2]
+async def get_completed_dao_votes(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
+    user_address: str = Depends(verify_admin)
+):
+    after = await _cursor_to_trade_id(cursor)
 
-            if processed:
-                data = get_contract_from_chain(trade_id)
-                data.update({
-                    "trade_id": trade_id,
-                    "daoProcessed": processed,
-                    "daoPassed": dao_vote[3],
-                })
-                # 찬성/반대자 리스트를 위한 추가 정보 로딩 (별도 함수로 만들면 좋음)
-                # 예) data["yesVoters"], data["noVoters"] = get_vote_details(trade_id)
+    def to_completed_votes(trades):
+        completed_votes = []
+        for data in trades:
+            for key in ("approvedA", "approvedB", "finalized"):
+                data.pop(key)
+            # 찬성/반대자 리스트를 위한 추가 정보 로딩 (별도 함수로 만들면 좋음)
+            # 예) data["yesVoters"], data["noVoters"] = get_vote_details(trade_id)
 
-                completed_votes.append(data)
-        except Exception as e:
-            logging.error(f"Error fetching completed DAO vote for trade_id {trade_id}:\n{traceback.format_exc()}")
-            continue
+            completed_votes.append(data)
+        return completed_votes
 
-    return {"completed_dao_votes": completed_votes}
+    if stream:
+        pages = iter_trade_pages(finalized=True, dao_processed=True, limit=limit, after=after)
+        return ndjson_trades_response(pages, to_completed_votes, limit)
 
-@admin_router.get("/check-admin")
-def check_admin(user_address: str = Depends(verify_jwt_token)):
-    if not is_admin(user_address):
-        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
-    return {"message": "관리자 권한 확인됨"}
\ No newline at end of file
+    completed_votes = to_completed_votes(await load_trades(finalized=True, dao_processed=True, limit=limit, after=after))
+    return {"completed_dao_votes": completed_votes, "next_cursor": next_cursor(completed_votes, limit)}
@@ -1,44 +1,97 @@
 from fastapi import APIRouter, Request, Response, HTTPException
 from fastapi.responses import JSONResponse
 import jwt, time, os, uuid
-import secrets
 from eth_account.messages import encode_defunct
 from eth_account import Account
+from backend.challenge_store import challenges
+from backend.token_cache import token_cache, revoked_tokens, token_digest
+from backend.metrics import JWT_DECODE_SECONDS, timed
 
-nonces = {}
 router = APIRouter()
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "devkey")
 JWT_EXPIRE_SECONDS = 1800
 
-def verify_jwt_token(request: Request):
+ADMIN_ADDRESSES = {
+    "0x7315C7AD21E501faBFc86f3D546a8898be6D39b6".lower(),
+    "0x08ae1529BeBF0eDe319A2A6bd546D1Cd3bD428BD".lower(),
+}
+
+class Principal:
+    """검증된 토큰의 주인. 요청당 한 번 만들어 request.state.principal 에 둔다."""
+
+    def __init__(self, payload: dict):
+        self.address = payload["sub"]
+        self.is_admin = self.address.lower() in ADMIN_ADDRESSES
+        self.jti = payload.get("jti")
+        self.exp = payload.get("exp")
+
+def decode_token(token: str) -> dict:
+    """HS512 검증 결과를 토큰 digest 로 캐시한다 (토큰의 exp 까지). 폐기된 jti 는 InvalidTokenError."""
+    digest = token_digest(token)
+    payload = token_cache.get(digest)
+    if payload is None:
+        with timed(JWT_DECODE_SECONDS):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=["HS512"])
+        if "exp" in payload:
+            token_cache.put(digest, payload)
+    if revoked_tokens.is_revoked(payload.get("jti")):
+        raise jwt.InvalidTokenError("Token revoked")
+    return payload
+
+def authenticate(request: Request, missing_detail: str = "Missing token") -> Principal:
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+
     token = request.cookies.get("access_token")
     if not token:
-        raise HTTPException(status_code=401, detail="Missing token")
+        raise HTTPException(status_code=401, detail=missing_detail)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS512"])
-        return payload["sub"]
+        principal = Principal(decode_token(token))
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    request.state.principal = principal
+    return principal
+
+def verify_jwt_token(request: Request):
+    return authenticate(request).address
+
+def verify_admin(request: Request):
+    principal = authenticate(request)
+    if not principal.is_admin:
+        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
+    return principal.address
     
 @router.post("/verify")
 async def verify_signature(payload: dict, response: Response):
     address = payload.get("address")
     signature = payload.get("signature")
 
-    nonce = nonces.get(address.lower())
+    if not address or not signature:
+        return JSONResponse(status_code=400, content={"detail": "Missing address or signature"})
+
+    # ✅ nonce 는 서명 검증에 성공했을 때만 지운다 (주소만 아는 사람이 잘못된 서명으로 지우지 못하도록)
+    nonce = challenges.get(address)
     if not nonce:
         return JSONResponse(status_code=400, content={"detail": "Nonce not found"})
 
     # ✅ 프리픽스 포함된 메시지로 서명 복구
     expected_message = f"Sign this message: {nonce}"
     msg = encode_defunct(text=expected_message)
-    recovered = Account.recover_message(msg, signature=signature)
+    try:
+        recovered = Account.recover_message(msg, signature=signature)
+    except Exception:
+        return JSONResponse(status_code=400, content={"detail": "Signature verification failed"})
 
     if recovered.lower() != address.lower():
         return JSONResponse(status_code=400, content={"detail": "Signature verification failed"})
 
+    # ✅ 1회용: 같은 nonce 로 동시에 들어온 요청 중 하나만 통과
+    if not challenges.consume(address, nonce):
+        return JSONResponse(status_code=400, content={"detail": "Nonce not found"})
+
     # JWT 발급
     payload = {
         "sub": address,
@@ -65,12 +118,22 @@ def get_nonce(address: str):
     if not address or not address.startswith("0x") or len(address) != 42:
         return JSONResponse(status_code=400, content={"detail": "Invalid address"})
 
-    nonce = secrets.token_hex(16)
-    nonces[address.lower()] = nonce
+    nonce = challenges.issue(address)
     return {"nonce": nonce}
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    # ✅ 쿠키만 지우면 토큰은 만료 전까지 유효하므로 jti 를 폐기 목록에 추가
+    token = request.cookies.get("access_token")
+    if token:
+        try:
+            payload = decode_token(token)
+            if payload.get("jti") and payload.get("exp"):
+                revoked_tokens.revoke(payload["jti"], payload["exp"])
+            token_cache.discard(token_digest(token))
+        except jwt.InvalidTokenError:
+            pass
+
     response.delete_cookie(
         key="access_token",
         path="/"
@@ -79,14 +142,5 @@ async def logout(response: Response):
 
 @router.get("/me")
 def get_me(request: Request):
-    token = request.cookies.get("access_token")
-    if not token:
-        raise HTTPException(status_code=401, detail="Not logged in")
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS512"])
-        return {"address": payload["sub"]}
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return {"address": authenticate(request, missing_detail="Not logged in").address}
     
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""SHA256 기반 content-addressed PDF 저장소.
+
+파일은 <root>/<hash[:2]>/<hash[2:4]>/<hash>.pdf 에 한 번만 저장되고, 같은 내용의 계약서가
+여러 trade_id 로 등록되면 참조(ref)만 늘어난다. 공개/비공개 여부는 계약 메타데이터
+(contract_files)에서 관리하므로 파일을 옮기지 않는다. 참조 수는 ContractFileRegistry 가 관리하며
+마지막 참조가 해제되면 파일을 지운다.
+"""
+import os
+import tempfile
+
+from backend.utils import PDF_CHUNK_SIZE, hash_pdf_stream
+
+
+class BlobStore:
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")  # 같은 파일시스템이어야 os.replace 가 원자적
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, sha256: str) -> str:
+        sha256 = sha256.lower()
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}.pdf")
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self.path_for(sha256))
+
+    def spool(self, src, max_size: int, chunk_size: int = PDF_CHUNK_SIZE):
+        """src 를 tmp 디렉터리의 임시 파일에 쓰면서 %PDF 확인 + SHA256 계산을 한 번에 한다.
+
+        반환값은 (sha256 hex, 크기, 임시 파일 경로). 임시 파일은 commit 이나 discard 로 정리한다."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                sha256, size = hash_pdf_stream(src, max_size, chunk_size, out=out)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return sha256, size, tmp_path
+
+    def commit(self, tmp_path: str, sha256: str) -> bool:
+        """spool 한 임시 파일을 sha256 이름으로 옮긴다. 이미 있으면 임시 파일을 지우고 False 를 반환한다."""
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)  # 동시에 같은 내용이 올라와도 결과는 동일
+        return True
+
+    def discard(self, tmp_path: str):
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def remove(self, sha256: str) -> int:
+        """파일을 지우고 해제된 바이트 수를 반환한다. 참조 수 확인은 호출한 쪽(ContractFileRegistry)에서 한다."""
+        path = self.path_for(sha256)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except FileNotFoundError:
+            return 0
@@ -0,0 +1,127 @@
+"""체인 조회 결과 캐시.
+
+ViewCallCache: eth_call 결과를 (컨트랙트 주소, calldata) 키로 저장한다. calldata 에 함수 selector 와
+인자가 모두 들어 있으므로 (contract, function, args) 와 같다. 새 블록이 관측되면 (단일 투표처럼
+이벤트 없이 상태가 바뀌는 경우도 있으므로) 전체를 비우고, 블록과 무관하게 TTL 이 지나도 만료된다.
+
+ReceiptCache: 충분히 확정된(RECEIPT_CACHE_CONFIRMATIONS) 영수증은 바뀌지 않으므로 크기 제한 LRU 로 보관한다.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE", "10000"))
+VIEW_CACHE_TTL = float(os.getenv("VIEW_CACHE_TTL", "30"))              # 초, 블록이 그대로여도 이 시간이 지나면 만료
+CHAIN_HEAD_MAX_AGE = float(os.getenv("CHAIN_HEAD_MAX_AGE", "1"))        # 초, 최신 블록 번호를 다시 확인하는 주기
+RECEIPT_CACHE_SIZE = int(os.getenv("RECEIPT_CACHE_SIZE", "4096"))
+RECEIPT_CACHE_CONFIRMATIONS = int(os.getenv("RECEIPT_CACHE_CONFIRMATIONS", "12"))
+
+
+class ViewCallCache:
+    def __init__(self, max_size: int = VIEW_CACHE_SIZE, ttl: float = VIEW_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key → (stored_at, value)
+        self.head: Optional[int] = None
+        self.head_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def head_is_fresh(self) -> bool:
+        return self.head is not None and time.time() - self.head_checked_at < CHAIN_HEAD_MAX_AGE
+
+    def observe_block(self, block_number: int):
+        """최신 블록 번호를 알린다. 번호가 바뀌면(reorg 로 줄어든 경우 포함) 캐시를 비운다."""
+        with self.lock:
+            self.head_checked_at = time.time()
+            if block_number != self.head:
+                self.head = block_number
+                if self.entries:
+                    self.entries.clear()
+                    self.invalidations += 1
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def get(self, key):
+        """(hit 여부, 값) 을 반환한다."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, block: Optional[int]):
+        """block 은 조회를 시작할 때의 블록 번호. 그 사이 새 블록이 관측됐다면 저장하지 않는다."""
+        with self.lock:
+            if block is None or block != self.head:
+                return
+            self.entries[key] = (time.time(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "head": self.head,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "invalidations": self.invalidations,
+        }
+
+
+class ReceiptCache:
+    def __init__(self, max_size: int = RECEIPT_CACHE_SIZE, confirmations: int = RECEIPT_CACHE_CONFIRMATIONS):
+        self.max_size = max_size
+        self.confirmations = confirmations
+        self.entries = OrderedDict()  # tx_hash(lower) → receipt
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, tx_hash: str):
+        with self.lock:
+            receipt = self.entries.get(tx_hash.lower())
+            if receipt is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(tx_hash.lower())
+            self.hits += 1
+            return receipt
+
+    def put(self, tx_hash: str, receipt, head: Optional[int]):
+        # reorg 로 바뀔 수 있는 최근 영수증은 저장하지 않는다
+        if head is None or head - receipt["blockNumber"] + 1 < self.confirmations:
+            return
+        with self.lock:
+            self.entries[tx_hash.lower()] = receipt
+            self.entries.move_to_end(tx_hash.lower())
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "confirmations": self.confirmations,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
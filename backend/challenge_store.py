@@ -0,0 +1,76 @@
+"""로그인 서명용 nonce(challenge) 저장소 (SQLite, WAL).
+
+여러 uvicorn 워커가 같은 DB 파일을 공유하므로 한 워커가 발급한 nonce 를 다른 워커가 검증할 수 있다.
+nonce 는 AUTH_CHALLENGE_TTL 초 뒤 만료되고, /auth/verify 에서 서명 검증에 성공하면 지워진다
+(잘못된 서명으로는 다른 사람의 nonce 를 지울 수 없다).
+발급할 때 만료된 항목을 정리하고, AUTH_CHALLENGE_MAX 개를 넘으면 만료가 가장 가까운 것부터 지운다.
+"""
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+AUTH_CHALLENGE_DB_PATH = os.getenv("AUTH_CHALLENGE_DB_PATH", "./auth_challenges.db")
+AUTH_CHALLENGE_TTL = float(os.getenv("AUTH_CHALLENGE_TTL", "300"))     # 초
+AUTH_CHALLENGE_MAX = int(os.getenv("AUTH_CHALLENGE_MAX", "10000"))     # 보관할 최대 nonce 수
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS challenges (
+    address TEXT PRIMARY KEY,
+    nonce TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_challenges_expires_at ON challenges (expires_at);
+"""
+
+
+class ChallengeStore:
+    def __init__(self, db_path: str, ttl: float = AUTH_CHALLENGE_TTL, max_size: int = AUTH_CHALLENGE_MAX):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def issue(self, address: str) -> str:
+        """address 의 새 nonce 를 발급한다. 이전에 발급한 nonce 는 덮어쓴다."""
+        nonce = secrets.token_hex(16)
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("DELETE FROM challenges WHERE expires_at <= ?", (now,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO challenges (address, nonce, expires_at) VALUES (?, ?, ?)",
+                (address.lower(), nonce, now + self.ttl),
+            )
+            overflow = self.db.execute("SELECT COUNT(*) FROM challenges").fetchone()[0] - self.max_size
+            if overflow > 0:
+                self.db.execute(
+                    "DELETE FROM challenges WHERE address IN"
+                    " (SELECT address FROM challenges ORDER BY expires_at LIMIT ?)",
+                    (overflow,),
+                )
+        return nonce
+
+    def get(self, address: str) -> Optional[str]:
+        """address 의 유효한 nonce (지우지 않음). 없거나 만료됐으면 None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT nonce FROM challenges WHERE address = ? AND expires_at > ?", (address.lower(), time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def consume(self, address: str, nonce: str) -> bool:
+        """서명 검증에 성공한 nonce 를 지운다 (1회용). 그 사이 다른 요청이 먼저 썼거나 재발급됐으면 False."""
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "DELETE FROM challenges WHERE address = ? AND nonce = ? AND expires_at > ?",
+                (address.lower(), nonce, time.time()),
+            )
+        return cursor.rowcount == 1
+
+
+challenges = ChallengeStore(AUTH_CHALLENGE_DB_PATH)
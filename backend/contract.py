@@ -1,89 +1,280 @@
-from web3 import Web3
+from web3 import Web3, AsyncWeb3
+from eth_utils import is_hex
+import asyncio
 import json
 import os
+import re
 from dotenv import load_dotenv
 from datetime import datetime, timezone
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from starlette.requests import Request
 from fastapi import Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import hashlib
+import threading
+from backend.transactions import TxSubmitter, ReceiptTracker
+from backend.fees import FeeOracle, GasEstimateCache
+from backend.chain_cache import ViewCallCache, ReceiptCache
+from backend.rpc_pool import RpcPool, PooledHTTPProvider, PooledAsyncHTTPProvider, rpc_urls_from_env
+from backend.metrics import register_abi, track_rpc
 
 router = APIRouter()
 load_dotenv()
-contract_files = {}
-w3 = Web3(Web3.HTTPProvider(os.getenv("SEPOLIA_RPC_URL")))
+# RPC_URLS 로 여러 엔드포인트를 주면 빠른 곳으로 조회를 보내고 실패 시 다른 곳으로 넘긴다
+rpc_pool = RpcPool(rpc_urls_from_env())
+w3 = Web3(PooledHTTPProvider(rpc_pool))
 
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 ACCOUNT_ADDRESS = w3.eth.account.from_key(PRIVATE_KEY).address
-ABI_FILE_PATH ="./artifacts/contracts/SecondDAO.sol/SecondDAO.json"
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "../artifacts/contracts")
+ABI_FILE_PATH = os.path.join(ARTIFACTS_DIR, "SecondDAO.sol/SecondDAO.json")
+ABI_PATH = os.path.join(ARTIFACTS_DIR, "ContractRegistry.sol/ContractRegistry.json")
+CONTRACTS_SOURCE_DIR = os.path.join(os.path.dirname(__file__), "../contracts")
 DAO_CONTRACT_ADDRESS = Web3.to_checksum_address(os.getenv("DAO_CONTRACT_ADDRESS"))
-with open(ABI_FILE_PATH) as f:
-    dao_abi = json.load(f)["abi"]
-dao_contract = w3.eth.contract(address=DAO_CONTRACT_ADDRESS, abi=dao_abi)
 
 
+# function 이름(선언부 ~ 본문 시작 / 세미콜론)
+SOLIDITY_FUNCTION_PATTERN = re.compile(r"\bfunction\s+(\w+)\s*\(([^{;]*)")
+
+
+class ArtifactRegistry:
+    """컴파일 산출물(ABI)을 한 번만 읽어 두고, 파일 mtime 이 바뀌었을 때만 다시 읽는다.
+
+    같은 ABI 로 만든 컨트랙트 객체를 재사용하고, contract-info 응답은 미리 직렬화한 바이트와
+    ETag 로 제공한다."""
+
+    def __init__(self):
+        self.artifacts = {}  # name → {"path", "address", "mtime", "abi", "body", "etag"}
+        self.contracts = {}  # (name, id(web3)) → (mtime, contract)
+        self.lock = threading.Lock()
+
+    def register(self, name: str, path: str, address: str):
+        self.artifacts[name] = {"path": path, "address": address, "mtime": None}
+
+    def missing_functions(self, name: str) -> list:
+        """contracts/<name>.sol 에 public / external 로 선언되어 있지만 ABI 에는 없는 함수 이름.
+
+        .sol 을 고친 뒤 `npx hardhat compile` 을 하지 않으면 서버는 예전 ABI 로 동작한다."""
+        source_path = os.path.join(CONTRACTS_SOURCE_DIR, f"{name}.sol")
+        if not os.path.exists(source_path):
+            return []
+        with open(source_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        declared = {
+            match.group(1)
+            for match in SOLIDITY_FUNCTION_PATTERN.finditer(source)
+            if re.search(r"\b(public|external)\b", match.group(2))
+        }
+        in_abi = {item.get("name") for item in self.abi(name) if item.get("type") == "function"}
+        return sorted(declared - in_abi)
+
+    def check_sources(self):
+        for name in self.artifacts:
+            missing = self.missing_functions(name)
+            if missing:
+                print(f"⚠️ {name} ABI is older than contracts/{name}.sol (missing: {', '.join(missing)})."
+                      " Run `npx hardhat compile` and redeploy; until then these functions are not used.")
+
+    def _load(self, name: str) -> dict:
+        artifact = self.artifacts[name]
+        mtime = os.stat(artifact["path"]).st_mtime_ns
+        if artifact["mtime"] != mtime:
+            with self.lock:
+                if artifact["mtime"] != mtime:
+                    with open(artifact["path"], "r", encoding="utf-8") as f:
+                        abi = json.load(f)["abi"]
+                    register_abi(abi)  # RPC 지표의 eth_call 함수 이름 라벨용
+                    body = json.dumps(
+                        {"contract_address": artifact["address"], "abi": abi}, separators=(",", ":")
+                    ).encode("utf-8")
+                    artifact.update(
+                        abi=abi,
+                        body=body,
+                        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+                        mtime=mtime,
+                    )
+        return artifact
+
+    def abi(self, name: str) -> list:
+        return self._load(name)["abi"]
+
+    def contract(self, name: str, web3=None):
+        """name 의 컨트랙트 객체. ABI 가 바뀌지 않았다면 이전에 만든 객체를 그대로 돌려준다."""
+        web3 = web3 or w3
+        artifact = self._load(name)
+        key = (name, id(web3))
+        cached = self.contracts.get(key)
+        if cached is None or cached[0] != artifact["mtime"]:
+            cached = (artifact["mtime"], web3.eth.contract(address=artifact["address"], abi=artifact["abi"]))
+            self.contracts[key] = cached
+        return cached[1]
+
+    def info_response(self, name: str, request: Optional[Request] = None) -> Response:
+        """{"contract_address", "abi"} 응답. If-None-Match 가 ETag 와 같으면 304."""
+        artifact = self._load(name)
+        headers = {"ETag": artifact["etag"], "Cache-Control": "no-cache"}
+        if request is not None and request.headers.get("if-none-match") == artifact["etag"]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=artifact["body"], media_type="application/json", headers=headers)
+
+
+artifacts = ArtifactRegistry()
+artifacts.register("SecondDAO", ABI_FILE_PATH, DAO_CONTRACT_ADDRESS)
+artifacts.register("ContractRegistry", ABI_PATH, os.getenv("CONTRACT_ADDRESS"))
+
+artifacts.check_sources()
+
+dao_abi = artifacts.abi("SecondDAO")
+dao_contract = artifacts.contract("SecondDAO")
+
 # ABI 및 주소 불러오기
-ABI_PATH = os.path.join(
-    os.path.dirname(__file__),
-    "../artifacts/contracts/ContractRegistry.sol/ContractRegistry.json"
+abi = artifacts.abi("ContractRegistry")
+contract = artifacts.contract("ContractRegistry")
+
+# 배치 조회 설정 (JSON-RPC 배치 1회에 담을 eth_call 개수)
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", "100"))
+
+# 비동기 RPC 설정: 핸들러는 AsyncWeb3 를 사용하고, 동시에 나가는 RPC 요청 수를 제한한다
+RPC_CONCURRENCY = int(os.getenv("RPC_CONCURRENCY", "16"))
+rpc_semaphore = asyncio.Semaphore(RPC_CONCURRENCY)
+
+
+async def async_rpc_limit_middleware(make_request, w3):
+    async def middleware(method, params):
+        async with rpc_semaphore:
+            return await make_request(method, params)
+    return middleware
+
+
+async_w3 = AsyncWeb3(PooledAsyncHTTPProvider(rpc_pool))
+async_w3.middleware_onion.add(async_rpc_limit_middleware)
+async_contract = artifacts.contract("ContractRegistry", async_w3)
+async_dao_contract = artifacts.contract("SecondDAO", async_w3)
+
+# 서버 서명 계정의 모든 트랜잭션은 이 큐를 거쳐 nonce 를 할당받는다
+# 수수료는 블록마다 백그라운드에서 갱신, 가스 추정은 함수 + 인자 크기별로 캐시 (미스일 때만 estimate_gas)
+fee_oracle = FeeOracle(async_w3)
+gas_estimates = GasEstimateCache()
+tx_submitter = TxSubmitter(
+    async_w3, ACCOUNT_ADDRESS, PRIVATE_KEY, int(os.getenv("CHAIN_ID", "11155111")), fee_oracle, gas_estimates
 )
 
-with open(ABI_PATH, "r", encoding="utf-8") as f:
-    abi = json.load(f)["abi"]
-contract = w3.eth.contract(address=os.getenv("CONTRACT_ADDRESS"), abi=abi)
+# trade_id 하나로 호출하는 조회 함수 목록 (fetch_trade_views 에서 사용)
+TRADE_VIEWS = {
+    "getContract": lambda trade_id: contract.functions.getContract(trade_id),
+    "getVoters": lambda trade_id: contract.functions.getVoters(trade_id),
+    "getVoteStatus": lambda trade_id: contract.functions.getVoteStatus(trade_id),
+    "getVoteResult": lambda trade_id: dao_contract.functions.getVoteResult(trade_id),
+}
 
-def register_contract_on_chain(contract_hash: str, asset_id: str, trade_id: str, party_a: str, party_b: str) -> str:
-    nonce = w3.eth.get_transaction_count(ACCOUNT_ADDRESS)
+# 조회 결과 캐시: eth_call 결과는 새 블록이 나오면 무효화, 확정된 영수증은 LRU 로 계속 보관
+view_cache = ViewCallCache()
+receipt_cache = ReceiptCache()
+_head_refresh: Optional[asyncio.Task] = None
+
+
+def current_head() -> Optional[int]:
+    """최신 블록 번호 (CHAIN_HEAD_MAX_AGE 동안은 다시 조회하지 않음). 조회 실패 시 None → 캐시 미사용."""
+    if not view_cache.head_is_fresh():
+        try:
+            view_cache.observe_block(w3.eth.block_number)
+        except Exception as e:
+            print("⚠️ Failed to fetch block number:", e)
+            return None
+    return view_cache.head
 
-    # ✅ 주소를 체크섬 형식으로 변환
-    party_a = Web3.to_checksum_address(party_a)
-    party_b = Web3.to_checksum_address(party_b)
 
-    # 📌 사전 Gas Estimate 수행
+async def current_head_async() -> Optional[int]:
+    global _head_refresh
+    if view_cache.head_is_fresh():
+        return view_cache.head
+    # 동시에 들어온 요청들은 하나의 eth_blockNumber 요청을 함께 기다린다
+    if _head_refresh is None or _head_refresh.done():
+        _head_refresh = asyncio.ensure_future(async_w3.eth.block_number)
     try:
-        gas_estimate = contract.functions.registerContract(
-            contract_hash, asset_id, trade_id, party_a, party_b
-        ).estimate_gas({"from": ACCOUNT_ADDRESS})
-        print("⛽ Estimated gas:", gas_estimate)
+        view_cache.observe_block(await _head_refresh)
     except Exception as e:
-        print("❌ Gas estimation failed:", e)
-        raise
+        print("⚠️ Failed to fetch block number:", e)
+        return None
+    return view_cache.head
 
-    # ✅ 트랜잭션 구성
-    tx = contract.functions.registerContract(
-        contract_hash, asset_id, trade_id, party_a, party_b
-    ).build_transaction({
-        "from": ACCOUNT_ADDRESS,
-        "nonce": nonce,
-        "gas": int(gas_estimate * 1.3),
-        "gasPrice": w3.to_wei("30", "gwei"),
-        "chainId": int(os.getenv("CHAIN_ID"))
-    })
 
-    signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-    return w3.to_hex(tx_hash)
+def _call_key(fn) -> tuple:
+    # calldata 에 함수 selector 와 인자가 모두 들어 있음
+    return fn.address, fn._encode_transaction_data()
 
 
-def get_contract_from_chain(trade_id: str, tx_hash: Optional[str] = None) -> dict:
-    # ABI 로드
-    ABI_PATH = os.path.join(
-        os.path.dirname(__file__),
-        "../artifacts/contracts/ContractRegistry.sol/ContractRegistry.json"
-    )
-    with open(ABI_PATH, "r", encoding="utf-8") as f:
-        abi = json.load(f)["abi"]
+def cached_call(fn):
+    """fn.call() 의 캐시 버전. 실패(revert 등)는 캐시하지 않고 예외를 그대로 전달한다."""
+    head = current_head()
+    key = _call_key(fn)
+    hit, value = view_cache.get(key)
+    if hit:
+        return value
+    value = fn.call()
+    view_cache.put(key, value, head)
+    return value
+
+
+async def cached_call_async(fn):
+    head = await current_head_async()
+    key = _call_key(fn)
+    hit, value = view_cache.get(key)
+    if hit:
+        return value
+    value = await fn.call()
+    view_cache.put(key, value, head)
+    return value
 
+
+def _lookup_cached(calls: list, fresh: bool = False):
+    keys = [_call_key(fn) for fn in calls]
+    results = [None] * len(calls)
+    missing = []
+    for i, key in enumerate(keys):
+        hit, value = (False, None) if fresh else view_cache.get(key)
+        if hit:
+            results[i] = value
+        else:
+            missing.append(i)
+    return keys, results, missing
+
+
+def _store_cached(keys: list, results: list, missing: list, fetched: list, head: Optional[int]):
+    for i, value in zip(missing, fetched):
+        results[i] = value
+        if value is not None:  # None 은 revert 와 전송 실패를 구분할 수 없으므로 캐시하지 않음
+            view_cache.put(keys[i], value, head)
+    return results
+
+
+def get_receipt(tx_hash: str):
+    receipt = receipt_cache.get(tx_hash)
+    if receipt is None:
+        receipt = w3.eth.get_transaction_receipt(tx_hash)
+        receipt_cache.put(tx_hash, receipt, current_head())
+    return receipt
+
+
+async def get_receipt_async(tx_hash: str):
+    receipt = receipt_cache.get(tx_hash)
+    if receipt is None:
+        receipt = await async_w3.eth.get_transaction_receipt(tx_hash)
+        receipt_cache.put(tx_hash, receipt, await current_head_async())
+    return receipt
+
+def get_contract_from_chain(trade_id: str, tx_hash: Optional[str] = None) -> dict:
     contract_address = os.getenv("CONTRACT_ADDRESS")
     if not contract_address or not Web3.is_address(contract_address):
         raise ValueError(f"Invalid or missing CONTRACT_ADDRESS: {contract_address}")
-    contract = w3.eth.contract(Web3.to_checksum_address(contract_address), abi=abi)
+    # ABI / 컨트랙트 객체는 레지스트리에서 재사용 (산출물 파일이 바뀐 경우에만 다시 로드)
+    contract = artifacts.contract("ContractRegistry")
 
     # 🔍 트랜잭션 검증 (tx_hash가 있을 경우만)
     if tx_hash:
         try:
-            tx_receipt = w3.eth.get_transaction_receipt(tx_hash)
+            tx_receipt = get_receipt(tx_hash)
             if tx_receipt["to"].lower() != contract_address.lower():
                 raise ValueError("Tx hash is not related to the target contract.")
         except Exception as e:
@@ -91,31 +282,375 @@ def get_contract_from_chain(trade_id: str, tx_hash: Optional[str] = None) -> dic
 
     # 🔎 실제 데이터 조회
     try:
-        contract_hash, asset_id, registrant, timestamp = contract.functions.getContract(trade_id).call()
-        party_a, party_b = contract.functions.getVoters(trade_id).call()
-        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-        return {
-            "contractHash": contract_hash,
-            "assetId": asset_id,
-            "registrant": registrant,
-            "partyA": party_a,
-            "partyB": party_b,
-            "timestamp": timestamp,
-            "datetime": dt
-        }
+        record = cached_call(contract.functions.getContract(trade_id))
+        voters = cached_call(contract.functions.getVoters(trade_id))
+        return format_contract_record(record, voters)
     except Exception as e:
         raise RuntimeError(f"Failed to fetch contract from chain: {e}")
 
 
+def format_contract_record(record, voters) -> dict:
+    contract_hash, asset_id, registrant, timestamp = record
+    party_a, party_b = voters
+    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "contractHash": contract_hash,
+        "assetId": asset_id,
+        "registrant": registrant,
+        "partyA": party_a,
+        "partyB": party_b,
+        "timestamp": timestamp,
+        "datetime": dt
+    }
+
+
+def _decode_call_result(fn, data: str):
+    output_types = [output["type"] for output in fn.abi["outputs"]]
+    values = list(w3.codec.decode(output_types, bytes.fromhex(data[2:])))
+    # .call() 과 동일하게 주소는 체크섬 형식으로 반환
+    for i, output_type in enumerate(output_types):
+        if output_type == "address":
+            values[i] = Web3.to_checksum_address(values[i])
+        elif output_type == "address[]":
+            values[i] = [Web3.to_checksum_address(v) for v in values[i]]
+    return values[0] if len(values) == 1 else values
+
+
+def _batch_payload(method: str, params_list: list) -> list:
+    return [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, params in enumerate(params_list)
+    ]
+
+
+def _parse_batch_replies(replies, count: int) -> list:
+    if not isinstance(replies, list):
+        raise RuntimeError(f"Batch request not supported: {replies}")
+    results = [None] * count
+    for reply in replies:
+        if not reply.get("error"):
+            results[reply["id"]] = reply.get("result")
+    return results
+
+
+def _rpc_batch(method: str, params_list: list) -> list:
+    with track_rpc(method, params_list, batch=True):
+        replies = rpc_pool.post(json.dumps(_batch_payload(method, params_list)).encode("utf-8"))
+    return _parse_batch_replies(replies, len(params_list))
+
+
+def batch_rpc(method: str, params_list: list, chunk_size: Optional[int] = None) -> list:
+    """같은 JSON-RPC 메서드를 여러 파라미터로 배치 호출한다. 실패한 항목은 None."""
+    chunk_size = chunk_size or RPC_BATCH_SIZE
+    results = []
+    for start in range(0, len(params_list), chunk_size):
+        chunk = params_list[start:start + chunk_size]
+        try:
+            results.extend(_rpc_batch(method, chunk))
+        except Exception as e:
+            print("⚠️ Batch request failed, falling back to sequential requests:", e)
+            for params in chunk:
+                response = w3.provider.make_request(method, params)
+                results.append(response.get("result"))
+    return results
+
+
+def _eth_call_params(fn) -> list:
+    return [{"to": fn.address, "data": fn._encode_transaction_data()}, "latest"]
+
+
+def _decode_call_results(calls: list, replies: list) -> list:
+    results = [None] * len(calls)
+    for i, data in enumerate(replies):
+        if data in (None, "0x"):
+            continue  # revert 등 실패한 호출은 None 으로 남김
+        try:
+            results[i] = _decode_call_result(calls[i], data)
+        except Exception:
+            results[i] = None
+    return results
+
+
+def _batch_call_chunk(calls: list) -> list:
+    return _decode_call_results(calls, _rpc_batch("eth_call", [_eth_call_params(fn) for fn in calls]))
+
+
+def batch_call(calls: list, chunk_size: Optional[int] = None) -> list:
+    """컨트랙트 조회 함수 목록을 JSON-RPC 배치 요청으로 묶어서 실행한다.
+
+    결과는 calls 와 같은 순서이며, 실패(revert 등)한 호출은 None 이 된다.
+    캐시(view_cache)에 있는 호출은 보내지 않는다.
+    """
+    head = current_head()
+    keys, results, missing = _lookup_cached(calls)
+    if missing:
+        fetched = _batch_call_uncached([calls[i] for i in missing], chunk_size)
+        _store_cached(keys, results, missing, fetched, head)
+    return results
+
+
+def _batch_call_uncached(calls: list, chunk_size: Optional[int] = None) -> list:
+    # 배치를 지원하지 않는 프로바이더라면 개별 .call() 로 대체한다.
+    chunk_size = chunk_size or RPC_BATCH_SIZE
+    results = []
+    for start in range(0, len(calls), chunk_size):
+        chunk = calls[start:start + chunk_size]
+        try:
+            results.extend(_batch_call_chunk(chunk))
+        except Exception as e:
+            print("⚠️ Batch call failed, falling back to sequential calls:", e)
+            for fn in chunk:
+                try:
+                    results.append(fn.call())
+                except Exception:
+                    results.append(None)
+    return results
+
+
+def fetch_trade_views(trade_ids: list, views: list, chunk_size: Optional[int] = None) -> dict:
+    """여러 trade_id 에 대해 TRADE_VIEWS 조회를 한 번에 배치로 실행한다.
+
+    반환값: {trade_id: {view_name: result 또는 None}}
+    """
+    calls = [TRADE_VIEWS[view](trade_id) for trade_id in trade_ids for view in views]
+    results = batch_call(calls, chunk_size)
+    it = iter(results)
+    return {trade_id: {view: next(it) for view in views} for trade_id in trade_ids}
+
+
+def get_contracts_from_chain(trade_ids: list, chunk_size: Optional[int] = None) -> dict:
+    """get_contract_from_chain 의 배치 버전. 조회에 실패한 trade_id 는 결과에서 빠진다."""
+    views = fetch_trade_views(trade_ids, ["getContract", "getVoters"], chunk_size)
+    return {
+        trade_id: format_contract_record(v["getContract"], v["getVoters"])
+        for trade_id, v in views.items()
+        if v["getContract"] is not None and v["getVoters"] is not None
+    }
+
+
+def _select_trades(views: dict, party, finalized, dao_processed, offset: int, limit: Optional[int]) -> dict:
+    selected = {}
+    for trade_id, v in views.items():
+        if v["getVoters"] is None or v["getVoteStatus"] is None or v["getVoteResult"] is None:
+            print(f"Error processing trade_id {trade_id}: view call failed")
+            continue
+        party_a, party_b = v["getVoters"]
+        if int(party_a, 16) == 0 and int(party_b, 16) == 0:
+            continue  # 거절되어 삭제된 trade
+        if party and party.lower() not in [party_a.lower(), party_b.lower()]:
+            continue
+        if finalized is not None and v["getVoteStatus"][4] != finalized:
+            continue
+        if dao_processed is not None and v["getVoteResult"][2] != dao_processed:
+            continue
+        selected[trade_id] = v
+
+    selected_ids = list(selected)[offset:None if limit is None else offset + limit]
+    return {trade_id: selected[trade_id] for trade_id in selected_ids}
+
+
+def _build_trades(selected: dict, records: Optional[dict]) -> list:
+    trades = []
+    for trade_id, v in selected.items():
+        if records is not None and records[trade_id] is None:
+            print(f"Error processing trade_id {trade_id}: getContract failed")
+            continue
+        voted_a, voted_b, approved_a, approved_b, is_finalized = v["getVoteStatus"]
+        yes_votes, no_votes, processed, passed = v["getVoteResult"]
+        data = format_contract_record(records[trade_id], v["getVoters"]) if records is not None else {}
+        data.update({
+            "trade_id": trade_id,
+            "approvedA": approved_a,
+            "approvedB": approved_b,
+            "finalized": is_finalized,
+            "daoProcessed": processed,
+            "daoPassed": passed,
+        })
+        trades.append(data)
+    return trades
+
+
+def get_trades_from_chain(
+    party: Optional[str] = None,
+    finalized: Optional[bool] = None,
+    dao_processed: Optional[bool] = None,
+    with_contract: bool = True,
+    trade_ids: Optional[list] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> list:
+    """trade 를 체인에서 직접 조회하여 조건에 맞는 것만 반환한다.
+
+    1단계에서 당사자/투표 상태/DAO 결과를 배치로 조회해 필터링하고(offset/limit 적용),
+    2단계에서 남은 trade 의 계약 정보(getContract)만 배치로 가져온다.
+    trade_ids 를 주지 않으면 getAllTradeIds 전체를 대상으로 한다.
+    반환 형식은 인덱스(backend.indexer)의 get_trades 와 같다.
+    """
+    if trade_ids is None:
+        trade_ids = contract.functions.getAllTradeIds().call()
+    views = fetch_trade_views(trade_ids, ["getVoters", "getVoteStatus", "getVoteResult"])
+    selected = _select_trades(views, party, finalized, dao_processed, offset, limit)
+
+    records = None
+    if with_contract:
+        details = fetch_trade_views(list(selected), ["getContract"])
+        records = {trade_id: d["getContract"] for trade_id, d in details.items()}
+    return _build_trades(selected, records)
+
+
+# ------------------------------------------------------------------ 비동기 API
+# 요청 핸들러는 아래 async 함수를 사용해 이벤트 루프를 막지 않는다.
+
+
+async def open_rpc_session():
+    """커넥션 풀을 가진 aiohttp 세션을 만들어 AsyncWeb3 와 배치 요청이 함께 쓰도록 한다."""
+    return await rpc_pool.open_async_session()
+
+
+async def close_rpc_session():
+    await rpc_pool.close_async_session()
+
+
+async def _rpc_batch_async(method: str, params_list: list) -> list:
+    async with rpc_semaphore:
+        with track_rpc(method, params_list, batch=True):
+            replies = await rpc_pool.post_async(json.dumps(_batch_payload(method, params_list)).encode("utf-8"))
+    return _parse_batch_replies(replies, len(params_list))
+
+
+async def _rpc_request_async(method: str, params: list):
+    async with rpc_semaphore:
+        response = await async_w3.provider.make_request(method, params)
+    return response.get("result")
+
+
+async def _batch_rpc_chunk_async(method: str, chunk: list) -> list:
+    try:
+        return await _rpc_batch_async(method, chunk)
+    except Exception as e:
+        print("⚠️ Batch request failed, falling back to concurrent requests:", e)
+        results = await asyncio.gather(
+            *(_rpc_request_async(method, params) for params in chunk), return_exceptions=True
+        )
+        return [None if isinstance(r, Exception) else r for r in results]
+
+
+async def batch_rpc_async(method: str, params_list: list, chunk_size: Optional[int] = None) -> list:
+    """batch_rpc 의 비동기 버전. 청크들을 동시에 보내며 동시 요청 수는 RPC_CONCURRENCY 로 제한된다."""
+    chunk_size = chunk_size or RPC_BATCH_SIZE
+    chunks = [params_list[start:start + chunk_size] for start in range(0, len(params_list), chunk_size)]
+    results = await asyncio.gather(*(_batch_rpc_chunk_async(method, chunk) for chunk in chunks))
+    return [result for chunk_results in results for result in chunk_results]
+
+
+tx_tracker = ReceiptTracker(async_w3, batch_rpc_async, tx_submitter)
+tx_tracker.on_block = view_cache.observe_block  # 트래커가 본 새 블록 / 채굴된 트랜잭션으로 캐시 무효화
+tx_tracker.on_failed = lambda entry: gas_estimates.invalidate(entry.kind)  # kind = 함수 이름, 다음 전송은 다시 추정
+
+
+async def batch_call_async(calls: list, chunk_size: Optional[int] = None, fresh: bool = False) -> list:
+    """batch_call 의 비동기 버전. calls 는 (동기) 컨트랙트 함수 객체이며 인코딩에만 쓰인다.
+
+    fresh=True 면 캐시를 읽지 않고 항상 체인에서 조회한다 (결과는 캐시에 저장)."""
+    head = await current_head_async()
+    keys, results, missing = _lookup_cached(calls, fresh)
+    if missing:
+        missing_calls = [calls[i] for i in missing]
+        replies = await batch_rpc_async("eth_call", [_eth_call_params(fn) for fn in missing_calls], chunk_size)
+        _store_cached(keys, results, missing, _decode_call_results(missing_calls, replies), head)
+    return results
+
+
+async def fetch_trade_views_async(trade_ids: list, views: list, chunk_size: Optional[int] = None) -> dict:
+    calls = [TRADE_VIEWS[view](trade_id) for trade_id in trade_ids for view in views]
+    results = await batch_call_async(calls, chunk_size)
+    it = iter(results)
+    return {trade_id: {view: next(it) for view in views} for trade_id in trade_ids}
+
+
+async def get_trades_from_chain_async(
+    party: Optional[str] = None,
+    finalized: Optional[bool] = None,
+    dao_processed: Optional[bool] = None,
+    with_contract: bool = True,
+    trade_ids: Optional[list] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> list:
+    """get_trades_from_chain 의 비동기 버전."""
+    if trade_ids is None:
+        trade_ids = await async_contract.functions.getAllTradeIds().call()
+    views = await fetch_trade_views_async(trade_ids, ["getVoters", "getVoteStatus", "getVoteResult"])
+    selected = _select_trades(views, party, finalized, dao_processed, offset, limit)
+
+    records = None
+    if with_contract:
+        details = await fetch_trade_views_async(list(selected), ["getContract"])
+        records = {trade_id: d["getContract"] for trade_id, d in details.items()}
+    return _build_trades(selected, records)
+
+
+async def get_contract_from_chain_async(trade_id: str, tx_hash: Optional[str] = None) -> dict:
+    """get_contract_from_chain 의 비동기 버전. 트랜잭션 검증과 계약 조회를 동시에 수행한다."""
+    contract_address = os.getenv("CONTRACT_ADDRESS")
+    if not contract_address or not Web3.is_address(contract_address):
+        raise ValueError(f"Invalid or missing CONTRACT_ADDRESS: {contract_address}")
+
+    async def validate_tx():
+        try:
+            tx_receipt = await get_receipt_async(tx_hash)
+            if tx_receipt["to"].lower() != contract_address.lower():
+                raise ValueError("Tx hash is not related to the target contract.")
+        except Exception as e:
+            raise RuntimeError(f"Failed to validate tx_hash: {e}")
+
+    async def fetch_record():
+        try:
+            record, voters = await asyncio.gather(
+                cached_call_async(async_contract.functions.getContract(trade_id)),
+                cached_call_async(async_contract.functions.getVoters(trade_id)),
+            )
+            return format_contract_record(record, voters)
+        except Exception as e:
+            raise RuntimeError(f"Failed to fetch contract from chain: {e}")
+
+    if tx_hash:
+        _, data = await asyncio.gather(validate_tx(), fetch_record())
+        return data
+    return await fetch_record()
+
+
+async def register_contract_on_chain_async(
+    contract_hash: str, asset_id: str, trade_id: str, party_a: str, party_b: str
+) -> str:
+    """registerContract 트랜잭션을 제출 큐에 넣고 tx hash 를 반환한다."""
+    # ✅ 주소를 체크섬 형식으로 변환
+    party_a = Web3.to_checksum_address(party_a)
+    party_b = Web3.to_checksum_address(party_b)
+    register_fn = async_contract.functions.registerContract(contract_hash, asset_id, trade_id, party_a, party_b)
+
+    # 📌 Gas Estimate 는 submit 안에서 수행 (추정치 × 1.3)
+    try:
+        return await tx_submitter.submit(register_fn, gas_margin=1.3)
+    except Exception as e:
+        print("❌ Contract registration failed:", e)
+        raise
+
+
+@router.get("/api/tx/{tx_hash}")
+async def get_tx_status(tx_hash: str, wait: float = Query(0, ge=0)):
+    """트랜잭션 상태 (pending / mined / failed, confirmations). wait 초 동안 상태 변화를 기다릴 수 있다."""
+    if len(tx_hash) != 66 or not is_hex(tx_hash):
+        raise HTTPException(status_code=400, detail="잘못된 트랜잭션 해시입니다.")
+    status = await tx_tracker.status(tx_hash, wait)
+    if status is None:
+        raise HTTPException(status_code=404, detail="트랜잭션을 찾을 수 없습니다.")
+    return status
+
+
 @router.get("/api/dao/contract-info")
-async def get_contract_info():
+async def get_contract_info(request: Request):
     try:
-        with open(ABI_FILE_PATH, "r", encoding="utf-8") as f:
-            contract_json = json.load(f)
-            abi = contract_json.get("abi")
-        return {
-            "contract_address": DAO_CONTRACT_ADDRESS,
-            "abi": abi
-        }
+        return artifacts.info_response("SecondDAO", request)
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": f"ABI 로드 오류: {str(e)}"})
@@ -0,0 +1,153 @@
+"""체인 이벤트 구독 허브 (SSE).
+
+인덱서(backend/indexer.py)가 ContractRegistry / SecondDAO 이벤트를 적용할 때마다 여기로 넘기고,
+허브는 연결된 클라이언트 중 그 trade 나 주소를 구독한 곳에만 Server-Sent Events 로 보낸다.
+페이지는 폴링 대신 알림을 받은 부분만 다시 불러온다.
+
+- 메시지 id 는 "<block>-<logIndex>" 이므로, 재연결 시 브라우저가 보내는 Last-Event-ID 이후의
+  이벤트를 인덱스의 events 테이블에서 다시 보내 준다 (EVENTS_REPLAY_MAX 개까지).
+- 클라이언트가 느려 큐(EVENTS_QUEUE_SIZE)가 차면 {"event": "resync"} 를 보내고 연결을 끊는다.
+  reorg 가 일어나면 모든 구독자에게 {"event": "reorg"} 를 보낸다. 둘 다 받으면 화면 전체를 다시 불러온다.
+"""
+import asyncio
+import json
+import os
+from typing import Optional
+
+from fastapi.responses import StreamingResponse
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))              # 구독자별 미전송 메시지 수
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))               # 초, 프록시가 연결을 끊지 않도록
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "1000"))
+EVENTS_REPLAY_MAX = 1000                                                    # 재연결 시 다시 보낼 최대 이벤트 수
+EVENTS_RETRY_MS = 3000                                                      # 브라우저 재연결 간격
+
+BROADCAST_EVENTS = {"reorg", "resync"}
+
+
+class Subscription:
+    def __init__(self, address: Optional[str], trade_ids, everything: bool, queue_size: int):
+        self.address = address.lower() if address else None
+        self.trade_ids = set(trade_ids)
+        self.everything = everything  # 관리자: 모든 이벤트
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def matches(self, message: dict) -> bool:
+        if self.everything or message["event"] in BROADCAST_EVENTS:
+            return True
+        if message.get("trade_id") in self.trade_ids:
+            return True
+        return self.address is not None and self.address in message.get("addresses", ())
+
+
+class EventHub:
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, max_subscribers: int = EVENTS_MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscriptions = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0  # 큐가 차서 끊은 구독자 수
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+
+    def publish(self, messages: list):
+        """인덱서 스레드에서 호출. 구독자 큐에는 이벤트 루프에서 넣는다."""
+        self.published += len(messages)
+        if self.loop is None or not self.subscriptions:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._dispatch, messages)
+        except RuntimeError:
+            pass  # 종료 중 (루프가 닫힘)
+
+    def _dispatch(self, messages: list):
+        for subscription in list(self.subscriptions):
+            for message in messages:
+                if not subscription.matches(message):
+                    continue
+                try:
+                    subscription.queue.put_nowait(message)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    # 밀린 메시지는 버리고 전체를 다시 불러오라고 알린 뒤 구독 해제
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    subscription.queue.put_nowait({"event": "resync"})
+                    self.unsubscribe(subscription)
+                    self.dropped += 1
+                    break
+
+    def subscribe(self, address: Optional[str] = None, trade_ids=(), everything: bool = False) -> Subscription:
+        if len(self.subscriptions) >= self.max_subscribers:
+            raise RuntimeError("Too many subscribers")
+        subscription = Subscription(address, trade_ids, everything, self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+
+    def stream(self, subscription: Subscription, replay: list) -> StreamingResponse:
+        """replay(재연결 시 놓친 이벤트)를 먼저 보내고, 이후 도착하는 메시지를 SSE 로 보낸다."""
+        async def body():
+            try:
+                yield f"retry: {EVENTS_RETRY_MS}\n\n"
+                last = None
+                for message in replay:
+                    if subscription.matches(message):
+                        yield _format_sse(message)
+                    if message["event"] == "resync":
+                        return
+                    last = _event_key(message)
+                while True:
+                    try:
+                        message = await asyncio.wait_for(subscription.queue.get(), EVENTS_HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+                    # replay 를 읽는 동안 큐에도 들어온 이벤트는 건너뛴다
+                    key = _event_key(message)
+                    if last is not None and key is not None and key <= last:
+                        continue
+                    yield _format_sse(message)
+                    if message["event"] == "resync":
+                        return
+            finally:
+                self.unsubscribe(subscription)
+
+        return StreamingResponse(
+            body(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscriptions),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped,
+        }
+
+
+def parse_event_id(event_id: str) -> tuple:
+    """Last-Event-ID("<block>-<logIndex>") → (block, logIndex). 형식이 잘못되었으면 ValueError."""
+    block, _, log_index = event_id.partition("-")
+    return int(block), int(log_index)
+
+
+def _event_key(message: dict) -> Optional[tuple]:
+    return (message["block_number"], message["log_index"]) if "log_index" in message else None
+
+
+def _format_sse(message: dict) -> str:
+    data = json.dumps(message, separators=(",", ":"))
+    if "log_index" in message:
+        return f"id: {message['block_number']}-{message['log_index']}\ndata: {data}\n\n"
+    return f"data: {data}\n\n"
+
+
+event_hub = EventHub()
@@ -0,0 +1,190 @@
+"""트랜잭션 수수료 오라클과 가스 추정 캐시.
+
+FeeOracle: 백그라운드에서 블록 주기(TX_FEE_POLL_INTERVAL)마다 eth_feeHistory 한 번으로 다음 블록의
+base fee 와 최근 블록들의 priority fee(TX_PRIORITY_PERCENTILE 백분위 중앙값)를 받아 EIP-1559 수수료
+(maxFeePerGas = base fee × TX_BASE_FEE_MULTIPLIER + priority)를 만들어 둔다. EIP-1559 를 지원하지
+않는 체인이면 eth_gasPrice, 그마저 실패하면 TX_GAS_PRICE_GWEI 고정값을 쓴다. 한동안 트랜잭션이 없으면
+(TX_FEE_IDLE_TIMEOUT) 갱신을 멈추고, 다음 전송 때 한 번 직접 조회한다.
+
+GasEstimateCache: 같은 함수 + 인자 크기 구간(32바이트 워드 수)의 estimate_gas 결과를 TX_GAS_CACHE_TTL 동안
+재사용한다. 호출하는 쪽에서 여유 배수를 곱하고, 그 함수의 트랜잭션이 실패하면 항목을 지워 다시 추정한다.
+캐시된 추정치로는 revert 여부를 미리 알 수 없으므로, 결과가 컨트랙트 상태에 달린 호출(finalizeVote)은
+TxSubmitter.submit(simulate=True) 로 캐시를 거치지 않는다.
+"""
+import asyncio
+import os
+import statistics
+import threading
+import time
+from typing import Optional
+
+TX_GAS_PRICE_GWEI = os.getenv("TX_GAS_PRICE_GWEI", "30")                  # EIP-1559 / eth_gasPrice 모두 실패 시
+TX_FEE_POLL_INTERVAL = float(os.getenv("TX_FEE_POLL_INTERVAL", "12"))     # 초, 수수료 갱신 주기 (블록 시간)
+TX_FEE_MAX_AGE = float(os.getenv("TX_FEE_MAX_AGE", "60"))                 # 초, 이보다 오래된 수수료는 직접 다시 조회
+TX_FEE_IDLE_TIMEOUT = float(os.getenv("TX_FEE_IDLE_TIMEOUT", "600"))      # 초, 전송이 없으면 갱신 중단
+TX_FEE_HISTORY_BLOCKS = int(os.getenv("TX_FEE_HISTORY_BLOCKS", "5"))
+TX_PRIORITY_PERCENTILE = float(os.getenv("TX_PRIORITY_PERCENTILE", "50"))
+TX_MIN_PRIORITY_GWEI = float(os.getenv("TX_MIN_PRIORITY_GWEI", "1"))
+TX_BASE_FEE_MULTIPLIER = float(os.getenv("TX_BASE_FEE_MULTIPLIER", "2"))  # base fee 가 연속으로 올라도 포함되도록
+TX_GAS_CACHE_TTL = float(os.getenv("TX_GAS_CACHE_TTL", "600"))            # 초
+TX_GAS_CACHE_SIZE = 1000
+
+
+class FeeOracle:
+    def __init__(self, w3):
+        self.w3 = w3
+        self.current: Optional[dict] = None  # build_transaction 에 넣을 수수료 필드
+        self.updated_at = 0.0
+        self.block: Optional[int] = None     # 수수료를 계산한 최신 블록
+        self.last_used = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def fees(self) -> dict:
+        """현재 수수료 필드 ({"maxFeePerGas", "maxPriorityFeePerGas"} 또는 {"gasPrice"})."""
+        self.last_used = time.time()
+        if self.current is None or time.time() - self.updated_at > TX_FEE_MAX_AGE:
+            await self.refresh()
+        return dict(self.current)
+
+    async def refresh(self):
+        # 동시에 들어온 전송들은 하나의 조회를 함께 기다린다
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._fetch())
+        self.current = await self._refresh_task
+        self.updated_at = time.time()
+
+    async def _fetch(self) -> dict:
+        self.refreshes += 1
+        try:
+            history = await self.w3.eth.fee_history(TX_FEE_HISTORY_BLOCKS, "latest", [TX_PRIORITY_PERCENTILE])
+            base_fee = history["baseFeePerGas"][-1]  # 다음 블록의 base fee
+            if base_fee:
+                self.block = history["oldestBlock"] + len(history["gasUsedRatio"]) - 1
+                min_tip = self.w3.to_wei(TX_MIN_PRIORITY_GWEI, "gwei")
+                rewards = [reward[0] for reward in history.get("reward") or [] if reward and reward[0] > 0]
+                tip = max(int(statistics.median(rewards)) if rewards else min_tip, min_tip)
+                return {"maxFeePerGas": int(base_fee * TX_BASE_FEE_MULTIPLIER) + tip, "maxPriorityFeePerGas": tip}
+        except Exception as e:
+            print("⚠️ eth_feeHistory failed, falling back to eth_gasPrice:", e)
+        try:
+            return {"gasPrice": await self.w3.eth.gas_price}
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ eth_gasPrice failed, using TX_GAS_PRICE_GWEI={TX_GAS_PRICE_GWEI}:", e)
+            return {"gasPrice": self.w3.to_wei(TX_GAS_PRICE_GWEI, "gwei")}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(TX_FEE_POLL_INTERVAL)
+            if time.time() - self.last_used > TX_FEE_IDLE_TIMEOUT:
+                continue
+            try:
+                await self.refresh()
+            except Exception as e:
+                print("⚠️ Fee oracle refresh failed:", e)
+
+    @staticmethod
+    def bump(fees: dict, current: Optional[dict], factor: float) -> dict:
+        """재제출용 수수료: 이전 값 × factor 와 현재 수수료 중 큰 값 (노드는 두 필드 모두 10% 이상 인상을 요구)."""
+        bumped = {}
+        for key, value in fees.items():
+            bumped[key] = int(value * factor) + 1
+            if current and key in current:
+                bumped[key] = max(bumped[key], current[key])
+        if "maxFeePerGas" in bumped:
+            bumped["maxFeePerGas"] = max(bumped["maxFeePerGas"], bumped["maxPriorityFeePerGas"])
+        return bumped
+
+    def stats(self) -> dict:
+        return {
+            "fees": self.current,
+            "block": self.block,
+            "age_seconds": round(time.time() - self.updated_at, 1) if self.current else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+
+def _arg_size(value) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(32 + _arg_size(item) for item in value)
+    return 0
+
+
+class GasEstimateCache:
+    def __init__(self, ttl: float = TX_GAS_CACHE_TTL, max_size: int = TX_GAS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = {}  # (주소, 함수, 인자 크기 구간) → (추정치, 만료 시각)
+        self.pending = {}  # 키 → 진행 중인 estimate_gas
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(fn) -> tuple:
+        size_class = (sum(_arg_size(arg) for arg in fn.args) + 31) // 32
+        return (fn.address, fn.fn_name, size_class)
+
+    async def estimate(self, fn, from_address: str) -> int:
+        key = self.key(fn)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            # 같은 키로 동시에 들어온 추정은 하나의 estimate_gas 를 함께 기다린다
+            pending = self.pending.get(key)
+            owner = pending is None or pending.done()
+            if owner:
+                pending = self.pending[key] = asyncio.ensure_future(fn.estimate_gas({"from": from_address}))
+        try:
+            estimate = await pending
+        except Exception:
+            if owner:
+                raise
+            # 다른 요청의 인자로 revert 된 경우일 수 있으므로 자기 호출로 다시 추정
+            estimate = await fn.estimate_gas({"from": from_address})
+        finally:
+            with self.lock:
+                if self.pending.get(key) is pending:
+                    del self.pending[key]
+        with self.lock:
+            self.entries[key] = (estimate, now + self.ttl)
+            if len(self.entries) > self.max_size:
+                for stale in [k for k, (_, expires_at) in self.entries.items() if expires_at <= now]:
+                    del self.entries[stale]
+                while len(self.entries) > self.max_size:
+                    del self.entries[next(iter(self.entries))]
+        return estimate
+
+    def invalidate(self, fn_name: str):
+        with self.lock:
+            for key in [k for k in self.entries if k[1] == fn_name]:
+                del self.entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
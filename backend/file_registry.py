@@ -0,0 +1,268 @@
+"""trade_id → 계약서 파일 메타데이터 저장소 (SQLite, WAL).
+
+여러 uvicorn 워커가 같은 DB 파일을 공유하므로 재시작이나 워커 간에도 매핑이 유지된다.
+BlobStore 파일의 참조 수는 같은 sha256 을 가진 행의 수이며, 마지막 행이 지워질 때 파일도 지운다.
+백그라운드 스레드가 만료된 행을 timestamp 인덱스 순으로 FILE_SWEEP_BATCH 개씩 정리한다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from backend.blobstore import BlobStore
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+FILE_REGISTRY_DB_PATH = os.getenv("FILE_REGISTRY_DB_PATH", "./contract_files.db")
+FILE_EXPIRY_SECONDS = float(os.getenv("FILE_EXPIRY_SECONDS", "86400"))   # 1일
+FILE_SWEEP_INTERVAL = float(os.getenv("FILE_SWEEP_INTERVAL", "300"))     # 초
+FILE_SWEEP_BATCH = int(os.getenv("FILE_SWEEP_BATCH", "100"))             # 트랜잭션 1회당 정리할 행 수
+FILE_META_CACHE_SIZE = int(os.getenv("FILE_META_CACHE_SIZE", "10000"))   # /api/contract/view 메타데이터 캐시 크기
+FILE_META_CACHE_TTL = float(os.getenv("FILE_META_CACHE_TTL", "30"))      # 초, 다른 워커의 비공개 처리가 반영되는 최대 지연
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contract_files (
+    trade_id TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    private INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_contract_files_timestamp ON contract_files (timestamp);
+CREATE INDEX IF NOT EXISTS idx_contract_files_sha256 ON contract_files (sha256);
+CREATE TABLE IF NOT EXISTS sweep_stats (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class FileMetaCache:
+    """trade_id → {"sha256", "private", "timestamp", "path", "stat"} LRU (TTL).
+
+    이 워커에서 행이 바뀌면 즉시 지우고, 다른 워커의 변경은 TTL 이 지나면 반영된다."""
+
+    def __init__(self, max_size: int = FILE_META_CACHE_SIZE, ttl: float = FILE_META_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # trade_id → (항목, 만료 시각)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, trade_id: str) -> Optional[dict]:
+        with self.lock:
+            cached = self.entries.get(trade_id)
+            if cached is not None and cached[1] > time.time():
+                self.entries.move_to_end(trade_id)
+                self.hits += 1
+                return cached[0]
+            if cached is not None:
+                del self.entries[trade_id]
+            self.misses += 1
+            return None
+
+    def put(self, trade_id: str, entry: dict):
+        with self.lock:
+            self.entries[trade_id] = (entry, time.time() + self.ttl)
+            self.entries.move_to_end(trade_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, trade_id: str):
+        with self.lock:
+            self.entries.pop(trade_id, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class ContractFileRegistry:
+    def __init__(self, db_path: str, blobs: BlobStore):
+        self.blobs = blobs
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.meta_cache = FileMetaCache()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------------------------------------------------------- 조회/수정
+
+    def add(self, trade_id: str, sha256: str, timestamp: Optional[float] = None, private: bool = False):
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO contract_files (trade_id, sha256, timestamp, private) VALUES (?, ?, ?, ?)",
+                (trade_id, sha256.lower(), timestamp or time.time(), int(private)),
+            )
+        self.meta_cache.discard(trade_id)
+
+    def get(self, trade_id: str, default=None) -> Optional[dict]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM contract_files WHERE trade_id = ?", (trade_id,)).fetchone()
+        return self._row_to_info(row) if row else default
+
+    def view_info(self, trade_id: str) -> Optional[dict]:
+        """파일 제공용 메타데이터 + 경로 + stat. 메모리 캐시에 있으면 DB 조회와 os.stat 을 하지 않는다.
+
+        파일이 아직 없으면(업로드 저장 중) stat 은 None 이고 캐시하지 않는다. 캐시된 항목도 파일이
+        남아 있는지는 확인한다 (다른 워커의 만료 정리가 지웠으면 200 을 보낸 뒤 본문 전송이 실패하므로)."""
+        entry = self.meta_cache.get(trade_id)
+        if entry is not None:
+            if os.path.exists(entry["path"]):
+                return entry
+            self.meta_cache.discard(trade_id)
+        info = self.get(trade_id)
+        if info is None:
+            return None
+        path = self.blobs.path_for(info["sha256"])
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return {**info, "path": path, "stat": None}
+        entry = {**info, "path": path, "stat": stat}
+        self.meta_cache.put(trade_id, entry)
+        return entry
+
+    def get_many(self, trade_ids: list) -> dict:
+        if not trade_ids:
+            return {}
+        placeholders = ",".join("?" * len(trade_ids))
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT * FROM contract_files WHERE trade_id IN ({placeholders})", list(trade_ids)
+            ).fetchall()
+        return {row["trade_id"]: self._row_to_info(row) for row in rows}
+
+    def find_by_hashes(self, hashes: list) -> dict:
+        """sha256 → 그 파일을 참조하는 trade_id 목록 (만료 정리 전의 최근 업로드)."""
+        found = {}
+        hashes = [h.lower() for h in hashes]
+        with self.lock:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self.db.execute(
+                    f"SELECT trade_id, sha256 FROM contract_files WHERE sha256 IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    found.setdefault(row["sha256"], []).append(row["trade_id"])
+        return found
+
+    def set_private(self, trade_id: str, private: bool = True) -> bool:
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                "UPDATE contract_files SET private = ? WHERE trade_id = ?", (int(private), trade_id)
+            )
+        self.meta_cache.discard(trade_id)
+        return cursor.rowcount > 0
+
+    def remove(self, trade_id: str) -> int:
+        """행을 지우고, 같은 파일을 참조하는 행이 더 없으면 파일도 지운다. 해제된 바이트 수를 반환."""
+        with self.lock, self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            return self._remove_locked(trade_id)[1]
+
+    def ref_count(self, sha256: str) -> int:
+        with self.lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM contract_files WHERE sha256 = ?", (sha256.lower(),)
+            ).fetchone()[0]
+
+    def _remove_locked(self, trade_id: str):
+        """BEGIN IMMEDIATE 트랜잭션 안에서 호출. (삭제 여부, 해제된 바이트 수)를 반환."""
+        row = self.db.execute("SELECT sha256 FROM contract_files WHERE trade_id = ?", (trade_id,)).fetchone()
+        if row is None:
+            return False, 0
+        self.db.execute("DELETE FROM contract_files WHERE trade_id = ?", (trade_id,))
+        self.meta_cache.discard(trade_id)
+        still_used = self.db.execute(
+            "SELECT 1 FROM contract_files WHERE sha256 = ? LIMIT 1", (row["sha256"],)
+        ).fetchone()
+        # 쓰기 잠금을 잡은 채로 삭제 → 다른 워커가 같은 내용을 등록(add → commit)하는 것과 겹치지 않음
+        return True, 0 if still_used else self.blobs.remove(row["sha256"])
+
+    @staticmethod
+    def _row_to_info(row) -> dict:
+        return {"sha256": row["sha256"], "timestamp": row["timestamp"], "private": bool(row["private"])}
+
+    # ---------------------------------------------------------------- 만료 정리
+
+    def sweep_expired(self, max_age: float = FILE_EXPIRY_SECONDS, batch_size: int = FILE_SWEEP_BATCH) -> dict:
+        """max_age 보다 오래된 행을 batch_size 개씩 정리한다. 배치 사이에는 잠금을 놓는다."""
+        cutoff = time.time() - max_age
+        removed = freed = 0
+        while not self._stop.is_set():
+            with self.lock, self.db:
+                self.db.execute("BEGIN IMMEDIATE")
+                trade_ids = [row[0] for row in self.db.execute(
+                    "SELECT trade_id FROM contract_files WHERE timestamp < ? ORDER BY timestamp LIMIT ?",
+                    (cutoff, batch_size),
+                )]
+                results = [self._remove_locked(trade_id) for trade_id in trade_ids]
+                batch_removed = sum(1 for deleted, _ in results if deleted)
+                batch_freed = sum(size for _, size in results)
+                self._add_stats(batch_removed, batch_freed)
+            removed += batch_removed
+            freed += batch_freed
+            if len(trade_ids) < batch_size:
+                break
+        if removed:
+            print(f"🧹 Removed {removed} expired contract files ({freed} bytes freed)")
+        return {"files_removed": removed, "bytes_freed": freed}
+
+    def _add_stats(self, files_removed: int, bytes_freed: int):
+        # 워커들이 같은 DB 를 쓰므로 누적값도 DB 에 저장
+        for key, value in (("files_removed", files_removed), ("bytes_freed", bytes_freed)):
+            self.db.execute(
+                "INSERT INTO sweep_stats (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+                (key, value),
+            )
+        self.db.execute("INSERT OR REPLACE INTO sweep_stats (key, value) VALUES ('last_sweep_at', ?)", (time.time(),))
+
+    def stats(self) -> dict:
+        cutoff = time.time() - FILE_EXPIRY_SECONDS
+        with self.lock:
+            totals = dict(self.db.execute("SELECT key, value FROM sweep_stats").fetchall())
+            files, blobs, expired = self.db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT sha256), SUM(timestamp < ?) FROM contract_files", (cutoff,)
+            ).fetchone()
+        return {
+            "files": files,
+            "blobs": blobs,
+            "expired_pending": expired or 0,
+            "files_removed": int(totals.get("files_removed", 0)),
+            "bytes_freed": int(totals.get("bytes_freed", 0)),
+            "last_sweep_at": totals.get("last_sweep_at"),
+        }
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                print("⚠️ File sweep failed:", e)
+            self._stop.wait(FILE_SWEEP_INTERVAL)
+
+
+contract_files = ContractFileRegistry(FILE_REGISTRY_DB_PATH, BlobStore(UPLOAD_DIR))
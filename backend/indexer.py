@@ -0,0 +1,832 @@
+"""ContractRegistry / SecondDAO 이벤트 로그를 로컬 SQLite 에 쌓아두는 인덱서.
+
+백그라운드 스레드가 eth_getLogs 를 블록 구간 단위로 따라가며 이벤트를 events 테이블에
+저장하고, 이를 순서대로 적용해 trades / dao_results / dao_votes 상태 테이블을 만든다.
+체크포인트 블록의 해시가 바뀌면(reorg) 최근 INDEX_REORG_DEPTH 블록을 되돌린 뒤
+저장된 이벤트로 상태를 다시 만든다.
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from fastapi.responses import StreamingResponse
+from web3 import Web3
+
+from backend.contract import w3, contract, dao_contract, batch_rpc, batch_call, format_contract_record
+from backend.contract import async_contract, batch_call_async, get_trades_from_chain_async, view_cache
+from backend.contract import async_dao_contract
+from backend.file_registry import contract_files
+from backend.event_hub import event_hub
+from backend.vote_matrix import VoteMatrix
+from backend.trade_stats import TradeStats
+
+INDEX_DB_PATH = os.getenv("INDEX_DB_PATH", "./chain_index.db")
+INDEX_START_BLOCK = os.getenv("INDEX_START_BLOCK")                   # 컨트랙트 배포 블록, 없으면 eth_getCode 로 찾는다
+INDEX_LOG_CHUNK = int(os.getenv("INDEX_LOG_CHUNK", "2000"))         # eth_getLogs 1회 블록 범위
+INDEX_POLL_INTERVAL = float(os.getenv("INDEX_POLL_INTERVAL", "5"))  # 초
+INDEX_REORG_DEPTH = int(os.getenv("INDEX_REORG_DEPTH", "12"))       # reorg 시 되돌릴 블록 수
+INDEX_MAX_STALENESS = float(os.getenv("INDEX_MAX_STALENESS", "30")) # 초, 0 이면 인덱스 미사용
+TRADE_PAGE_SIZE = int(os.getenv("TRADE_PAGE_SIZE", "100"))          # 스트리밍 응답에서 한 번에 조회할 trade 수
+HASH_LOOKUP_CHUNK = 500                                             # 해시 조회 IN 절 1회당 값 수
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    trade_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS trades (
+    trade_id TEXT PRIMARY KEY,
+    contract_hash TEXT,
+    asset_id TEXT,
+    registrant TEXT,
+    party_a TEXT,
+    party_b TEXT,
+    timestamp INTEGER,
+    block_number INTEGER,
+    log_index INTEGER,
+    status TEXT NOT NULL,
+    approved_a INTEGER NOT NULL DEFAULT 0,
+    approved_b INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_trades_order ON trades (block_number, log_index);
+CREATE INDEX IF NOT EXISTS idx_trades_contract_hash ON trades (contract_hash);
+CREATE INDEX IF NOT EXISTS idx_events_trade_id ON events (trade_id);
+CREATE TABLE IF NOT EXISTS unresolved_registrations (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS participants (
+    address TEXT NOT NULL,
+    trade_id TEXT NOT NULL,
+    PRIMARY KEY (address, trade_id)
+);
+CREATE TABLE IF NOT EXISTS dao_results (
+    trade_id TEXT PRIMARY KEY,
+    yes_votes INTEGER NOT NULL DEFAULT 0,
+    no_votes INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS dao_votes (
+    trade_id TEXT NOT NULL,
+    voter TEXT NOT NULL,
+    approved INTEGER NOT NULL,
+    PRIMARY KEY (trade_id, voter)
+);
+"""
+
+REGISTRY_EVENTS = ["ContractRegistered", "ContractApproved", "ContractRejected"]
+DAO_EVENTS = ["Voted", "VoteFinalized"]
+
+
+def _event_topic(event_abi: dict) -> str:
+    types = ",".join(i["type"] for i in event_abi["inputs"])
+    return Web3.to_hex(Web3.keccak(text=f"{event_abi['name']}({types})"))
+
+
+def _find_deploy_block(address: str, head: int) -> int:
+    """address 에 코드가 생긴 첫 블록 (eth_getCode 이분 탐색, 과거 상태를 조회할 수 있는 노드 필요)."""
+    try:
+        if not w3.eth.get_code(address, head):
+            raise RuntimeError(f"{address} 에 배포된 컨트랙트가 없습니다.")
+        low, high = 0, head
+        while low < high:
+            middle = (low + high) // 2
+            if w3.eth.get_code(address, middle):
+                high = middle
+            else:
+                low = middle + 1
+    except ValueError as e:
+        raise RuntimeError(
+            f"배포 블록을 찾지 못했습니다 ({e}). INDEX_START_BLOCK 을 컨트랙트 배포 블록으로 설정하세요."
+        ) from e
+    return low
+
+
+class ChainIndex:
+    def __init__(self, db_path: str):
+        # 연결 하나를 동기화 스레드와 요청 스레드가 같이 쓰므로 모든 쿼리는 self.lock 안에서 실행한다
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.votes = VoteMatrix()  # dao_votes 의 메모리 사본 (lock 으로 보호)
+        self.stats = TradeStats(self.db)  # 관리자 통계 누적 집계
+        if (self.db.execute("SELECT 1 FROM participants LIMIT 1").fetchone() is None
+                or self.db.execute("SELECT 1 FROM stats_counters LIMIT 1").fetchone() is None):
+            # 주소 인덱스 / 통계 집계가 생기기 전에 만들어진 DB 라면 저장된 이벤트로 채운다
+            with self.db:
+                self._rebuild_state()
+        else:
+            for row in self.db.execute("SELECT * FROM dao_votes"):
+                self.votes.record(row["trade_id"], row["voter"], bool(row["approved"]))
+        self.start_block: Optional[int] = None  # 인덱싱 시작 블록 (배포 블록)
+        self.last_synced_at = 0.0
+        self.on_events = None  # 적용한 이벤트 메시지 목록을 받을 콜백 (구독 허브)
+        self._stop = threading.Event()
+        self._thread = None
+
+        # topic0 → (컨트랙트, 이벤트 이름)
+        self.topics = {}
+        for target, names in ((contract, REGISTRY_EVENTS), (dao_contract, DAO_EVENTS)):
+            for name in names:
+                self.topics[_event_topic(target.events[name]().abi)] = (target, name)
+
+    # ---------------------------------------------------------------- 동기화
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                print("⚠️ Indexer sync failed:", e)
+            self._stop.wait(INDEX_POLL_INTERVAL)
+
+    def sync_once(self):
+        head = w3.eth.block_number
+        view_cache.observe_block(head)  # 새 블록이면 조회 캐시 무효화
+        self._resolve_start_block(head)
+        checkpoint = self._get_meta("checkpoint_block")
+        if checkpoint is not None:
+            checkpoint = self._check_reorg(int(checkpoint), head)
+
+        from_block = checkpoint + 1 if checkpoint is not None else self.start_block
+        synced = False
+        while from_block <= head:
+            to_block = min(from_block + INDEX_LOG_CHUNK - 1, head)
+            logs = w3.eth.get_logs({
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": [contract.address, dao_contract.address],
+            })
+            events = self._decode_logs(logs)
+            # tradeId 를 아직 복원하지 못한 등록은 topic 해시로 보관해 두고 다음 동기화 때 다시 시도한다
+            unresolved = [e for e in events if e["trade_id"] is None]
+            events = [e for e in events if e["trade_id"] is not None]
+            self._add_block_timestamps(events)
+            block_hash = Web3.to_hex(w3.eth.get_block(to_block)["hash"])
+
+            messages = []
+            with self.lock, self.db:
+                for event in unresolved:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO unresolved_registrations VALUES (?, ?, ?, ?, ?, ?)",
+                        (event["block_number"], event["log_index"], event["block_hash"], event["tx_hash"],
+                         event["topic"], json.dumps(event["payload"])),
+                    )
+                for event in events:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (event["block_number"], event["log_index"], event["block_hash"], event["tx_hash"],
+                         event["event"], event["trade_id"], json.dumps(event["payload"])),
+                    )
+                    self._apply_event(event)
+                    messages.append(self._event_message(event))
+                self._set_meta("checkpoint_block", to_block)
+                self._set_meta("checkpoint_hash", block_hash)
+            if unresolved:
+                print(f"⚠️ {len(unresolved)} ContractRegistered event(s) in blocks {from_block}-{to_block}"
+                      " could not be matched to a tradeId yet; retrying after the next sync")
+            if messages and self.on_events:
+                self.on_events(messages)
+            from_block = to_block + 1
+            synced = True
+
+        if synced:
+            self._retry_unresolved()
+        self.last_synced_at = time.time()
+
+    def _retry_unresolved(self):
+        """보관해 둔 미복원 등록을 다시 복원한다. 이후 이벤트(Rejected / Voted 등)의 평문 tradeId 도 후보로 쓴다.
+
+        복원되면 events 에 넣고 저장된 이벤트로 상태를 다시 만든다 (그 사이 적용된 이후 이벤트가 없는 행을
+        갱신했을 수 있으므로)."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT * FROM unresolved_registrations ORDER BY block_number, log_index"
+            ).fetchall()
+            if not rows:
+                return
+            known_ids = {row["trade_id"] for row in self.db.execute(
+                "SELECT DISTINCT trade_id FROM events WHERE event != 'ContractRegistered'"
+            )}
+        events = [{
+            "block_number": row["block_number"],
+            "log_index": row["log_index"],
+            "block_hash": row["block_hash"],
+            "tx_hash": row["tx_hash"],
+            "event": "ContractRegistered",
+            "trade_id": row["topic"],
+            "payload": json.loads(row["payload"]),
+        } for row in rows]
+        self._resolve_registrations(events, known_ids)
+        resolved = [e for e in events if e["trade_id"] is not None]
+        if not resolved:
+            return
+
+        with self.lock, self.db:
+            for event in resolved:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (event["block_number"], event["log_index"], event["block_hash"], event["tx_hash"],
+                     event["event"], event["trade_id"], json.dumps(event["payload"])),
+                )
+                self.db.execute(
+                    "DELETE FROM unresolved_registrations WHERE block_number = ? AND log_index = ?",
+                    (event["block_number"], event["log_index"]),
+                )
+            self._rebuild_state()
+            messages = [self._event_message(event) for event in resolved]
+        print(f"🔎 Resolved {len(resolved)} pending registration(s): {', '.join(e['trade_id'] for e in resolved)}")
+        if self.on_events:
+            self.on_events(messages)
+
+    def _resolve_start_block(self, head: int):
+        """INDEX_START_BLOCK 이 없으면 두 컨트랙트의 배포 블록을 찾아 meta 에 저장해 둔다 (처음 한 번)."""
+        if self.start_block is not None:
+            return
+        if INDEX_START_BLOCK:
+            self.start_block = int(INDEX_START_BLOCK)
+            return
+        stored = self._get_meta("start_block")
+        if stored is not None:
+            self.start_block = int(stored)
+            return
+        start_block = min(_find_deploy_block(target.address, head) for target in (contract, dao_contract))
+        with self.lock, self.db:
+            self._set_meta("start_block", start_block)
+        self.start_block = start_block
+        print(f"🔎 Contracts deployed at block {start_block}; indexing from there (INDEX_START_BLOCK not set)")
+
+    def _check_reorg(self, checkpoint: int, head: int) -> Optional[int]:
+        """체크포인트 블록 해시가 체인과 다르면 INDEX_REORG_DEPTH 만큼 되돌린다."""
+        stored_hash = self._get_meta("checkpoint_hash")
+        if checkpoint <= head and Web3.to_hex(w3.eth.get_block(checkpoint)["hash"]) == stored_hash:
+            return checkpoint
+
+        fork_block = min(checkpoint, head) - INDEX_REORG_DEPTH
+        # 되돌린 지점 아래의 이벤트도 블록 해시가 바뀌었다면 더 깊이 되돌린다
+        while fork_block >= self.start_block:
+            with self.lock:
+                row = self.db.execute(
+                    "SELECT block_number, block_hash FROM events WHERE block_number <= ?"
+                    " ORDER BY block_number DESC LIMIT 1",
+                    (fork_block,),
+                ).fetchone()
+            if row is None or Web3.to_hex(w3.eth.get_block(row["block_number"])["hash"]) == row["block_hash"]:
+                break
+            fork_block = row["block_number"] - 1
+        print(f"⚠️ Reorg detected at block {checkpoint}, rewinding to {fork_block}")
+        view_cache.invalidate()  # 블록 번호가 같아도 상태가 달라졌을 수 있음
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM events WHERE block_number > ?", (fork_block,))
+            self.db.execute("DELETE FROM unresolved_registrations WHERE block_number > ?", (fork_block,))
+            if fork_block < self.start_block:
+                self.db.execute("DELETE FROM meta WHERE key IN ('checkpoint_block', 'checkpoint_hash')")
+                fork_block = None
+            else:
+                self._set_meta("checkpoint_block", fork_block)
+                self._set_meta("checkpoint_hash", Web3.to_hex(w3.eth.get_block(fork_block)["hash"]))
+            self._rebuild_state()
+        if self.on_events:
+            self.on_events([{"event": "reorg", "block_number": fork_block}])
+        return fork_block
+
+    def _rebuild_state(self):
+        # participants 는 서버가 직접 기록한 등록분도 담고 있으므로 지우지 않는다
+        self.db.execute("DELETE FROM trades")
+        self.db.execute("DELETE FROM dao_results")
+        self.db.execute("DELETE FROM dao_votes")
+        self.votes.clear()
+        self.stats.clear()
+        rows = self.db.execute("SELECT * FROM events ORDER BY block_number, log_index").fetchall()
+        for row in rows:
+            event = dict(row)
+            event["payload"] = json.loads(row["payload"])
+            self._apply_event(event)
+
+    def _decode_logs(self, logs) -> list:
+        events = []
+        for log in logs:
+            if not log["topics"]:
+                continue
+            target = self.topics.get(Web3.to_hex(log["topics"][0]))
+            if not target:
+                continue
+            contract_obj, name = target
+            args = contract_obj.events[name]().process_log(log)["args"]
+
+            if name == "ContractRegistered":
+                # tradeId 는 indexed string 이라 해시만 남으므로 트랜잭션 입력에서 복원한다
+                trade_id = Web3.to_hex(log["topics"][1])
+                payload = {
+                    "contractHash": args["contractHash"],
+                    "assetId": args["assetId"],
+                    "registrant": args["registrant"],
+                    "timestamp": args["timestamp"],
+                }
+            elif name == "Voted":
+                trade_id = args["tradeId"]
+                payload = {"voter": args["voter"], "approved": args["approved"]}
+            elif name == "VoteFinalized":
+                trade_id = args["tradeId"]
+                payload = {"passed": args["passed"]}
+            else:
+                trade_id = args["tradeId"]
+                payload = {}
+
+            events.append({
+                "block_number": log["blockNumber"],
+                "log_index": log["logIndex"],
+                "block_hash": Web3.to_hex(log["blockHash"]),
+                "tx_hash": Web3.to_hex(log["transactionHash"]),
+                "event": name,
+                "trade_id": trade_id,
+                "payload": payload,
+            })
+
+        # 같은 구간의 다른 이벤트(Rejected / Voted 등)는 tradeId 를 평문으로 담고 있어 복원 후보가 된다
+        self._resolve_registrations(
+            [e for e in events if e["event"] == "ContractRegistered"],
+            {e["trade_id"] for e in events if e["event"] != "ContractRegistered"},
+        )
+        return events
+
+    @staticmethod
+    def _add_block_timestamps(events: list):
+        """등록 외 이벤트의 payload 에 블록 시각(blockTimestamp)을 넣는다 (일/주 통계, 처리 시간용)."""
+        blocks = sorted({e["block_number"] for e in events if e["event"] != "ContractRegistered"})
+        if not blocks:
+            return
+        replies = batch_rpc("eth_getBlockByNumber", [[hex(number), False] for number in blocks])
+        timestamps = {number: int(block["timestamp"], 16) for number, block in zip(blocks, replies) if block}
+        for event in events:
+            if event["event"] != "ContractRegistered" and event["block_number"] in timestamps:
+                event["payload"]["blockTimestamp"] = timestamps[event["block_number"]]
+
+    def _resolve_registrations(self, events: list, known_ids=()):
+        """ContractRegistered 의 tradeId/당사자 주소를 registerContract 트랜잭션 입력에서 채운다.
+
+        복원하지 못한 이벤트는 trade_id 가 None 이 되고 topic 에 tradeId 해시가 남는다."""
+        if not events:
+            return
+        txs = batch_rpc("eth_getTransactionByHash", [[e["tx_hash"]] for e in events])
+        unresolved = []
+        for event, tx in zip(events, txs):
+            topic = event["trade_id"]
+            try:
+                fn, params = contract.decode_function_input(tx["input"])
+                if Web3.to_hex(Web3.keccak(text=params["_tradeId"])) != topic:
+                    raise ValueError("tradeId hash mismatch")
+                event["trade_id"] = params["_tradeId"]
+                event["payload"]["partyA"] = params["_partyA"]
+                event["payload"]["partyB"] = params["_partyB"]
+            except Exception:
+                unresolved.append(event)
+
+        if unresolved:
+            # 다른 컨트랙트를 거쳐 등록되었거나 트랜잭션 응답이 없는 경우: 전체 tradeId 목록과
+            # 이미 본 평문 tradeId 의 해시로 매칭 (거절되어 목록에서 지워진 trade 는 ContractRejected 로 찾는다)
+            by_topic = {
+                Web3.to_hex(Web3.keccak(text=trade_id)): trade_id
+                for trade_id in [*contract.functions.getAllTradeIds().call(), *known_ids]
+            }
+            for event in unresolved:
+                event["topic"] = event["trade_id"]
+                event["trade_id"] = by_topic.get(event["topic"])
+            resolved = [e for e in unresolved if e["trade_id"] is not None]
+            voters = batch_call([contract.functions.getVoters(e["trade_id"]) for e in resolved])
+            for event, parties in zip(resolved, voters):
+                event["payload"]["partyA"], event["payload"]["partyB"] = parties or (None, None)
+
+    def _apply_event(self, event: dict):
+        name, trade_id, payload = event["event"], event["trade_id"], event["payload"]
+        if name == "ContractRegistered":
+            self.db.execute(
+                "INSERT OR REPLACE INTO trades (trade_id, contract_hash, asset_id, registrant, party_a, party_b,"
+                " timestamp, block_number, log_index, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'registered')",
+                (trade_id, payload["contractHash"], payload["assetId"], payload["registrant"],
+                 payload["partyA"], payload["partyB"], payload["timestamp"],
+                 event["block_number"], event["log_index"]),
+            )
+            self._add_participants(trade_id, payload["partyA"], payload["partyB"])
+        elif name == "ContractApproved":
+            self.db.execute(
+                "UPDATE trades SET status = 'approved', approved_a = 1, approved_b = 1 WHERE trade_id = ?",
+                (trade_id,),
+            )
+        elif name == "ContractRejected":
+            # 컨트랙트에서 삭제된 trade 는 조회 대상에서 제외
+            self.db.execute("UPDATE trades SET status = 'rejected' WHERE trade_id = ?", (trade_id,))
+        elif name == "Voted":
+            self.db.execute("INSERT OR IGNORE INTO dao_results (trade_id) VALUES (?)", (trade_id,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO dao_votes VALUES (?, ?, ?)",
+                (trade_id, payload["voter"].lower(), int(payload["approved"])),
+            )
+            self.votes.record(trade_id, payload["voter"], payload["approved"])
+            column = "yes_votes" if payload["approved"] else "no_votes"
+            self.db.execute(f"UPDATE dao_results SET {column} = {column} + 1 WHERE trade_id = ?", (trade_id,))
+        elif name == "VoteFinalized":
+            self.db.execute("INSERT OR IGNORE INTO dao_results (trade_id) VALUES (?)", (trade_id,))
+            self.db.execute(
+                "UPDATE dao_results SET processed = 1, passed = ? WHERE trade_id = ?",
+                (int(payload["passed"]), trade_id),
+            )
+
+        registered_at = None
+        if name in ("ContractApproved", "ContractRejected", "VoteFinalized"):
+            row = self.db.execute("SELECT timestamp FROM trades WHERE trade_id = ?", (trade_id,)).fetchone()
+            registered_at = row["timestamp"] if row else None
+        self.stats.apply(event, registered_at)
+
+    def _event_message(self, event: dict, parties=None) -> dict:
+        """구독자에게 보낼 메시지. addresses 는 trade 당사자 (+ DAO 투표자) — 주소 구독 매칭용."""
+        if parties is None:
+            row = self.db.execute("SELECT party_a, party_b FROM trades WHERE trade_id = ?", (event["trade_id"],)).fetchone()
+            parties = (row["party_a"], row["party_b"]) if row else ()
+        addresses = [address.lower() for address in parties if address]
+        if event["event"] == "Voted":
+            addresses.append(event["payload"]["voter"].lower())
+        return {
+            "event": event["event"],
+            "trade_id": event["trade_id"],
+            "block_number": event["block_number"],
+            "log_index": event["log_index"],
+            "tx_hash": event["tx_hash"],
+            "payload": event["payload"],
+            "addresses": addresses,
+        }
+
+    def _add_participants(self, trade_id: str, *addresses):
+        for address in addresses:
+            if address:
+                self.db.execute("INSERT OR IGNORE INTO participants VALUES (?, ?)", (address.lower(), trade_id))
+
+    def record_registration(self, trade_id: str, party_a: str, party_b: str):
+        """register_contract_on_chain_async 로 보낸 등록을 채굴 전에 주소 인덱스에 반영한다."""
+        with self.lock, self.db:
+            self._add_participants(trade_id, party_a, party_b)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    # ---------------------------------------------------------------- 조회
+
+    def is_fresh(self) -> bool:
+        """마지막 동기화가 INDEX_MAX_STALENESS 초 이내일 때만 인덱스로 응답한다."""
+        return INDEX_MAX_STALENESS > 0 and time.time() - self.last_synced_at <= INDEX_MAX_STALENESS
+
+    def get_trades(
+        self,
+        party: Optional[str] = None,
+        finalized: Optional[bool] = None,
+        dao_processed: Optional[bool] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> list:
+        """get_trades_from_chain 과 같은 형식으로 인덱스에서 trade 목록을 조회한다.
+
+        after 가 주어지면 그 trade 다음(등록 순서)부터 조회한다 (커서 페이지네이션)."""
+        query = "SELECT t.*, COALESCE(d.processed, 0) AS dao_processed, COALESCE(d.passed, 0) AS dao_passed FROM trades t"
+        params = []
+        if party:
+            query += " JOIN participants p ON p.trade_id = t.trade_id AND p.address = ?"
+            params.append(party.lower())
+        query += " LEFT JOIN dao_results d ON d.trade_id = t.trade_id WHERE t.status != 'rejected'"
+        if finalized is not None:
+            query += " AND t.status = 'approved'" if finalized else " AND t.status != 'approved'"
+        if dao_processed is not None:
+            query += " AND COALESCE(d.processed, 0) = ?"
+            params.append(int(dao_processed))
+        if after is not None:
+            query += " AND (t.block_number, t.log_index) > (SELECT block_number, log_index FROM trades WHERE trade_id = ?)"
+            params.append(after)
+        query += " ORDER BY t.block_number, t.log_index LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, offset]
+
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+        return [self._row_to_trade(row) for row in rows]
+
+    def find_by_hashes(self, hashes: list) -> list:
+        """contract_hash 가 hashes 중 하나인 trade 목록."""
+        query = (
+            "SELECT t.*, COALESCE(d.processed, 0) AS dao_processed, COALESCE(d.passed, 0) AS dao_passed FROM trades t"
+            " LEFT JOIN dao_results d ON d.trade_id = t.trade_id WHERE t.status != 'rejected' AND t.contract_hash IN ({marks})"
+        )
+        hashes = list(hashes)
+        rows = []
+        with self.lock:
+            # SQLite 바인딩 변수 수 제한 때문에 나누어 조회
+            for start in range(0, len(hashes), HASH_LOOKUP_CHUNK):
+                chunk = hashes[start:start + HASH_LOOKUP_CHUNK]
+                rows += self.db.execute(query.format(marks=",".join("?" * len(chunk))), chunk).fetchall()
+        return [self._row_to_trade(row) for row in rows]
+
+    def events_after(self, block_number: int, log_index: int, limit: int) -> list:
+        """(block_number, log_index) 다음부터의 이벤트 메시지 (SSE 재연결 시 다시 보낼 목록)."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT e.*, t.party_a, t.party_b FROM events e LEFT JOIN trades t ON t.trade_id = e.trade_id"
+                " WHERE (e.block_number, e.log_index) > (?, ?) ORDER BY e.block_number, e.log_index LIMIT ?",
+                (block_number, log_index, limit),
+            ).fetchall()
+        messages = []
+        for row in rows:
+            event = dict(row)
+            event["payload"] = json.loads(row["payload"])
+            messages.append(self._event_message(event, (row["party_a"], row["party_b"])))
+        return messages
+
+    def get_stats(self, days: int, weeks: int) -> dict:
+        with self.lock:
+            stats = self.stats.snapshot(days, weeks)
+        stats["indexed_at"] = int(self.last_synced_at) or None
+        return stats
+
+    def get_participation(self, address: str) -> set:
+        """주소가 partyA/partyB 로 참여한 trade_id 집합 (미채굴 등록 포함)."""
+        with self.lock:
+            rows = self.db.execute("SELECT trade_id FROM participants WHERE address = ?", (address.lower(),)).fetchall()
+        return {row["trade_id"] for row in rows}
+
+    def has_trade(self, trade_id: str) -> bool:
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM trades WHERE trade_id = ?", (trade_id,)).fetchone() is not None
+
+    def indexed_registrations(self, trade_ids: list) -> set:
+        """trade_ids 중 ContractRegistered 이벤트가 인덱스에 반영된 것 (참여 주소를 인덱스로 알 수 있는 trade)."""
+        found = set()
+        with self.lock:
+            for start in range(0, len(trade_ids), HASH_LOOKUP_CHUNK):
+                chunk = trade_ids[start:start + HASH_LOOKUP_CHUNK]
+                rows = self.db.execute(
+                    "SELECT trade_id FROM events WHERE event = 'ContractRegistered'"
+                    f" AND trade_id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(row["trade_id"] for row in rows)
+        return found
+
+    def get_vote_matrix(self, trade_ids: list, voters: list) -> VoteMatrix:
+        """trade_ids 의 투표 행렬 사본. voters(getVotersList) 순서로 비트 위치를 맞춘다."""
+        with self.lock:
+            self.votes.sync_voters(voters)
+            return self.votes.subset(trade_ids)
+
+    def has_votes(self, trade_id: str) -> bool:
+        with self.lock:
+            return self.votes.has_votes(trade_id)
+
+    @staticmethod
+    def _row_to_trade(row) -> dict:
+        data = format_contract_record(
+            (row["contract_hash"], row["asset_id"], row["registrant"], row["timestamp"]),
+            (row["party_a"], row["party_b"]),
+        )
+        data.update({
+            "trade_id": row["trade_id"],
+            "approvedA": bool(row["approved_a"]),
+            "approvedB": bool(row["approved_b"]),
+            "finalized": row["status"] == "approved",
+            "daoProcessed": bool(row["dao_processed"]),
+            "daoPassed": bool(row["dao_passed"]),
+        })
+        return data
+
+
+chain_index = ChainIndex(INDEX_DB_PATH)
+chain_index.on_events = event_hub.publish
+
+
+def encode_cursor(trade_id: str) -> str:
+    return base64.urlsafe_b64encode(trade_id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """커서 → 마지막으로 받은 trade_id. 형식이 잘못되었으면 ValueError."""
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+async def resolve_cursor(cursor: Optional[str]) -> Optional[str]:
+    """커서를 trade_id 로 바꾸고 존재하는 trade 인지 확인한다. 잘못된 커서면 ValueError."""
+    if cursor is None:
+        return None
+    after = decode_cursor(cursor)
+    if not chain_index.has_trade(after) and after not in await async_contract.functions.getAllTradeIds().call():
+        raise ValueError("Invalid cursor")
+    return after
+
+
+def next_cursor(trades: list, limit: Optional[int]) -> Optional[str]:
+    # limit 만큼 채워졌을 때만 다음 페이지가 있을 수 있다
+    if limit is None or len(trades) < limit or not trades:
+        return None
+    return encode_cursor(trades[-1]["trade_id"])
+
+
+def _use_index(after: Optional[str]) -> bool:
+    # 커서의 trade 가 아직 인덱싱되지 않았다면 체인에서 이어서 조회
+    return chain_index.is_fresh() and (after is None or chain_index.has_trade(after))
+
+
+async def _live_trade_ids(party: Optional[str], after: Optional[str]) -> Optional[list]:
+    """체인 조회 대상 trade_id 목록. party 도 after 도 없으면 None (전체)."""
+    if not party and after is None:
+        return None
+    all_trade_ids = await async_contract.functions.getAllTradeIds().call()
+    start = 0
+    if after is not None:
+        if after not in all_trade_ids:
+            raise ValueError("Invalid cursor")
+        start = all_trade_ids.index(after) + 1
+    if not party:
+        return all_trade_ids[start:]
+    candidates = all_trade_ids[start:]
+    known = chain_index.get_participation(party)
+    # 위치가 아니라 trade_id 로 판단한다: 등록 이벤트가 인덱스에 없는 trade 는 당사자를 모르므로 모두 조회
+    indexed = chain_index.indexed_registrations(candidates)
+    return [trade_id for trade_id in candidates if trade_id in known or trade_id not in indexed]
+
+
+async def load_trades(
+    party: Optional[str] = None,
+    finalized: Optional[bool] = None,
+    dao_processed: Optional[bool] = None,
+    with_contract: bool = True,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+) -> list:
+    """인덱스가 충분히 최신이면 인덱스에서, 아니면 체인에서 직접 trade 목록을 조회한다.
+
+    체인 조회 시 party 가 주어지면 주소 인덱스에 있는 trade 와 등록 이벤트가 아직 인덱싱되지 않은
+    trade 만 조회하므로, 비용이 전체 trade 수가 아닌 사용자 trade 수에 비례한다.
+    after(trade_id) 가 주어지면 그 다음 trade 부터 조회한다.
+    """
+    filters = {"party": party, "finalized": finalized, "dao_processed": dao_processed, "offset": offset, "limit": limit}
+    if _use_index(after):
+        return chain_index.get_trades(after=after, **filters)
+
+    trade_ids = await _live_trade_ids(party, after)
+    return await get_trades_from_chain_async(trade_ids=trade_ids, with_contract=with_contract, **filters)
+
+
+async def find_trades_by_hashes(hashes: list) -> dict:
+    """SHA256 → 그 계약서로 등록된 trade 목록 (요청한 모든 해시를 한 번에 조회).
+
+    인덱스가 최신이면 contract_hash 인덱스에서, 아니면 체인의 전체 trade 를
+    한 번만 읽어 대조한다. 아직 채굴/인덱싱되지 않은 최근 등록은 업로드 기록으로 찾아 pending 으로 표시한다."""
+    hashes = list(dict.fromkeys(h.lower() for h in hashes))
+    if _use_index(None):
+        trades = chain_index.find_by_hashes(hashes)
+    else:
+        trades = await load_trades()
+
+    found = {h: [] for h in hashes}
+    matched = set()
+    for trade in trades:
+        sha256 = (trade["contractHash"] or "").lower()
+        if sha256 not in found:
+            continue
+        trade = dict(trade, status="approved" if trade["finalized"] else "registered")
+        found[sha256].append(trade)
+        matched.add(trade["trade_id"])
+
+    for sha256, trade_ids in contract_files.find_by_hashes(hashes).items():
+        for trade_id in trade_ids:
+            # 거절되어 인덱스에서 제외된 trade 는 pending 으로 보이지 않게 한다
+            if trade_id not in matched and not chain_index.has_trade(trade_id):
+                found[sha256].append({"trade_id": trade_id, "status": "pending"})
+    return found
+
+
+async def iter_trade_pages(
+    party: Optional[str] = None,
+    finalized: Optional[bool] = None,
+    dao_processed: Optional[bool] = None,
+    with_contract: bool = True,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+    page_size: int = TRADE_PAGE_SIZE,
+):
+    """load_trades 와 같은 결과를 page_size 단위로 나누어, 조회가 끝나는 대로 한 페이지씩 내보낸다."""
+    remaining = limit
+    if _use_index(after):
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = chain_index.get_trades(party, finalized, dao_processed, limit=size, after=after)
+            if page:
+                yield page
+            if len(page) < size:
+                return
+            after = page[-1]["trade_id"]
+            if remaining is not None:
+                remaining -= len(page)
+        return
+
+    trade_ids = await _live_trade_ids(party, after)
+    if trade_ids is None:
+        trade_ids = await async_contract.functions.getAllTradeIds().call()
+    for start in range(0, len(trade_ids), page_size):
+        page = await get_trades_from_chain_async(
+            party=party, finalized=finalized, dao_processed=dao_processed, with_contract=with_contract,
+            trade_ids=trade_ids[start:start + page_size], limit=remaining,
+        )
+        if page:
+            yield page
+        if remaining is not None:
+            remaining -= len(page)
+            if remaining <= 0:
+                return
+
+
+def ndjson_trades_response(pages, transform: Callable[[list], list], limit: Optional[int]) -> StreamingResponse:
+    """iter_trade_pages 결과를 NDJSON 으로 스트리밍한다 (한 줄에 trade 하나).
+
+    마지막 줄은 {"next_cursor": ...} 이다."""
+    async def body():
+        last = None
+        count = 0
+        async for page in pages:
+            for data in transform(page):
+                yield json.dumps(data, ensure_ascii=False) + "\n"
+                last = data
+                count += 1
+        cursor = encode_cursor(last["trade_id"]) if limit is not None and count >= limit and last else None
+        yield json.dumps({"next_cursor": cursor}) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+async def load_vote_matrix(trade_ids: list, voters: list, fresh: bool = False) -> VoteMatrix:
+    """trade_ids × voters(getVotersList) 투표 행렬.
+
+    인덱스가 최신이면 메모리에서 바로 만든다. 아니면 trade × 투표자별 getVoterVote 를 JSON-RPC batch 로
+    조회해 채운다 (RPC_BATCH_SIZE 개씩 묶으므로 왕복 횟수는 호출 수 / 배치 크기).
+    fresh=True 면 인덱스와 조회 캐시를 거치지 않고 체인의 현재 상태를 읽는다 (트랜잭션 전 검증용)."""
+    if chain_index.is_fresh() and not fresh:
+        return chain_index.get_vote_matrix(trade_ids, voters)
+
+    matrix = VoteMatrix(voters)
+    if trade_ids:
+        results = await batch_call_async([
+            dao_contract.functions.getVoterVote(trade_id, voter)
+            for trade_id in trade_ids
+            for voter in voters
+        ], fresh=fresh)
+        it = iter(results)
+        for trade_id in trade_ids:
+            for voter in voters:
+                vote = next(it)
+                if vote is not None and vote[0]:
+                    matrix.record(trade_id, voter, vote[1])
+    return matrix
+
+
+async def has_dao_votes(trade_id: str) -> bool:
+    """최소 한 명이 투표했는지. 투표는 취소되지 않으므로 행렬에 있으면 바로 True,
+    없으면(아직 인덱싱 전일 수 있음) getVoteResult 한 번으로 체인에서 확인한다."""
+    if chain_index.has_votes(trade_id):
+        return True
+    yes_votes, no_votes, _, _ = await async_dao_contract.functions.getVoteResult(trade_id).call()
+    return yes_votes + no_votes > 0
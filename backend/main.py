@@ -1,31 +1,72 @@
 from fastapi import FastAPI, UploadFile, Form, HTTPException, Query, Request, Depends, File
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.security import HTTPBearer
 from fastapi.middleware.cors import CORSMiddleware
-from backend.utils import generate_pdf_hash, generate_trade_id
-from backend.contract import register_contract_on_chain, get_contract_from_chain, contract, dao_contract, contract_files
+from backend.utils import generate_trade_id, hash_pdf_stream, InvalidPdfError, UploadTooLargeError, etag_matches
+from backend.file_registry import contract_files
+from backend.contract import register_contract_on_chain_async, get_contract_from_chain_async, artifacts
+from backend.contract import open_rpc_session, close_rpc_session, tx_submitter, tx_tracker
+from backend.contract import rpc_pool, view_cache, receipt_cache
+from backend.indexer import chain_index, load_trades, iter_trade_pages, ndjson_trades_response, find_trades_by_hashes
+from backend.indexer import resolve_cursor, next_cursor
 from backend.auth import router as auth_router
-from backend.auth import verify_jwt_token
-import json
+from backend.auth import verify_jwt_token, authenticate
+from backend.token_cache import token_cache
+import asyncio
+import hmac
 import os
+import re
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request as StarletteRequest
+from concurrent.futures import ThreadPoolExecutor
+from starlette.concurrency import run_in_threadpool
 from backend.contract import router as contract_router
-from typing import Optional
+from typing import List, Optional
 from web3 import Web3
-from backend.contract import w3 as web3
 from backend.admin import admin_router
+from backend.metrics import MetricsMiddleware, registry as metrics_registry, timed
+from backend.metrics import UPLOAD_BYTES, UPLOAD_HASH_SECONDS, UPLOAD_STORE_SECONDS
+from backend.static_assets import StaticAssets
+from backend.event_hub import event_hub, parse_event_id, EVENTS_REPLAY_MAX
 from datetime import datetime, timezone, timedelta
 
 app = FastAPI()
 
-# 업로드 관련 디렉토리 생성
-UPLOAD_DIR = "./uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-PRIVATE_UPLOAD_DIR = "./private_uploads"
-os.makedirs(PRIVATE_UPLOAD_DIR, exist_ok=True)
+
+@app.on_event("startup")
+async def startup():
+    await open_rpc_session()
+    await tx_submitter.start()
+    await tx_tracker.start()
+    await event_hub.start()  # 인덱서 스레드가 이벤트를 넘길 루프
+    chain_index.start()
+    contract_files.start()  # 만료 파일 정리 스레드
+    static_assets.load()    # 정적 파일 압축본 / 해시 이름 준비
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    contract_files.stop()
+    chain_index.stop()
+    await tx_tracker.stop()
+    await tx_submitter.stop()
+    await close_rpc_session()
+    verify_hash_pool.shutdown(wait=False)
+
+# 업로드 저장소 (SHA256 기준 중복 제거, 공개 여부는 contract_files 메타데이터로 관리)
+blob_store = contract_files.blobs
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB 제한
+
+# 일괄 검증 (/api/verify)
+VERIFY_MAX_FILES = int(os.getenv("VERIFY_MAX_FILES", "50"))                        # 요청 1회당 PDF 수
+VERIFY_MAX_HASHES = int(os.getenv("VERIFY_MAX_HASHES", "1000"))                    # 요청 1회당 해시 수
+VERIFY_MAX_UPLOAD_SIZE = int(os.getenv("VERIFY_MAX_UPLOAD_SIZE", str(100 * 1024 * 1024)))  # 요청 본문 전체
+VERIFY_HASH_WORKERS = int(os.getenv("VERIFY_HASH_WORKERS", "4"))                   # SHA256 계산 스레드 수
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")                                          # /metrics Bearer 토큰 (선택)
+METRICS_ALLOWED_IPS = {ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "").split(",") if ip.strip()}  # 토큰 없이 허용할 IP (선택)
+if not METRICS_TOKEN and not METRICS_ALLOWED_IPS:
+    print("⚠️ METRICS_TOKEN is not set; /metrics answers 403 until it is (or METRICS_ALLOWED_IPS is set).")
+verify_hash_pool = ThreadPoolExecutor(max_workers=VERIFY_HASH_WORKERS, thread_name_prefix="verify-hash")
+SHA256_PATTERN = re.compile(r"^(0x)?[0-9a-fA-F]{64}$")
 
 
 
@@ -39,23 +80,40 @@ def format_timestamp_kst(timestamp: float) -> str:
     return dt_kst.strftime("%Y-%m-%d %H:%M:%S")
 
 def finalize_contract(trade_id: str):
-    info = contract_files.get(trade_id)
-    if not info:
-        return
-
-    src = os.path.join(UPLOAD_DIR, info["filename"])
-    dst = os.path.join(PRIVATE_UPLOAD_DIR, info["filename"])
-    if os.path.exists(src):
-        os.rename(src, dst)
-        info["moved"] = True  # 상태 표시
-
-class LimitUploadSizeMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: StarletteRequest, call_next):
-        max_upload_size = 10 * 1024 * 1024  # 10MB 제한
-        content_length = request.headers.get("content-length")
+    contract_files.set_private(trade_id)  # 파일은 그대로 두고 비공개 표시만 변경
+
+class LimitUploadSizeMiddleware:
+    """요청 본문 크기 제한. Content-Length 가 없는 chunked 요청도 실제로 받은 바이트 수로 제한한다."""
+
+    def __init__(self, app, max_upload_size: int = MAX_UPLOAD_SIZE, path_limits: Optional[dict] = None):
+        self.app = app
+        self.max_upload_size = max_upload_size
+        self.path_limits = path_limits or {}  # 경로별 제한 (여러 파일을 받는 /api/verify 등)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        max_upload_size = self.path_limits.get(scope["path"], self.max_upload_size)
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
         if content_length and int(content_length) > max_upload_size:
-            return JSONResponse(status_code=413, content={"detail": "File too large"})
-        return await call_next(request)
+            response = JSONResponse(status_code=413, content={"detail": "File too large"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_upload_size:
+                    # 본문 파싱 중 발생 → FastAPI 가 413 응답으로 변환
+                    raise HTTPException(status_code=413, detail="File too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
 
 # CORS 및 미들웨어 설정
 app.add_middleware(
@@ -65,7 +123,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(LimitUploadSizeMiddleware)
+app.add_middleware(LimitUploadSizeMiddleware, path_limits={"/api/verify": VERIFY_MAX_UPLOAD_SIZE})
+app.add_middleware(MetricsMiddleware)  # 가장 바깥: 413 등 미들웨어 응답까지 측정
 
 app.include_router(auth_router, prefix="/auth")
 app.include_router(contract_router)
@@ -73,7 +132,9 @@ app.include_router(admin_router, prefix="/api/admin")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FRONTEND_DIR = os.path.join(BASE_DIR, "../frontend")
-app.mount("/static", StaticFiles(directory=FRONTEND_DIR, html=True), name="static")
+# 압축본 + 해시 이름(immutable 캐시)으로 제공, 작은 파일은 메모리에 보관
+static_assets = StaticAssets(FRONTEND_DIR)
+app.mount("/static", static_assets, name="static")
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 if not SECRET_KEY:
@@ -94,49 +155,63 @@ async def register_contract(
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
 
-    content = await file.read()
-    if not content.startswith(b"%PDF"):
-        raise HTTPException(status_code=400, detail="Invalid PDF file content.")
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Uploaded file must be a PDF.")
-    await file.close()
 
-    # SHA256 해시 생성
-    hash_value = generate_pdf_hash(content)
+    # 상대방 주소는 해시 계산 / 파일 저장 / 트랜잭션 전에 검증하고 체크섬 형식으로 통일
+    if not Web3.is_address(party_b):
+        raise HTTPException(status_code=400, detail="Invalid party_b address.")
+    party_b = Web3.to_checksum_address(party_b)
 
-    # trade_id 및 스마트컨트랙트 등록
+    # 청크 단위로 한 번만 읽으며 %PDF 시그니처 확인 + SHA256 계산 + blob 저장소의 임시 파일에 기록
     trade_id = generate_trade_id()
-    tx_hash = register_contract_on_chain(hash_value, asset_id, trade_id, user_address, party_b)
-
-    # tx_hash를 기반으로 파일명 생성
-    clean_tx_hash = tx_hash.lower()
-    if clean_tx_hash.startswith("0x"):
-        clean_tx_hash = clean_tx_hash[2:]
-    filename = f"{clean_tx_hash}.pdf"
-
-    filepath = os.path.join(UPLOAD_DIR, filename)
-    with open(filepath, "wb") as f:
-        f.write(content)
-
-    # trade_id → 파일 매핑 저장 (UTC 타임스탬프)
-    contract_files[trade_id] = {
-        "filename": filename,
-        "timestamp": time.time()  # UTC timestamp
-    }
+    tmp_path = None
+    try:
+        with timed(UPLOAD_HASH_SECONDS):
+            hash_value, size, tmp_path = await run_in_threadpool(blob_store.spool, file.file, MAX_UPLOAD_SIZE)
+        UPLOAD_BYTES.observe(size)
+        # trade_id → 파일(SHA256) 매핑 저장 (UTC 타임스탬프)
+        # 같은 내용의 파일이 이미 저장되어 있으면 참조만 추가하고 임시 파일은 지움
+        contract_files.add(trade_id, hash_value, time.time())
+        try:
+            with timed(UPLOAD_STORE_SECONDS):
+                await run_in_threadpool(blob_store.commit, tmp_path, hash_value)
+            tmp_path = None
+        except Exception:
+            contract_files.remove(trade_id)
+            raise
+    except InvalidPdfError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    finally:
+        if tmp_path is not None:
+            blob_store.discard(tmp_path)
+        await file.close()
+
+    # 스마트컨트랙트 등록
+    try:
+        tx_hash = await register_contract_on_chain_async(hash_value, asset_id, trade_id, user_address, party_b)
+    except Exception:
+        contract_files.remove(trade_id)
+        raise
+    chain_index.record_registration(trade_id, user_address, party_b)
+    tx_tracker.track(tx_hash, "registerContract", trade_id=trade_id)
 
     return {
         "message": "Contract registered",
         "trade_id": trade_id,
         "sha256": hash_value,
-        "tx_hash": tx_hash
+        "tx_hash": tx_hash,
+        "tx_status_url": f"/api/tx/{tx_hash}"
     }
 
 # 계약 조회 API
 @app.get("/api/contract")
-def get_contract(trade_id: str = Query(...), tx_hash: Optional[str] = Query(None)):
-    contract_data = get_contract_from_chain(trade_id, tx_hash)
+async def get_contract(trade_id: str = Query(...), tx_hash: Optional[str] = Query(None)):
+    contract_data = await get_contract_from_chain_async(trade_id, tx_hash)
     file_info = contract_files.get(trade_id)
-    contract_data["fileMoved"] = file_info.get("moved", False) if file_info else True
+    contract_data["fileMoved"] = file_info.get("private", False) if file_info else True
 
     # KST 기준 timestamp 변환하여 응답에 추가
     if file_info and "timestamp" in file_info:
@@ -146,109 +221,200 @@ def get_contract(trade_id: str = Query(...), tx_hash: Optional[str] = Query(None
 
     return contract_data
 
+# 계약서 일괄 검증 API (PDF 여러 개 또는 SHA256 목록 → 등록 여부와 trade 정보)
+@app.post("/api/verify")
+async def verify_contracts(
+    files: Optional[List[UploadFile]] = File(None),
+    hashes: Optional[str] = Form(None),  # 쉼표/공백으로 구분한 SHA256 목록
+    user_address: str = Depends(verify_jwt_token)
+):
+    files = files or []
+    hash_list = re.split(r"[\s,]+", hashes.strip()) if hashes and hashes.strip() else []
+    if not files and not hash_list:
+        raise HTTPException(status_code=400, detail="검증할 PDF 파일 또는 해시를 입력하세요.")
+    if len(files) > VERIFY_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"PDF 파일은 한 번에 {VERIFY_MAX_FILES}개까지 검증할 수 있습니다.")
+    if len(hash_list) > VERIFY_MAX_HASHES:
+        raise HTTPException(status_code=400, detail=f"해시는 한 번에 {VERIFY_MAX_HASHES}개까지 검증할 수 있습니다.")
+
+    # 파일 해시는 전용 스레드 풀에서 동시에 계산 (hashlib 은 GIL 을 놓고 계산)
+    loop = asyncio.get_running_loop()
+
+    async def hash_file(upload: UploadFile) -> dict:
+        item = {"name": upload.filename, "sha256": None}
+        try:
+            item["sha256"], _ = await loop.run_in_executor(verify_hash_pool, hash_pdf_stream, upload.file, MAX_UPLOAD_SIZE)
+        except (InvalidPdfError, UploadTooLargeError) as e:
+            item["error"] = str(e)
+        finally:
+            await upload.close()
+        return item
+
+    results = list(await asyncio.gather(*(hash_file(upload) for upload in files)))
+    for value in hash_list:
+        if SHA256_PATTERN.match(value):
+            results.append({"name": None, "sha256": value.lower().removeprefix("0x")})
+        else:
+            results.append({"name": None, "sha256": None, "error": f"Invalid SHA256: {value}"})
+
+    found = await find_trades_by_hashes([item["sha256"] for item in results if item["sha256"]])
+    for item in results:
+        trades = found.get(item["sha256"], []) if item["sha256"] else []
+        item["registered"] = bool(trades)
+        item["trades"] = trades
+    return {
+        "total": len(results),
+        "matched": sum(1 for item in results if item["registered"]),
+        "results": results,
+    }
+
+# 체인 이벤트 구독 API (SSE): 내 주소가 당사자인 trade + trade_id 로 지정한 trade 의 변경 알림
+@app.get("/api/events")
+async def subscribe_events(
+    request: Request,
+    trade_id: List[str] = Query([]),
+    all_events: bool = Query(False, alias="all"),  # 관리자: 모든 이벤트 (?all=true)
+    user_address: str = Depends(verify_jwt_token)
+):
+    if all_events and not authenticate(request).is_admin:
+        raise HTTPException(status_code=403, detail="관리자 권한이 없습니다.")
+
+    replay = []
+    last_event_id = request.headers.get("last-event-id")
+    try:
+        subscription = event_hub.subscribe(address=user_address, trade_ids=trade_id, everything=all_events)
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="구독자가 너무 많습니다. 잠시 후 다시 시도하세요.")
+    if last_event_id:
+        # 재연결: 놓친 이벤트를 인덱스에서 다시 보낸다 (너무 많으면 전체를 다시 불러오게 함)
+        try:
+            replay = chain_index.events_after(*parse_event_id(last_event_id), EVENTS_REPLAY_MAX + 1)
+        except ValueError:
+            replay = []
+        if len(replay) > EVENTS_REPLAY_MAX:
+            replay = [{"event": "resync"}]
+            event_hub.unsubscribe(subscription)
+    return event_hub.stream(subscription, replay)
+
 # 계약서 뷰어 API
 @app.get("/api/contract/view")
-def view_contract(trade_id: str):
-    info = contract_files.get(trade_id)
-    if not info or info.get("moved"):  # 이동된 파일은 비공개 처리
+async def view_contract(trade_id: str, request: Request):
+    # 메타데이터 / stat 은 메모리 캐시에서 (캐시에 없을 때만 DB 조회 + os.stat)
+    info = contract_files.view_info(trade_id)
+    if not info or info["private"]:  # 비공개 처리된 파일
         raise HTTPException(status_code=404, detail="Not available")
-
-    filepath = os.path.join(UPLOAD_DIR, info["filename"])
-    if not os.path.exists(filepath):
+    if info["stat"] is None:
         raise HTTPException(status_code=404, detail="File missing")
 
-    return FileResponse(filepath, media_type="application/pdf")
+    # 파일 이름이 곧 SHA256 이므로 내용이 같으면 ETag 도 같다 (strong)
+    etag = f'"{info["sha256"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
 
-# 만료된 계약 파일 삭제 함수 (1일 = 86400초)
-def delete_expired_contracts():
-    now = time.time()
-    expired = []
+    # Range / If-Range 는 FileResponse 가 처리 (206 으로 필요한 부분만 → PDF 뷰어가 점진적으로 렌더링)
+    # 캐시된 stat 을 넘기므로 응답할 때 파일을 다시 stat 하지 않는다
+    return FileResponse(info["path"], media_type="application/pdf", headers=headers, stat_result=info["stat"])
 
-    for trade_id, info in contract_files.items():
-        if now - info["timestamp"] > 86400:
-            filepath = os.path.join(UPLOAD_DIR, info["filename"])
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            expired.append(trade_id)
-
-    for trade_id in expired:
-        del contract_files[trade_id]
+# 만료된 계약 파일 삭제 함수 (1일 = 86400초, 백그라운드 스레드가 주기적으로 호출)
+def delete_expired_contracts():
+    # 다른 trade_id 가 같은 파일을 참조 중이면 파일은 남겨둠
+    return contract_files.sweep_expired()
 
 # 루트 경로 index.html 반환 (로그인 화면)
 @app.get("/")
-def root():
-    return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+def root(request: Request):
+    return static_assets.response("index.html", request.headers)
 
 # 계약서 정보 ABI 반환 API
 @app.get("/api/contract-info")
-def get_contract_info():
-    abi_path = os.path.join(
-        os.path.dirname(__file__),
-        "../artifacts/contracts/ContractRegistry.sol/ContractRegistry.json"
-    )
-    with open(abi_path, "r", encoding="utf-8") as f:
-        abi = json.load(f)["abi"]
-
-    return {
-        "contract_address": os.getenv("CONTRACT_ADDRESS"),
-        "abi": abi
-    }
+def get_contract_info(request: Request):
+    # 미리 직렬화한 응답 + ETag (If-None-Match 일치 시 304)
+    return artifacts.info_response("ContractRegistry", request)
 
 # 투표 리스트 조회 API
 @app.get("/api/vote-list")
-def get_vote_list(user_address: str = Depends(verify_jwt_token)):
-    results = []
-    all_trade_ids = contract.functions.getAllTradeIds().call()
-    for trade_id in all_trade_ids:
-        try:
-            party_a, party_b = contract.functions.getVoters(trade_id).call()
-            if user_address.lower() in [party_a.lower(), party_b.lower()]:
-                results.append(trade_id)
-        except Exception:
-            continue
+async def get_vote_list(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    user_address: str = Depends(verify_jwt_token)
+):
+    trades = await load_trades(party=user_address, with_contract=False, offset=offset, limit=limit)
+    results = [trade["trade_id"] for trade in trades]
     return {"eligible_trade_ids": results}
 
 # 완료된 계약 조회 API (2차 DAO 결과 포함, timestampKST 추가)
 @app.get("/api/finalized-contracts")
-def get_finalized_contracts(user_address: str = Depends(verify_jwt_token)):
-    finalized_results = []
-    all_trade_ids = contract.functions.getAllTradeIds().call()
-    for trade_id in all_trade_ids:
-        try:
-            party_a, party_b = contract.functions.getVoters(trade_id).call()
-            vote_status = contract.functions.getVoteStatus(trade_id).call()
-            voted_a, voted_b, approved_a, approved_b, finalized = vote_status
-
-            is_related = user_address.lower() in [party_a.lower(), party_b.lower()]
-            if is_related and finalized:
-                data = get_contract_from_chain(trade_id)
-                data["trade_id"] = trade_id
-                data["voted"] = True
-                data["finalized"] = True
-                data["approvedA"] = approved_a
-                data["approvedB"] = approved_b
-                file_info = contract_files.get(trade_id, {})
-                data["fileMoved"] = file_info.get("moved", True)
-
-                # 2차 DAO 결과 포함
-                try:
-                    dao_vote = dao_contract.functions.getVoteResult(trade_id).call()
-                    data["daoProcessed"] = dao_vote[2]  # processed
-                    data["daoPassed"] = dao_vote[3]     # passed
-                except Exception:
-                    data["daoProcessed"] = False
-                    data["daoPassed"] = None
-
-                # KST 변환된 타임스탬프 추가
-                if "timestamp" in file_info:
-                    data["timestampKST"] = format_timestamp_kst(file_info["timestamp"])
-                else:
-                    data["timestampKST"] = None
-
-                finalized_results.append(data)
-
-        except Exception as e:
-            print(f"Error processing trade_id {trade_id}: {e}")
-            continue
-
-    return {"finalized_contracts": finalized_results}
+async def get_finalized_contracts(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    stream: bool = Query(False),
+    user_address: str = Depends(verify_jwt_token)
+):
+    try:
+        after = await resolve_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
+    def to_finalized_results(trades):
+        finalized_results = []
+        files = contract_files.get_many([data["trade_id"] for data in trades])
+        for data in trades:
+            data["voted"] = True
+            file_info = files.get(data["trade_id"], {})
+            data["fileMoved"] = file_info.get("private", True)
+
+            # KST 변환된 타임스탬프 추가
+            if "timestamp" in file_info:
+                data["timestampKST"] = format_timestamp_kst(file_info["timestamp"])
+            else:
+                data["timestampKST"] = None
+
+            finalized_results.append(data)
+        return finalized_results
+
+    # stream=true: 조회되는 대로 한 줄씩 (NDJSON, 커서 기반이므로 offset 은 사용하지 않음)
+    if stream:
+        pages = iter_trade_pages(party=user_address, finalized=True, limit=limit, after=after)
+        return ndjson_trades_response(pages, to_finalized_results, limit)
+
+    trades = await load_trades(party=user_address, finalized=True, offset=offset, limit=limit, after=after)
+    finalized_results = to_finalized_results(trades)
+    return {"finalized_contracts": finalized_results, "next_cursor": next_cursor(finalized_results, limit)}
+
+# Prometheus 지표 (워커별 값, 캐시 / RPC 풀 / 트랜잭션 큐 상태는 수집 시점에 읽음)
+CACHES = {"view_call": view_cache, "receipt": receipt_cache, "jwt": token_cache, "file_meta": contract_files.meta_cache}
+# 엔드포인트는 RPC_URLS 순서(0, 1, ...)로만 구분한다 (URL 에는 API 키가 들어 있을 수 있음)
+metrics_registry.gauge("rpc_endpoint_healthy", "1 if the RPC endpoint is not cooling down.", lambda: {
+    (("endpoint", str(i)),): int(e["healthy"]) for i, e in enumerate(rpc_pool.stats()["endpoints"])
+})
+metrics_registry.gauge("rpc_endpoint_latency_seconds", "EWMA latency of the RPC endpoint.", lambda: {
+    (("endpoint", str(i)),): e["latency_ms"] / 1000
+    for i, e in enumerate(rpc_pool.stats()["endpoints"]) if e["latency_ms"] is not None
+})
+metrics_registry.gauge("cache_hits", "Cache hits since start.", lambda: {
+    (("cache", name),): cache.hits for name, cache in CACHES.items()
+})
+metrics_registry.gauge("cache_misses", "Cache misses since start.", lambda: {
+    (("cache", name),): cache.misses for name, cache in CACHES.items()
+})
+metrics_registry.gauge("tx_queue_depth", "Transactions waiting to be signed and sent.", lambda: tx_submitter.stats()["queue_depth"])
+metrics_registry.gauge("tx_in_flight", "Sent transactions without a receipt.", lambda: tx_submitter.stats()["in_flight"])
+metrics_registry.gauge("event_subscribers", "Connected /api/events (SSE) subscribers.", lambda: len(event_hub.subscriptions))
+metrics_registry.gauge("chain_index_age_seconds", "Seconds since the chain index last synced.", lambda: (
+    time.time() - chain_index.last_synced_at if chain_index.last_synced_at else -1
+))
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    # Bearer METRICS_TOKEN 또는 명시적으로 설정한 METRICS_ALLOWED_IPS 에서 온 요청만 허용
+    # (리버스 프록시 뒤에서는 모든 요청이 프록시 주소로 보이므로 기본값으로 loopback 을 믿지 않는다)
+    authorization = request.headers.get("authorization", "")
+    token_ok = bool(METRICS_TOKEN) and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")
+    client_host = request.client.host if request.client else None
+    if not token_ok and client_host not in METRICS_ALLOWED_IPS:
+        raise HTTPException(status_code=403, detail="지표 조회 권한이 없습니다.")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,308 @@
+"""Prometheus 형식 지표와 요청별 RPC 사용량 집계.
+
+prometheus_client 없이 카운터 / 히스토그램만 직접 구현해 /metrics 에서 텍스트 형식으로 내보낸다.
+값은 워커 프로세스마다 따로 쌓이므로 여러 워커를 띄우면 Prometheus 쪽에서 워커별로 수집해 합친다.
+
+요청마다 RequestProfile 을 contextvar 에 넣어 두면, 그 요청 처리 중에 보낸 JSON-RPC 호출이
+(스레드풀 / gather 로 나뉜 작업 포함) 메서드와 컨트랙트 함수 이름별로 집계된다. eth_call 은 calldata
+앞 4바이트(selector)를 등록된 ABI 로 함수 이름으로 바꿔 라벨을 붙인다.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from eth_utils import function_abi_to_4byte_selector
+
+# Prometheus 기본 버킷 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 16 * 1024, 128 * 1024, 512 * 1024, 1024 * 1024, 4 * 1024 * 1024, 10 * 1024 * 1024)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # 라벨 값 튜플 → 누적값
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}  # 라벨 값 튜플 → [버킷별 개수(누적 아님), 합계, 개수]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self.values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []  # 수집 시점에 값을 읽어 (이름, 설명, {라벨: 값}) 을 돌려주는 함수
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, collect):
+        """collect() → 숫자 또는 {(라벨 이름, 값), ...: 숫자} 를 수집 시점에 읽는 게이지."""
+        self.collectors.append((name, documentation, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for name, documentation, collect in self.collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"⚠️ Metric {name} collection failed: {e}")
+                continue
+            lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge"])
+            if not isinstance(values, dict):
+                values = {(): values}
+            for labels, value in values.items():
+                names = [label for label, _ in labels]
+                lines.append(f"{name}{_format_labels(names, [v for _, v in labels])} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+))
+RPC_CALLS = registry.register(Counter(
+    "rpc_calls_total", "JSON-RPC calls (batch items counted individually).", ("method", "function")
+))
+RPC_ERRORS = registry.register(Counter(
+    "rpc_errors_total", "JSON-RPC round trips that raised.", ("method",)
+))
+RPC_SECONDS = registry.register(Histogram(
+    "rpc_request_duration_seconds", "JSON-RPC round trip latency including pool retries.", ("method", "function")
+))
+RPC_CALLS_PER_REQUEST = registry.register(Histogram(
+    "http_request_rpc_calls", "JSON-RPC calls issued while serving one HTTP request.", ("route",),
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+))
+UPLOAD_BYTES = registry.register(Histogram(
+    "upload_size_bytes", "Uploaded contract PDF size.", buckets=SIZE_BUCKETS
+))
+UPLOAD_HASH_SECONDS = registry.register(Histogram(
+    "upload_hash_duration_seconds", "Time spent reading, hashing and spooling an uploaded PDF to a temp file."
+))
+UPLOAD_STORE_SECONDS = registry.register(Histogram(
+    "upload_store_duration_seconds", "Time spent moving a spooled PDF into the blob store."
+))
+JWT_DECODE_SECONDS = registry.register(Histogram(
+    "jwt_decode_duration_seconds", "JWT signature verification time (token cache misses only)."
+))
+
+
+# ------------------------------------------------------------------ 컨트랙트 함수 이름
+
+selector_names = {}  # "0x12345678" → 함수 이름
+
+
+def register_abi(abi: list):
+    for entry in abi:
+        if entry.get("type") == "function":
+            selector_names["0x" + function_abi_to_4byte_selector(entry).hex()] = entry["name"]
+
+
+def rpc_function(method: str, params) -> str:
+    """RPC 라벨용 함수 이름. eth_call / eth_estimateGas 는 selector 로 찾은 컨트랙트 함수, 그 외는 ""."""
+    if method not in ("eth_call", "eth_estimateGas") or not params or not isinstance(params[0], dict):
+        return ""
+    data = params[0].get("data") or params[0].get("input") or ""
+    selector = data[:10].lower()
+    return selector_names.get(selector, selector)
+
+
+# ------------------------------------------------------------------ 요청별 집계
+
+
+class RequestProfile:
+    """HTTP 요청 하나를 처리하는 동안 보낸 RPC 호출 수와 시간."""
+
+    def __init__(self):
+        self.calls = {}       # "method" 또는 "method:function" → 호출 수
+        self.round_trips = 0  # HTTP 왕복 수 (배치는 1)
+        self.rpc_time = 0.0   # 초
+        self.lock = threading.Lock()
+
+    def add(self, labels: list, elapsed: float):
+        with self.lock:
+            self.round_trips += 1
+            self.rpc_time += elapsed
+            for label in labels:
+                self.calls[label] = self.calls.get(label, 0) + 1
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def header_value(self) -> str:
+        """X-RPC-Profile 응답 헤더 값: calls=5; round_trips=2; time_ms=12.3; eth_call:getContract=4, ..."""
+        with self.lock:
+            breakdown = ", ".join(f"{label}={count}" for label, count in sorted(self.calls.items()))
+            summary = f"calls={sum(self.calls.values())}; round_trips={self.round_trips}; time_ms={self.rpc_time * 1000:.1f}"
+        return f"{summary}; {breakdown}" if breakdown else summary
+
+
+current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+@contextmanager
+def track_rpc(method: str, params_list: list, batch: bool = False):
+    """JSON-RPC 왕복 한 번을 측정한다. params_list 는 단건이면 [params], 배치면 항목별 params."""
+    functions = [rpc_function(method, params) for params in params_list]
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        RPC_ERRORS.inc(method=method)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        for function in functions:
+            RPC_CALLS.inc(method=method, function=function)
+        RPC_SECONDS.observe(elapsed, method=method, function="(batch)" if batch else (functions[0] if functions else ""))
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add([f"{method}:{function}" if function else method for function in functions], elapsed)
+
+
+# ------------------------------------------------------------------ HTTP 미들웨어
+
+PROFILE_HEADER = b"x-rpc-profile"
+
+
+class MetricsMiddleware:
+    """라우트 템플릿별 응답 시간과 요청당 RPC 호출 수를 기록한다.
+
+    요청에 `X-RPC-Profile: 1` 헤더가 있으면 응답에 같은 이름의 헤더로 RPC 내역을 붙인다. 헤더는 응답
+    시작 시점에 붙으므로 스트리밍 응답은 본문을 보내는 동안의 호출이 빠진다 (지표에는 포함)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        wants_profile = dict(scope["headers"]).get(PROFILE_HEADER, b"") not in (b"", b"0")
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if wants_profile:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (PROFILE_HEADER, profile.header_value().encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            route = route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=str(status)
+            )
+            RPC_CALLS_PER_REQUEST.observe(profile.total_calls, route=route)
+
+
+def route_label(scope) -> str:
+    """원래 경로 대신 라우트 템플릿(/api/tx/{tx_hash})을 써서 라벨 수가 늘어나지 않게 한다.
+
+    FastAPI 버전에 따라 scope["route"] 의 path 에 include_router prefix 가 빠져 있으므로, 요청 경로에서
+    라우트 자신의 패턴과 맞는 뒷부분을 찾아 그 앞을 prefix 로 붙인다."""
+    route = scope.get("route")
+    path_regex = getattr(route, "path_regex", None)
+    if path_regex is None:
+        return scope.get("root_path") or "(unmatched)"  # Mount(/static) 는 root_path 로 남는다
+    path = scope["path"]
+    start = 0
+    while start != -1:
+        if path_regex.match(path[start:]):
+            return path[:start] + route.path
+        start = path.find("/", start + 1)
+    return route.path
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
@@ -0,0 +1,275 @@
+"""여러 RPC 엔드포인트를 묶은 프로바이더 풀.
+
+- 엔드포인트마다 keep-alive 세션을 유지한다 (동기: requests.Session, 비동기: 공유 aiohttp 세션).
+- 조회 요청은 건강한 엔드포인트 중 응답 시간(EWMA)이 가장 짧은 곳으로 보내고, 가끔
+  (RPC_PROBE_RATIO) 다른 엔드포인트로도 보내 느려졌던 곳이 회복됐는지 확인한다.
+- 전송 오류 / HTTP 오류 / rate limit 응답은 엔드포인트 실패로 기록해 RPC_ERROR_COOLDOWN 초 동안
+  제외하고, 조회 요청은 다른 엔드포인트로 RPC_READ_RETRIES 번까지 재시도한다 (모든 엔드포인트를
+  이미 시도했다면 백오프 후 재시도).
+- 트랜잭션 전송과 pending nonce 조회는 멤풀이 엔드포인트마다 다르므로 한 엔드포인트에 고정하고
+  재시도하지 않는다. 고정된 엔드포인트가 실패하면 다음 전송부터 다른 곳으로 옮긴다.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+
+from backend.metrics import track_rpc
+
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "10"))                  # 초, 요청 1회 제한 시간
+RPC_READ_RETRIES = int(os.getenv("RPC_READ_RETRIES", "2"))           # 조회 요청 재시도 횟수
+RPC_RETRY_BACKOFF = float(os.getenv("RPC_RETRY_BACKOFF", "0.2"))     # 초, 재시도마다 두 배
+RPC_ERROR_COOLDOWN = float(os.getenv("RPC_ERROR_COOLDOWN", "30"))    # 초, 실패한 엔드포인트 제외 시간
+RPC_PROBE_RATIO = float(os.getenv("RPC_PROBE_RATIO", "0.05"))        # 가장 빠르지 않은 엔드포인트로 보낼 비율
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "16"))                # 엔드포인트당 keep-alive 연결 수
+RPC_LATENCY_ALPHA = 0.2                                              # 응답 시간 EWMA 가중치
+
+# 같은 엔드포인트에서 처리해야 하는 메서드 (멤풀 / pending nonce)
+PINNED_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount"}
+# 노드가 요청을 처리하지 않고 돌려보낸 경우 (rate limit) → 다른 엔드포인트로 재시도
+RETRYABLE_RPC_ERRORS = {-32005}
+
+
+def rpc_urls_from_env() -> list:
+    """RPC_URLS(쉼표 구분)가 있으면 그 목록, 없으면 SEPOLIA_RPC_URL 하나."""
+    urls = [url.strip() for url in os.getenv("RPC_URLS", "").split(",") if url.strip()]
+    return urls or [os.getenv("SEPOLIA_RPC_URL")]
+
+
+def redact_url(url: str) -> str:
+    """로그 / 통계용 URL: 호스팅 RPC 는 경로나 쿼리에 API 키가 들어 있으므로 scheme://host 만 남긴다."""
+    parts = urlsplit(url)
+    host = parts.hostname or "?"
+    if parts.port:
+        host += f":{parts.port}"
+    suffix = "/…" if parts.path.strip("/") or parts.query else ""
+    return f"{parts.scheme}://{host}{suffix}"
+
+
+class RpcEndpointError(Exception):
+    """엔드포인트가 요청을 처리하지 못함 (재시도 대상)."""
+
+
+class RpcEndpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.label = redact_url(url)  # 로그 / 통계에는 이 값만 쓴다
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=RPC_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency: Optional[float] = None  # 초, EWMA
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def healthy(self, now: float) -> bool:
+        return self.down_until <= now
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.consecutive_errors = 0
+        self.down_until = 0.0
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += RPC_LATENCY_ALPHA * (latency - self.latency)
+
+    def record_failure(self, error: Exception):
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.down_until = time.time() + RPC_ERROR_COOLDOWN
+        self.last_error = self.redact(f"{type(error).__name__}: {error}")
+
+    def redact(self, text: str) -> str:
+        """오류 메시지에 들어간 전체 URL 을 label 로 바꾼다."""
+        return text.replace(self.url, self.label)
+
+    def stats(self, now: float) -> dict:
+        return {
+            "url": self.label,
+            "healthy": self.healthy(now),
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "last_error": self.last_error,
+        }
+
+
+class RpcPool:
+    def __init__(self, urls: list):
+        if not urls or not all(urls):
+            raise ValueError("RPC 엔드포인트가 설정되지 않았습니다. (RPC_URLS / SEPOLIA_RPC_URL)")
+        self.endpoints = [RpcEndpoint(url) for url in urls]
+        self.pinned: Optional[RpcEndpoint] = None  # 트랜잭션 전송용
+        self.retries = 0
+        self.lock = threading.Lock()
+        self.async_session: Optional[aiohttp.ClientSession] = None
+
+    # ---------------------------------------------------------------- 라우팅
+
+    def _pick_read(self, exclude=()) -> RpcEndpoint:
+        now = time.time()
+        with self.lock:
+            candidates = [e for e in self.endpoints if e not in exclude] or list(self.endpoints)
+            healthy = [e for e in candidates if e.healthy(now)]
+            if not healthy:
+                # 모두 실패 중이면 가장 먼저 복귀할 엔드포인트를 시도
+                return min(candidates, key=lambda e: e.down_until)
+            if len(healthy) > 1 and random.random() < RPC_PROBE_RATIO:
+                return random.choice(healthy)
+            # 아직 한 번도 쓰지 않은 엔드포인트(latency None)를 먼저 측정
+            return min(healthy, key=lambda e: -1 if e.latency is None else e.latency)
+
+    def _pick_write(self) -> RpcEndpoint:
+        pinned = self.pinned
+        if pinned is not None and pinned.healthy(time.time()):
+            return pinned
+        endpoint = self._pick_read()
+        self.pinned = endpoint
+        return endpoint
+
+    def _record(self, endpoint: RpcEndpoint, started: float, error: Optional[Exception] = None):
+        with self.lock:
+            if error is None:
+                endpoint.record_success(time.time() - started)
+            else:
+                endpoint.record_failure(error)
+
+    @staticmethod
+    def _check_reply(reply):
+        # 배치 응답(list)은 항목별로 error 가 오므로 항목 하나라도 rate limit 이면 엔드포인트 실패로 본다
+        for item in reply if isinstance(reply, list) else [reply]:
+            error = (item.get("error") or {}) if isinstance(item, dict) else {}
+            if error.get("code") in RETRYABLE_RPC_ERRORS:
+                raise RpcEndpointError(error.get("message"))
+        return reply
+
+    # ---------------------------------------------------------------- 동기
+
+    def post(self, body: bytes, pinned: bool = False):
+        """JSON-RPC 요청(단건 또는 배치) 본문을 보내고 디코딩한 응답을 반환한다."""
+        if pinned:
+            return self._post_once(self._pick_write(), body)
+
+        tried = []
+        for attempt in range(RPC_READ_RETRIES + 1):
+            endpoint = self._pick_read(exclude=tried)
+            tried.append(endpoint)
+            try:
+                return self._post_once(endpoint, body)
+            except (requests.RequestException, RpcEndpointError, ValueError) as e:
+                if attempt == RPC_READ_RETRIES:
+                    raise
+                print(f"⚠️ RPC request to {endpoint.label} failed, retrying: {endpoint.redact(str(e))}")
+                self.retries += 1
+                if len(tried) >= len(self.endpoints):  # 다른 엔드포인트가 남아 있으면 바로 넘어간다
+                    time.sleep(RPC_RETRY_BACKOFF * 2 ** attempt)
+
+    def _post_once(self, endpoint: RpcEndpoint, body: bytes):
+        started = time.time()
+        try:
+            response = endpoint.session.post(
+                endpoint.url, data=body, headers={"Content-Type": "application/json"}, timeout=RPC_TIMEOUT
+            )
+            response.raise_for_status()
+            reply = self._check_reply(response.json())
+        except Exception as e:
+            self._record(endpoint, started, e)
+            raise
+        self._record(endpoint, started)
+        return reply
+
+    # ---------------------------------------------------------------- 비동기
+
+    async def open_async_session(self) -> aiohttp.ClientSession:
+        if self.async_session is None or self.async_session.closed:
+            self.async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=RPC_POOL_SIZE, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=RPC_TIMEOUT),
+                raise_for_status=True,
+            )
+        return self.async_session
+
+    async def close_async_session(self):
+        if self.async_session is not None and not self.async_session.closed:
+            await self.async_session.close()
+        self.async_session = None
+
+    async def post_async(self, body: bytes, pinned: bool = False):
+        if pinned:
+            return await self._post_once_async(self._pick_write(), body)
+
+        tried = []
+        for attempt in range(RPC_READ_RETRIES + 1):
+            endpoint = self._pick_read(exclude=tried)
+            tried.append(endpoint)
+            try:
+                return await self._post_once_async(endpoint, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError, RpcEndpointError, ValueError) as e:
+                if attempt == RPC_READ_RETRIES:
+                    raise
+                print(f"⚠️ RPC request to {endpoint.label} failed, retrying: {endpoint.redact(repr(e))}")
+                self.retries += 1
+                if len(tried) >= len(self.endpoints):
+                    await asyncio.sleep(RPC_RETRY_BACKOFF * 2 ** attempt)
+
+    async def _post_once_async(self, endpoint: RpcEndpoint, body: bytes):
+        session = await self.open_async_session()
+        started = time.time()
+        try:
+            async with session.post(
+                endpoint.url, data=body, headers={"Content-Type": "application/json"}
+            ) as response:
+                reply = self._check_reply(json.loads(await response.read()))
+        except Exception as e:
+            self._record(endpoint, started, e)
+            raise
+        self._record(endpoint, started)
+        return reply
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "endpoints": [endpoint.stats(now) for endpoint in self.endpoints],
+            "write_endpoint": self.pinned.label if self.pinned else None,
+            "retries": self.retries,
+        }
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """RpcPool 로 요청을 보내는 Web3 프로바이더 (재시도는 풀에서 처리)."""
+
+    def __init__(self, pool: RpcPool):
+        super().__init__()
+        self.pool = pool
+
+    def make_request(self, method, params):
+        with track_rpc(method, [params]):
+            return self.pool.post(self.encode_rpc_request(method, params), pinned=method in PINNED_METHODS)
+
+
+class PooledAsyncHTTPProvider(AsyncJSONBaseProvider):
+    """RpcPool 로 요청을 보내는 AsyncWeb3 프로바이더."""
+
+    def __init__(self, pool: RpcPool):
+        super().__init__()
+        self.pool = pool
+
+    async def make_request(self, method, params):
+        with track_rpc(method, [params]):
+            return await self.pool.post_async(self.encode_rpc_request(method, params), pinned=method in PINNED_METHODS)
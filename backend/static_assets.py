@@ -0,0 +1,212 @@
+"""프론트엔드 정적 파일 제공 (/static).
+
+시작할 때 frontend 디렉터리를 한 번 읽어 gzip / brotli 압축본을 미리 만들어 두고, 요청의
+Accept-Encoding 에 맞는 변형을 골라 보낸다.
+- css / js 는 내용 해시를 넣은 이름(style.<hash>.css)으로도 제공하고, HTML 안의 참조를 그 이름으로
+  바꿔 둔다. 해시 이름은 내용이 바뀌면 URL 도 바뀌므로 1년 immutable 캐시를 붙인다.
+- 원래 이름(HTML 포함)은 ETag + no-cache 로 응답해 브라우저가 304 로 재검증하게 한다.
+- STATIC_MEMORY_MAX 보다 작은 파일은 메모리에 두고, 큰 파일의 압축본은 STATIC_CACHE_DIR 에 써 둔다.
+frontend 파일을 수정하면 서버를 다시 시작해야 반영된다.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+
+from starlette.responses import FileResponse, PlainTextResponse, Response
+
+from backend.utils import etag_matches
+
+try:
+    import brotli  # 선택 의존성, 없으면 gzip 만 제공
+except ImportError:
+    brotli = None
+
+STATIC_MEMORY_MAX = int(os.getenv("STATIC_MEMORY_MAX", str(256 * 1024)))  # 바이트, 이보다 큰 파일은 디스크에서 제공
+STATIC_CACHE_DIR = os.getenv("STATIC_CACHE_DIR", "./static_cache")        # 큰 파일의 압축본 저장 경로
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600                                # 초, 해시 이름 파일의 캐시 시간
+STATIC_COMPRESS_MIN_SIZE = 256                                            # 바이트, 이보다 작으면 압축하지 않음
+
+COMPRESSIBLE_TYPES = {"application/javascript", "text/javascript", "application/json", "image/svg+xml"}
+FINGERPRINT_EXTENSIONS = {".css", ".js"}
+STATIC_REF_PATTERN = re.compile(r"/static/([\w./-]+?\.(?:css|js))\b")
+ENCODING_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+class StaticAsset:
+    def __init__(self, path: str, content_type: str, body: bytes, memory_max: int, cache_dir: str):
+        self.path = path                  # 원본 파일 경로
+        self.content_type = content_type
+        digest = hashlib.sha256(body).hexdigest()
+        self.etag = '"' + digest[:32] + '"'
+        self.variants = {}                # 인코딩 → 메모리 본문(bytes) 또는 디스크 경로(str)
+        in_memory = len(body) <= memory_max
+        self.variants["identity"] = body if in_memory else path
+        if not _compressible(content_type) or len(body) < STATIC_COMPRESS_MIN_SIZE:
+            return
+        for encoding, compressed in _compress(body):
+            if len(compressed) >= len(body):
+                continue
+            if in_memory:
+                self.variants[encoding] = compressed
+            else:
+                self.variants[encoding] = _write_cache(cache_dir, digest, encoding, compressed)
+
+    def variant_etag(self, encoding: str) -> str:
+        return self.etag if encoding == "identity" else self.etag[:-1] + ENCODING_SUFFIXES[encoding] + '"'
+
+    def memory_bytes(self) -> int:
+        return sum(len(v) for v in self.variants.values() if isinstance(v, bytes))
+
+
+def _compressible(content_type: str) -> bool:
+    return content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES
+
+
+def _compress(body: bytes):
+    if brotli is not None:
+        yield "br", brotli.compress(body, quality=11)
+    yield "gzip", gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _write_cache(cache_dir: str, digest: str, encoding: str, data: bytes) -> str:
+    path = os.path.join(cache_dir, f"{digest}{ENCODING_SUFFIXES[encoding]}")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Accept-Encoding → {인코딩: q}."""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class StaticAssets:
+    """frontend 디렉터리를 제공하는 ASGI 앱 (StaticFiles(html=True) 대체)."""
+
+    def __init__(self, directory: str, memory_max: int = STATIC_MEMORY_MAX, cache_dir: str = STATIC_CACHE_DIR):
+        self.directory = os.path.abspath(directory)
+        self.memory_max = memory_max
+        self.cache_dir = cache_dir
+        self.routes = {}  # 상대 경로 → (StaticAsset, immutable 여부)
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def load(self):
+        """파일을 읽어 해시 이름을 정하고, HTML 참조를 바꾼 뒤 압축본을 만든다."""
+        with self.lock:
+            if self.loaded:
+                return
+            files = {}
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                    with open(path, "rb") as f:
+                        files[rel] = (path, f.read())
+
+            fingerprinted = {}  # 원래 이름 → 해시 이름
+            for rel, (_, body) in files.items():
+                base, ext = os.path.splitext(rel)
+                if ext in FINGERPRINT_EXTENSIONS:
+                    fingerprinted[rel] = f"{base}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+
+            def rewrite(match):
+                return "/static/" + fingerprinted.get(match.group(1), match.group(1))
+
+            routes = {}
+            for rel, (path, body) in files.items():
+                content_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+                if content_type == "text/html":
+                    body = STATIC_REF_PATTERN.sub(rewrite, body.decode("utf-8")).encode("utf-8")
+                if content_type.startswith("text/") or content_type == "application/javascript":
+                    content_type += "; charset=utf-8"
+                asset = StaticAsset(path, content_type, body, self.memory_max, self.cache_dir)
+                routes[rel] = (asset, False)
+                if rel in fingerprinted:
+                    routes[fingerprinted[rel]] = (asset, True)
+            self.routes = routes
+            self.loaded = True
+        assets = {id(asset): asset for asset, _ in routes.values()}
+        print(f"📦 Loaded {len(assets)} static assets ({sum(a.memory_bytes() for a in assets.values())} bytes in memory,"
+              f" brotli {'on' if brotli is not None else 'off'})")
+
+    def response(self, rel: str, headers) -> Response:
+        """rel 경로 파일의 응답. headers 는 요청 헤더 (Accept-Encoding, If-None-Match)."""
+        if not self.loaded:
+            self.load()
+        if rel == "" or rel.endswith("/"):
+            rel += "index.html"
+        route = self.routes.get(rel) or self.routes.get(rel + "/index.html")
+        if route is None:
+            not_found = self.routes.get("404.html")
+            if not_found is not None:
+                return self._send(not_found[0], False, headers, status_code=404)
+            return PlainTextResponse("Not Found", status_code=404)
+        return self._send(*route, headers)
+
+    def _send(self, asset: StaticAsset, immutable: bool, headers, status_code: int = 200) -> Response:
+        accepted = _accepted_encodings(headers.get("accept-encoding", ""))
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and accepted.get(candidate, 0) > 0:
+                encoding = candidate
+                break
+
+        response_headers = {
+            "ETag": asset.variant_etag(encoding),
+            "Vary": "Accept-Encoding",
+            "Cache-Control": f"public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable" if immutable else "no-cache",
+        }
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        if_none_match = headers.get("if-none-match")
+        if status_code == 200 and if_none_match and etag_matches(if_none_match, response_headers["ETag"]):
+            return Response(status_code=304, headers=response_headers)
+
+        variant = asset.variants[encoding]
+        if isinstance(variant, bytes):
+            return Response(variant, status_code=status_code, media_type=asset.content_type, headers=response_headers)
+        return FileResponse(variant, status_code=status_code, media_type=asset.content_type, headers=response_headers)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            # mount 아래의 경로 (/static/css/style.css → css/style.css)
+            path, root_path = scope["path"], scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            rel = os.path.normpath(path.lstrip("/")).replace(os.sep, "/") if path.strip("/") else ""
+            if rel.startswith(".."):
+                response = PlainTextResponse("Not Found", status_code=404)
+            else:
+                if path.endswith("/") and rel:
+                    rel += "/"
+                headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+                response = self.response(rel, headers)
+        await response(scope, receive, send)
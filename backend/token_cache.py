@@ -0,0 +1,120 @@
+"""JWT 검증 결과 캐시와 jti 폐기 목록.
+
+TokenCache: 한 번 검증한 토큰의 payload 를 sha256(토큰) 키로 보관한다. 항목은 토큰 자신의 exp 까지만
+유효하므로 만료된 토큰이 캐시로 통과되는 일은 없다. 크기 제한 LRU.
+
+RevocationList: 로그아웃 등으로 폐기한 jti 를 SQLite 에 저장해 워커 간에 공유한다. 요청마다 DB 를
+읽지 않도록 메모리 사본을 두고, TOKEN_REVOCATION_SYNC_INTERVAL 초마다 새로 추가된 행만 가져온다.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_REVOCATION_DB_PATH = os.getenv("TOKEN_REVOCATION_DB_PATH", "./revoked_tokens.db")
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "1"))  # 초
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jti TEXT NOT NULL UNIQUE,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires_at ON revoked_tokens (expires_at);
+"""
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # digest → payload
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, digest: str) -> Optional[dict]:
+        with self.lock:
+            payload = self.entries.get(digest)
+            if payload is not None and payload["exp"] > time.time():
+                self.entries.move_to_end(digest)
+                self.hits += 1
+                return payload
+            if payload is not None:
+                del self.entries[digest]
+            self.misses += 1
+            return None
+
+    def put(self, digest: str, payload: dict):
+        with self.lock:
+            self.entries[digest] = payload
+            self.entries.move_to_end(digest)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, digest: str):
+        with self.lock:
+            self.entries.pop(digest, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+class RevocationList:
+    def __init__(self, db_path: str, sync_interval: float = TOKEN_REVOCATION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.revoked = {}   # jti → expires_at
+        self.last_id = 0    # 마지막으로 가져온 행 id
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float):
+        """jti 를 토큰 만료 시각까지 폐기한다. 만료된 폐기 기록은 이때 함께 정리한다."""
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (time.time(),))
+            self.db.execute(
+                "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", (jti, expires_at)
+            )
+            self.revoked[jti] = expires_at
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if time.time() - self.synced_at >= self.sync_interval:
+            self._sync()
+        return jti is not None and jti in self.revoked
+
+    def _sync(self):
+        """다른 워커가 추가한 폐기 기록을 가져오고, 만료된 항목은 메모리에서 지운다."""
+        with self.lock:
+            now = time.time()
+            if now - self.synced_at < self.sync_interval:
+                return
+            rows = self.db.execute(
+                "SELECT id, jti, expires_at FROM revoked_tokens WHERE id > ? ORDER BY id", (self.last_id,)
+            ).fetchall()
+            for row_id, jti, expires_at in rows:
+                self.revoked[jti] = expires_at
+                self.last_id = row_id
+            for jti in [jti for jti, expires_at in self.revoked.items() if expires_at <= now]:
+                del self.revoked[jti]
+            self.synced_at = now
+
+
+token_cache = TokenCache()
+revoked_tokens = RevocationList(TOKEN_REVOCATION_DB_PATH)
@@ -0,0 +1,190 @@
+"""관리자 통계용 누적 집계 (/api/admin/stats).
+
+인덱서가 이벤트를 적용할 때마다 같은 SQLite 트랜잭션 안에서 카운터, 일/주 단위 버킷, 처리 시간
+히스토그램을 1씩 갱신한다. 요청 시에는 이 작은 테이블들만 읽으므로 trade 수와 관계없이 일정한 비용이다.
+reorg 로 상태를 다시 만들 때는 clear() 후 저장된 이벤트를 다시 적용한다.
+
+처리 시간 백분위는 고정 구간(DURATION_BUCKETS) 히스토그램에서 구간 안을 선형 보간해 계산한 근사치다.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+KST = timezone(timedelta(hours=9))
+# 초, 처리 시간 히스토그램 구간 상한 (마지막은 그 이상 전부). 바꾸면 stats_durations 를 다시 만들어야 한다
+DURATION_BUCKETS = [
+    5, 15, 30, 60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600,
+    86400, 2 * 86400, 3 * 86400, 7 * 86400, 14 * 86400, 30 * 86400, float("inf"),
+]
+PERCENTILES = (50, 90, 99)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_counters (
+    metric TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats_buckets (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (period, bucket, metric)
+);
+CREATE TABLE IF NOT EXISTS stats_durations (
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (metric, bucket)
+);
+"""
+
+# 이벤트 → 올릴 카운터 (Voted / VoteFinalized 는 payload 로 결정)
+EVENT_METRICS = {
+    "ContractRegistered": "registered",
+    "ContractApproved": "approved",
+    "ContractRejected": "rejected",
+}
+
+
+BUCKET_METRICS = ["registered", "approved", "rejected", "dao_yes", "dao_no", "dao_passed", "dao_failed"]
+
+
+def _metric_for(event: dict) -> Optional[str]:
+    name, payload = event["event"], event["payload"]
+    if name == "Voted":
+        return "dao_yes" if payload["approved"] else "dao_no"
+    if name == "VoteFinalized":
+        return "dao_passed" if payload["passed"] else "dao_failed"
+    return EVENT_METRICS.get(name)
+
+
+def _buckets(timestamp: int) -> list:
+    dt = datetime.fromtimestamp(timestamp, KST)
+    year, week, _ = dt.isocalendar()
+    return [("day", dt.strftime("%Y-%m-%d")), ("week", f"{year}-W{week:02d}")]
+
+
+def _bucket_index(seconds: float) -> int:
+    for i, upper in enumerate(DURATION_BUCKETS):
+        if seconds <= upper:
+            return i
+    return len(DURATION_BUCKETS) - 1
+
+
+class TradeStats:
+    """ChainIndex 의 DB 연결을 같이 쓴다 (호출하는 쪽에서 lock / 트랜잭션을 잡는다)."""
+
+    def __init__(self, db):
+        self.db = db
+        self.db.executescript(SCHEMA)
+
+    def clear(self):
+        self.db.execute("DELETE FROM stats_counters")
+        self.db.execute("DELETE FROM stats_buckets")
+        self.db.execute("DELETE FROM stats_durations")
+
+    def apply(self, event: dict, registered_at: Optional[int]):
+        """이벤트 하나를 반영한다. registered_at 은 그 trade 의 등록 시각 (처리 시간 계산용)."""
+        metric = _metric_for(event)
+        if metric is None:
+            return
+        self.db.execute("INSERT INTO stats_counters (metric, value) VALUES (?, 1)"
+                        " ON CONFLICT(metric) DO UPDATE SET value = value + 1", (metric,))
+
+        # 이벤트가 포함된 블록 시각 (등록 이벤트는 payload 에 등록 시각이 있다)
+        timestamp = event["payload"].get("blockTimestamp") or event["payload"].get("timestamp")
+        if timestamp is None:
+            return
+        for period, bucket in _buckets(timestamp):
+            self.db.execute("INSERT INTO stats_buckets (period, bucket, metric, value) VALUES (?, ?, ?, 1)"
+                            " ON CONFLICT(period, bucket, metric) DO UPDATE SET value = value + 1", (period, bucket, metric))
+
+        if registered_at is not None and event["event"] in ("ContractApproved", "ContractRejected", "VoteFinalized"):
+            duration_metric = "dao_finalize" if event["event"] == "VoteFinalized" else "first_round"
+            seconds = max(timestamp - registered_at, 0)
+            self.db.execute("INSERT INTO stats_durations (metric, bucket, count, total) VALUES (?, ?, 1, ?)"
+                            " ON CONFLICT(metric, bucket) DO UPDATE SET count = count + 1, total = total + excluded.total",
+                            (duration_metric, _bucket_index(seconds), seconds))
+
+    def snapshot(self, days: int, weeks: int) -> dict:
+        counters = dict(self.db.execute("SELECT metric, value FROM stats_counters").fetchall())
+
+        def c(name: str) -> int:
+            return counters.get(name, 0)
+
+        now = datetime.now(KST)
+        day_keys = [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days - 1, -1, -1)]
+        week_keys = []
+        for i in range(weeks - 1, -1, -1):
+            year, week, _ = (now - timedelta(weeks=i)).isocalendar()
+            week_keys.append(f"{year}-W{week:02d}")
+        series = {
+            "day": {key: dict.fromkeys(BUCKET_METRICS, 0) for key in day_keys},
+            "week": {key: dict.fromkeys(BUCKET_METRICS, 0) for key in week_keys},
+        }
+        rows = self.db.execute(
+            "SELECT period, bucket, metric, value FROM stats_buckets WHERE (period = 'day' AND bucket >= ?)"
+            " OR (period = 'week' AND bucket >= ?)",
+            (day_keys[0] if day_keys else "9999", week_keys[0] if week_keys else "9999"),
+        ).fetchall()
+        for period, bucket, metric, value in rows:
+            if bucket in series[period]:
+                series[period][bucket][metric] = value
+
+        durations = {}
+        for metric in ("first_round", "dao_finalize"):
+            histogram = [0] * len(DURATION_BUCKETS)
+            total_seconds = 0.0
+            for bucket, count, total in self.db.execute(
+                "SELECT bucket, count, total FROM stats_durations WHERE metric = ?", (metric,)
+            ):
+                histogram[bucket] = count
+                total_seconds += total
+            durations[metric] = _summarize(histogram, total_seconds)
+
+        decided = c("dao_passed") + c("dao_failed")
+        votes = c("dao_yes") + c("dao_no")
+        return {
+            "trades": {
+                "registered": c("registered"),
+                "pending": c("registered") - c("approved") - c("rejected"),
+                "approved": c("approved"),
+                "rejected": c("rejected"),
+            },
+            "dao": {
+                "pending": c("approved") - decided,
+                "passed": c("dao_passed"),
+                "failed": c("dao_failed"),
+                "pass_rate": round(c("dao_passed") / decided, 4) if decided else None,
+                "yes_votes": c("dao_yes"),
+                "no_votes": c("dao_no"),
+                "yes_ratio": round(c("dao_yes") / votes, 4) if votes else None,
+            },
+            "time_to_finalize_seconds": durations,
+            "daily": [{"date": key, **series["day"][key]} for key in day_keys],
+            "weekly": [{"week": key, **series["week"][key]} for key in week_keys],
+            "generated_at": int(time.time()),
+        }
+
+
+def _summarize(histogram: list, total_seconds: float) -> dict:
+    count = sum(histogram)
+    summary = {"count": count, "mean": round(total_seconds / count, 1) if count else None}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = _percentile(histogram, count, p / 100) if count else None
+    return summary
+
+
+def _percentile(histogram: list, count: int, q: float) -> float:
+    rank = q * count
+    seen = 0
+    for i, n in enumerate(histogram):
+        if n and seen + n >= rank:
+            lower = DURATION_BUCKETS[i - 1] if i > 0 else 0
+            upper = DURATION_BUCKETS[i]
+            if upper == float("inf"):
+                return lower
+            return round(lower + (upper - lower) * (rank - seen) / n, 1)
+        seen += n
+    return DURATION_BUCKETS[-2]
@@ -0,0 +1,385 @@
+"""서버 서명 계정(ACCOUNT_ADDRESS)의 트랜잭션 제출 큐.
+
+모든 트랜잭션은 하나의 writer 태스크를 거쳐 순서대로 nonce 를 로컬에서 할당받아 전송되므로,
+동시에 여러 요청이 들어와도 nonce 가 겹치지 않고 영수증을 기다리지 않은 채 여러 건을
+파이프라인으로 보낼 수 있다. 모니터 태스크는 채굴되지 않고 오래 머무는(stuck) 트랜잭션이나
+멤풀에서 사라진(dropped) 트랜잭션을 같은 nonce 와 올린 가스 가격으로 다시 제출한다.
+
+ReceiptTracker 는 제출된 트랜잭션의 영수증을 백그라운드에서 추적한다. 새 블록이 나올 때마다
+대기 중인 모든 해시의 영수증을 배치 요청 한 번으로 조회하므로, 요청 핸들러는 채굴을 기다리지 않고
+tx hash(추적 id)만 돌려주고 클라이언트는 /api/tx/{hash} 로 상태를 확인한다.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from web3.exceptions import TransactionNotFound
+
+from backend.fees import FeeOracle, GasEstimateCache
+
+TX_STUCK_TIMEOUT = float(os.getenv("TX_STUCK_TIMEOUT", "90"))     # 초, 이 시간 동안 미채굴이면 재제출
+TX_FEE_BUMP = float(os.getenv("TX_FEE_BUMP", "1.2"))              # 재제출 시 가스 가격 배수 (최소 1.1)
+TX_MONITOR_INTERVAL = float(os.getenv("TX_MONITOR_INTERVAL", "5"))  # 초
+TX_MAX_RESUBMITS = int(os.getenv("TX_MAX_RESUBMITS", "5"))
+TX_TRACK_POLL_INTERVAL = float(os.getenv("TX_TRACK_POLL_INTERVAL", "2"))  # 초, 새 블록 확인 주기
+TX_TRACK_RETENTION = float(os.getenv("TX_TRACK_RETENTION", "3600"))      # 초, 추적 기록 보관 시간
+TX_STATUS_MAX_WAIT = float(os.getenv("TX_STATUS_MAX_WAIT", "60"))        # 초, 상태 조회 long-poll 최대 대기
+
+
+class PendingTx:
+    def __init__(self, nonce: int, tx: dict, tx_hash: str):
+        self.nonce = nonce
+        self.tx = tx
+        self.hashes = [tx_hash]  # 재제출될 때마다 새 해시가 뒤에 붙는다
+        self.sent_at = time.time()
+        self.resubmits = 0
+
+    @property
+    def tx_hash(self) -> str:
+        return self.hashes[-1]
+
+
+def _is_rejected(error: Exception) -> bool:
+    """노드가 JSON-RPC 에러로 거절해 nonce 가 쓰이지 않았음이 확실한 경우.
+
+    web3 는 RPC 에러 응답을 ValueError 로 올린다. "already known" 은 같은 트랜잭션이 이미 멤풀에 있다는 뜻이므로 제외."""
+    return isinstance(error, ValueError) and "already known" not in str(error).lower()
+
+
+class TxSubmitter:
+    def __init__(self, w3, account_address: str, private_key: str, chain_id: int,
+                 fee_oracle: Optional[FeeOracle] = None, gas_estimates: Optional[GasEstimateCache] = None):
+        self.w3 = w3
+        self.account_address = account_address
+        self.private_key = private_key
+        self.chain_id = chain_id
+        self.fee_oracle = fee_oracle or FeeOracle(w3)
+        self.gas_estimates = gas_estimates or GasEstimateCache()
+        self.queue: Optional[asyncio.Queue] = None
+        self.next_nonce: Optional[int] = None
+        self.in_flight = {}  # nonce → PendingTx
+        self.submitted = 0
+        self.resubmitted = 0
+        self.failed = 0
+        self.tracker = None  # ReceiptTracker 가 연결되면 재제출 해시를 알려준다
+        self._tasks = []
+
+    async def start(self):
+        if self._tasks and not any(task.done() for task in self._tasks):
+            return
+        if self._tasks:
+            # writer / monitor 가 예기치 않게 끝났다면 다시 띄운다 (큐에 남은 요청은 그대로 처리)
+            print("⚠️ Tx submitter task exited, restarting")
+            for task in self._tasks:
+                task.cancel()
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._monitor()),
+        ]
+        await self.fee_oracle.start()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self.fee_oracle.stop()
+
+    async def submit(self, fn, gas: Optional[int] = None, gas_margin: float = 1.3, simulate: bool = False) -> str:
+        """컨트랙트 함수 호출 트랜잭션을 큐에 넣고, 전송되면 tx hash 를 반환한다 (채굴은 기다리지 않음).
+
+        simulate=True 면 캐시된 가스 추정치를 쓰지 않고 현재 상태로 estimate_gas 를 실행해, revert 될
+        트랜잭션(이미 완료된 투표의 finalizeVote 등)은 보내기 전에 ContractLogicError 로 실패시킨다."""
+        await self.start()
+        if gas is None and simulate:
+            gas = int(await fn.estimate_gas({"from": self.account_address}) * gas_margin)
+        elif gas is None:
+            # 가스 추정은 nonce 와 무관하므로 writer 밖에서 동시에 수행 (같은 함수 / 인자 크기면 캐시 사용)
+            gas = int(await self.gas_estimates.estimate(fn, self.account_address) * gas_margin)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((fn, gas, future))
+        return await future
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "in_flight": len(self.in_flight),
+            "next_nonce": self.next_nonce,
+            "oldest_in_flight_seconds": max((now - p.sent_at for p in self.in_flight.values()), default=0),
+            "submitted": self.submitted,
+            "resubmitted": self.resubmitted,
+            "failed": self.failed,
+            "fees": self.fee_oracle.stats(),
+            "gas_estimates": self.gas_estimates.stats(),
+        }
+
+    # ---------------------------------------------------------------- writer
+
+    async def _writer(self):
+        while True:
+            fn, gas, future = await self.queue.get()
+            try:
+                tx_hash = await self._send_with_retry(fn, gas)
+            except Exception as e:
+                self.failed += 1
+                # 호출한 쪽이 이미 취소되었을 수 있으므로 결과는 항상 done() 을 확인하고 넣는다
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(tx_hash)
+
+    async def _send_with_retry(self, fn, gas: int) -> str:
+        try:
+            return await self._send_new(fn, gas)
+        except Exception as e:
+            if "nonce" not in str(e).lower():
+                raise
+        # 외부에서 같은 계정으로 보낸 트랜잭션 등으로 nonce 가 어긋났다면 다시 읽고 한 번 재시도
+        self.next_nonce = None
+        return await self._send_new(fn, gas)
+
+    async def _send_new(self, fn, gas: int) -> str:
+        if self.next_nonce is None:
+            self.next_nonce = await self.w3.eth.get_transaction_count(self.account_address, "pending")
+        nonce = self.next_nonce
+        tx = await fn.build_transaction({
+            "from": self.account_address,
+            "nonce": nonce,
+            "gas": gas,
+            "chainId": self.chain_id,
+            **await self.fee_oracle.fees(),
+        })
+        try:
+            tx_hash = await self._sign_and_send(tx)
+        except Exception as e:
+            if not _is_rejected(e):
+                # 타임아웃 등: 노드가 받았을 수도 있으므로 다음 전송 전에 pending nonce 를 다시 읽는다
+                self.next_nonce = None
+            raise
+        self.next_nonce = nonce + 1
+        self.in_flight[nonce] = PendingTx(nonce, tx, tx_hash)
+        self.submitted += 1
+        return tx_hash
+
+    async def _sign_and_send(self, tx: dict) -> str:
+        signed_tx = self.w3.eth.account.sign_transaction(tx, self.private_key)
+        tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        return self.w3.to_hex(tx_hash)
+
+    # ---------------------------------------------------------------- monitor
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(TX_MONITOR_INTERVAL)
+            if not self.in_flight:
+                continue
+            try:
+                await self._check_in_flight()
+            except Exception as e:
+                print("⚠️ Tx monitor failed:", e)
+
+    async def _check_in_flight(self):
+        mined_nonce = await self.w3.eth.get_transaction_count(self.account_address, "latest")
+        for nonce in [n for n in self.in_flight if n < mined_nonce]:
+            del self.in_flight[nonce]
+
+        now = time.time()
+        for pending in sorted(self.in_flight.values(), key=lambda p: p.nonce):
+            stuck = now - pending.sent_at > TX_STUCK_TIMEOUT
+            if not stuck and not await self._is_dropped(pending):
+                continue
+            if pending.resubmits >= TX_MAX_RESUBMITS:
+                continue
+            await self._resubmit(pending)
+
+    async def _is_dropped(self, pending: PendingTx) -> bool:
+        try:
+            await self.w3.eth.get_transaction(pending.tx_hash)
+            return False
+        except TransactionNotFound:
+            return True
+
+    async def _resubmit(self, pending: PendingTx):
+        tx = dict(pending.tx)
+        fee_fields = {key: tx.pop(key) for key in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas") if key in tx}
+        tx.update(FeeOracle.bump(fee_fields, self.fee_oracle.current, max(TX_FEE_BUMP, 1.1)))
+        try:
+            tx_hash = await self._sign_and_send(tx)
+        except Exception as e:
+            message = str(e).lower()
+            if "nonce too low" in message or "already known" in message:
+                return  # 이미 채굴되었거나 같은 트랜잭션이 멤풀에 있음
+            print(f"⚠️ Resubmit failed for nonce {pending.nonce}:", e)
+            return
+        print(f"🔁 Resubmitted nonce {pending.nonce} with fee {tx.get('maxFeePerGas', tx.get('gasPrice'))}: {tx_hash}")
+        pending.tx = tx
+        pending.hashes.append(tx_hash)
+        pending.sent_at = time.time()
+        pending.resubmits += 1
+        self.resubmitted += 1
+        if self.tracker:
+            self.tracker.add_replacement(pending.hashes[0], tx_hash)
+
+
+class TrackedTx:
+    def __init__(self, tx_hash: str, kind: str, meta: dict):
+        self.tx_hash = tx_hash  # 추적 id (최초 제출 해시)
+        self.kind = kind
+        self.meta = meta
+        self.hashes = [tx_hash]  # 재제출된 해시 포함, 이 중 하나만 채굴된다
+        self.status = "pending"
+        self.mined_hash = None
+        self.block_number = None
+        self.gas_used = None
+        self.submitted_at = time.time()
+        self.resolved_at = None
+        self.changed = asyncio.Event()
+
+
+class ReceiptTracker:
+    """제출된 트랜잭션들의 영수증을 블록마다 한 번의 배치 요청으로 확인한다.
+
+    batch_rpc 는 (method, params_list) → 결과 리스트 형태의 코루틴 함수 (contract.batch_rpc_async)."""
+
+    def __init__(self, w3, batch_rpc, submitter: Optional[TxSubmitter] = None):
+        self.w3 = w3
+        self.batch_rpc = batch_rpc
+        self.tracked = {}  # 추적 id → TrackedTx
+        self.aliases = {}  # 재제출 해시 → 추적 id
+        self.head = None
+        self.on_block = None  # 새 블록 번호를 받을 콜백 (조회 캐시 무효화용)
+        self.on_failed = None  # 실패한 TrackedTx 를 받을 콜백 (가스 추정 캐시 무효화용)
+        self._checked_head = None  # 마지막으로 영수증을 확인한 블록
+        self._new_hashes = False   # 마지막 확인 이후 추적 시작된 해시가 있는지
+        self._task = None
+        if submitter is not None:
+            submitter.tracker = self
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def track(self, tx_hash: str, kind: str, **meta) -> TrackedTx:
+        tx_hash = tx_hash.lower()
+        entry = self.tracked.get(tx_hash)
+        if entry is None:
+            entry = self.tracked[tx_hash] = TrackedTx(tx_hash, kind, meta)
+            self._new_hashes = True
+        return entry
+
+    def add_replacement(self, tx_hash: str, new_hash: str):
+        entry = self.tracked.get(tx_hash.lower())
+        if entry is not None and entry.status == "pending":
+            entry.hashes.append(new_hash.lower())
+            self.aliases[new_hash.lower()] = entry.tx_hash
+            self._new_hashes = True
+
+    def get(self, tx_hash: str) -> Optional[TrackedTx]:
+        tx_hash = tx_hash.lower()
+        return self.tracked.get(self.aliases.get(tx_hash, tx_hash))
+
+    async def status(self, tx_hash: str, wait: float = 0) -> Optional[dict]:
+        """트랜잭션 상태를 반환한다. wait 초 동안 pending 상태가 바뀌기를 기다릴 수 있다 (long-poll)."""
+        entry = self.get(tx_hash)
+        if entry is None:
+            return await self._lookup(tx_hash)
+        if entry.status == "pending" and wait > 0:
+            try:
+                await asyncio.wait_for(entry.changed.wait(), timeout=min(wait, TX_STATUS_MAX_WAIT))
+            except asyncio.TimeoutError:
+                pass
+        if self.head is None:
+            self.head = await self.w3.eth.block_number
+        return self._to_status(entry)
+
+    def _to_status(self, entry: TrackedTx) -> dict:
+        confirmations = 0
+        if entry.block_number is not None and self.head is not None:
+            confirmations = max(self.head - entry.block_number + 1, 1)
+        return {
+            "tx_hash": entry.tx_hash,
+            "kind": entry.kind,
+            **entry.meta,
+            "status": entry.status,
+            "mined_tx_hash": entry.mined_hash,
+            "block_number": entry.block_number,
+            "confirmations": confirmations,
+            "gas_used": entry.gas_used,
+            "resubmits": len(entry.hashes) - 1,
+        }
+
+    async def _lookup(self, tx_hash: str) -> Optional[dict]:
+        # 추적 중이 아닌 해시 (서버 재시작 전 제출 등)는 노드에 직접 확인
+        try:
+            receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            try:
+                await self.w3.eth.get_transaction(tx_hash)
+            except TransactionNotFound:
+                return None
+            return {"tx_hash": tx_hash.lower(), "status": "pending", "block_number": None, "confirmations": 0}
+        head = await self.w3.eth.block_number
+        return {
+            "tx_hash": tx_hash.lower(),
+            "status": "mined" if receipt["status"] == 1 else "failed",
+            "block_number": receipt["blockNumber"],
+            "confirmations": max(head - receipt["blockNumber"] + 1, 1),
+            "gas_used": receipt["gasUsed"],
+        }
+
+    # ---------------------------------------------------------------- poller
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(TX_TRACK_POLL_INTERVAL)
+            if not self.tracked:
+                continue
+            try:
+                self.head = await self.w3.eth.block_number
+                if self.on_block:
+                    self.on_block(self.head)
+                if self.head != self._checked_head or self._new_hashes:
+                    self._checked_head = self.head
+                    self._new_hashes = False
+                    await self._resolve_pending()
+                self._purge()
+            except Exception as e:
+                print("⚠️ Receipt tracker failed:", e)
+
+    async def _resolve_pending(self):
+        pending = [entry for entry in self.tracked.values() if entry.status == "pending"]
+        hashes = [h for entry in pending for h in entry.hashes]
+        if not hashes:
+            return
+        receipts = dict(zip(hashes, await self.batch_rpc("eth_getTransactionReceipt", [[h] for h in hashes])))
+        for entry in pending:
+            receipt = next((receipts[h] for h in entry.hashes if receipts.get(h)), None)
+            if receipt is None:
+                continue
+            entry.status = "mined" if int(receipt["status"], 16) == 1 else "failed"
+            entry.mined_hash = receipt["transactionHash"].lower()
+            entry.block_number = int(receipt["blockNumber"], 16)
+            entry.gas_used = int(receipt["gasUsed"], 16)
+            entry.resolved_at = time.time()
+            entry.changed.set()
+            if entry.status == "failed":
+                print(f"❌ Transaction failed ({entry.kind}): {entry.mined_hash}")
+                if self.on_failed:
+                    self.on_failed(entry)
+
+    def _purge(self):
+        now = time.time()
+        for tx_hash, entry in list(self.tracked.items()):
+            if now - (entry.resolved_at or entry.submitted_at) > TX_TRACK_RETENTION:
+                del self.tracked[tx_hash]
+                for h in entry.hashes[1:]:
+                    self.aliases.pop(h, None)
@@ -2,10 +2,48 @@ import hashlib
 import uuid
 from datetime import datetime
 
+PDF_CHUNK_SIZE = 64 * 1024
+
+class InvalidPdfError(ValueError):
+    pass
+
+class UploadTooLargeError(ValueError):
+    pass
+
 def generate_pdf_hash(file_bytes: bytes) -> str:
     return hashlib.sha256(file_bytes).hexdigest()
 
+def hash_pdf_stream(src, max_size: int, chunk_size: int = PDF_CHUNK_SIZE, out=None):
+    """파일 객체 src 를 청크 단위로 읽어 SHA256 을 계산한다 (전체를 메모리에 올리지 않음).
+
+    첫 청크에서 %PDF 시그니처를 확인하고, 실제로 읽은 바이트 수로 max_size 를 검사한다.
+    out 을 주면 해시한 청크를 그대로 out 에 쓴다 (한 번 읽으면서 저장까지).
+    반환값은 (sha256 hex, 크기)."""
+    hasher = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        if size == 0 and not chunk.startswith(b"%PDF"):
+            raise InvalidPdfError("Invalid PDF file content.")
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLargeError("File too large")
+        hasher.update(chunk)
+        if out is not None:
+            out.write(chunk)
+    if size == 0:
+        raise InvalidPdfError("Invalid PDF file content.")
+    return hasher.hexdigest(), size
+
 def generate_trade_id() -> str:
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     random_part = uuid.uuid4().hex[:8]
-    return f"TRD-{timestamp}-{random_part}"
\ No newline at end of file
+    return f"TRD-{timestamp}-{random_part}"
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더(쉼표 구분 목록, W/ 약한 비교, *)가 etag 와 일치하는지."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,96 @@
+"""투표자 × trade DAO 투표 행렬.
+
+투표자마다 getVotersList 순서의 비트 위치를 하나씩 두고, trade 마다 "투표함" / "찬성함" 두 개의
+정수 비트셋만 저장한다. 찬성 = voted & approved, 반대 = voted & ~approved, 미투표 = ~voted.
+ChainIndex 가 Voted 이벤트로 점진적으로 갱신하며(투표는 취소되지 않으므로 비트는 켜지기만 한다),
+인덱스를 쓸 수 없을 때는 getVoterVote batch 조회 결과로 같은 형태의 행렬을 만든다.
+"""
+from typing import Iterable, Optional
+
+
+class VoteMatrix:
+    def __init__(self, voters: Optional[Iterable[str]] = None):
+        self.voters = []      # 비트 위치 → 투표자 (소문자)
+        self.positions = {}   # 투표자 (소문자) → 비트 위치
+        self.voted = {}       # trade_id → 투표한 투표자 비트셋
+        self.approved = {}    # trade_id → 찬성한 투표자 비트셋
+        if voters:
+            self.sync_voters(voters)
+
+    def clear(self):
+        self.voted.clear()
+        self.approved.clear()
+
+    def _position(self, voter: str) -> int:
+        voter = voter.lower()
+        bit = self.positions.get(voter)
+        if bit is None:
+            # 아직 getVotersList 로 순서를 받기 전이면 처음 본 순서대로 임시 위치를 준다
+            bit = self.positions[voter] = len(self.voters)
+            self.voters.append(voter)
+        return bit
+
+    def sync_voters(self, voters: Iterable[str]):
+        """비트 순서를 getVotersList 순서에 맞춘다. votersList 는 뒤에 추가되기만 하므로 보통은 확장만 한다."""
+        # 제거 후 다시 추가된 투표자는 votersList 에 두 번 들어 있으므로 첫 위치만 쓴다
+        voters = list(dict.fromkeys(voter.lower() for voter in voters))
+        if voters[:len(self.voters)] == self.voters:
+            for voter in voters[len(self.voters):]:
+                self._position(voter)
+            return
+
+        # 임시 위치가 목록 순서와 다르면 비트셋을 새 위치로 옮긴다
+        listed = set(voters)
+        order = voters + [voter for voter in self.voters if voter not in listed]
+        positions = {voter: bit for bit, voter in enumerate(order)}
+        remap = [positions[voter] for voter in self.voters]
+        for bitsets in (self.voted, self.approved):
+            for trade_id, bits in bitsets.items():
+                moved = 0
+                for old, new in enumerate(remap):
+                    if bits >> old & 1:
+                        moved |= 1 << new
+                bitsets[trade_id] = moved
+        self.voters = order
+        self.positions = positions
+
+    def record(self, trade_id: str, voter: str, approved: bool):
+        bit = 1 << self._position(voter)
+        self.voted[trade_id] = self.voted.get(trade_id, 0) | bit
+        if approved:
+            self.approved[trade_id] = self.approved.get(trade_id, 0) | bit
+        else:
+            self.approved[trade_id] = self.approved.get(trade_id, 0) & ~bit
+
+    def subset(self, trade_ids: Iterable[str]) -> "VoteMatrix":
+        """지정한 trade 들만 담은 사본 (잠금 밖에서 읽기용)."""
+        copy = VoteMatrix()
+        copy.voters = list(self.voters)
+        copy.positions = dict(self.positions)
+        for trade_id in trade_ids:
+            copy.voted[trade_id] = self.voted.get(trade_id, 0)
+            copy.approved[trade_id] = self.approved.get(trade_id, 0)
+        return copy
+
+    # ---------------------------------------------------------------- 조회
+
+    def has_votes(self, trade_id: str) -> bool:
+        return self.voted.get(trade_id, 0) != 0
+
+    def classify(self, trade_id: str, voters: Iterable[str]):
+        """(찬성, 반대, 미투표) 투표자 리스트. voters 의 순서와 표기를 그대로 유지한다."""
+        voted = self.voted.get(trade_id, 0)
+        approved = self.approved.get(trade_id, 0)
+        yes_voters, no_voters, not_voted = [], [], []
+        for voter in voters:
+            bit = self.positions.get(voter.lower())
+            if bit is None or not voted >> bit & 1:
+                not_voted.append(voter)
+            elif approved >> bit & 1:
+                yes_voters.append(voter)
+            else:
+                no_voters.append(voter)
+        return yes_voters, no_voters, not_voted
+
+    def stats(self) -> dict:
+        return {"voters": len(self.voters), "trades": len(self.voted)}
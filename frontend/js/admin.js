@@ -90,6 +90,69 @@ async function fetchPendingVotes() {
   }
 }
 
+// 📡 NDJSON 응답을 한 줄씩 읽어 onItem 호출
+async function readNdjson(res, onItem) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (line.trim()) onItem(JSON.parse(line));
+    }
+  }
+  if (buffer.trim()) onItem(JSON.parse(buffer));
+}
+
+const COMPLETED_PAGE_LIMIT = 50;
+let completedCursor = null;
+
+// 처리 완료 목록: 스트리밍으로 받은 행을 바로 추가, 더 보기는 커서로 이어서 조회
+async function fetchCompletedVotes(cursor = null) {
+  const tbody = document.getElementById("completedVotesBody");
+  const moreBtn = document.getElementById("moreCompletedBtn");
+  moreBtn.style.display = "none";
+  if (!cursor) tbody.innerHTML = "";
+
+  let url = `/api/admin/dao-votes/completed?stream=true&limit=${COMPLETED_PAGE_LIMIT}`;
+  if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+
+  let count = 0;
+  completedCursor = null;
+  try {
+    const res = await fetch(url, { credentials: "include" });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+
+    await readNdjson(res, (v) => {
+      if (!v.trade_id) {
+        completedCursor = v.next_cursor; // 마지막 줄
+        return;
+      }
+      count++;
+      const tr = document.createElement("tr");
+      tr.innerHTML = `
+        <td>${escapeHtml(v.trade_id)}</td>
+        <td>${escapeHtml(v.contractHash || "")}</td>
+        <td>${escapeHtml(v.datetime || "")}</td>
+        <td>${v.daoPassed ? "✔ 통과" : "❌ 거부"}</td>
+      `;
+      tbody.appendChild(tr);
+    });
+  } catch (err) {
+    tbody.insertAdjacentHTML("beforeend", `<tr><td colspan='4' style="color:red;">오류 발생: ${escapeHtml(err.message)}</td></tr>`);
+    return;
+  }
+
+  if (!cursor && count === 0) {
+    tbody.innerHTML = "<tr><td colspan='4'>처리 완료된 계약이 없습니다.</td></tr>";
+  }
+  if (completedCursor) moreBtn.style.display = "inline-block";
+}
+
 async function voteOnChain(tradeId, approve) {
   if (!contract) await initContract();
 
@@ -152,5 +215,38 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
   });
 
-  await fetchPendingVotes();
+  document.getElementById("moreCompletedBtn").addEventListener("click", () => fetchCompletedVotes(completedCursor));
+
+  await Promise.all([fetchPendingVotes(), fetchCompletedVotes()]);
+
+  // 📡 모든 체인 이벤트 구독: 투표/승인 시 진행 중 목록, DAO 처리 시 완료 목록만 다시 불러옴 (폴링 없음)
+  subscribeChainEvents("/api/events?all=true", (msg) => {
+    if (["ContractApproved", "Voted", "VoteFinalized", "reorg", "resync"].includes(msg.event)) {
+      scheduleRefresh("pending", fetchPendingVotes);
+    }
+    if (["VoteFinalized", "reorg", "resync"].includes(msg.event)) {
+      scheduleRefresh("completed", () => fetchCompletedVotes());
+    }
+  });
 });
+
+const refreshTimers = {};
+
+// 같은 블록의 이벤트 여러 개는 한 번의 갱신으로 묶음
+function scheduleRefresh(key, fn, delay = 500) {
+  clearTimeout(refreshTimers[key]);
+  refreshTimers[key] = setTimeout(fn, delay);
+}
+
+// 📡 SSE 구독 (끊기면 브라우저가 Last-Event-ID 로 재연결해 놓친 이벤트를 받음)
+function subscribeChainEvents(url, onEvent) {
+  const source = new EventSource(url, { withCredentials: true });
+  source.onmessage = (e) => {
+    try {
+      onEvent(JSON.parse(e.data));
+    } catch (err) {
+      console.error("❌ 이벤트 처리 실패:", err);
+    }
+  };
+  return source;
+}
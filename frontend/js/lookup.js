@@ -1,3 +1,6 @@
+let userAddress = null;
+const refreshTimers = {};
+
 // ✅ 로그인 확인 (쿠키 기반)
 async function checkLoginStatus() {
   try {
@@ -5,6 +8,9 @@ async function checkLoginStatus() {
     if (res.status === 401) {
       alert("로그인이 필요합니다.");
       window.location.href = "/static/index.html";
+    } else {
+      const user = await res.json();
+      userAddress = user.address.toLowerCase();
     }
   } catch (err) {
     console.error("세션 확인 오류:", err);
@@ -43,6 +49,13 @@ document.addEventListener("DOMContentLoaded", () => {
       return;
     }
 
+    await showLookup(tradeId, txHash);
+    // 📡 조회한 계약이 승인/거절되면 결과를 다시 불러옴
+    lookedUp = { tradeId, txHash };
+    watchChainEvents(tradeId);
+  });
+
+  const showLookup = async (tradeId, txHash) => {
     try {
       const res = await fetch(`/api/contract?trade_id=${encodeURIComponent(tradeId)}&tx_hash=${encodeURIComponent(txHash)}`, {
         credentials: "include"
@@ -78,57 +91,146 @@ document.addEventListener("DOMContentLoaded", () => {
       lookupResult.style.color = "red";
       lookupResult.style.display = "block";
     }
-  });
+  };
+
+  // 📡 체인 이벤트 구독: 내 주소가 당사자인 계약 + 조회 중인 계약 (폴링 없음)
+  let lookedUp = null;
+  let reloadFinalized = null; // 완료 계약 목록을 한 번 연 뒤에만 설정
+  let eventSource = null;
+  const watchChainEvents = (tradeId) => {
+    if (eventSource) eventSource.close();
+    const url = tradeId ? `/api/events?trade_id=${encodeURIComponent(tradeId)}` : "/api/events";
+    eventSource = subscribeChainEvents(url, (msg) => {
+      if (lookedUp && (msg.trade_id === lookedUp.tradeId || !msg.trade_id)) {
+        scheduleRefresh("lookup", () => showLookup(lookedUp.tradeId, lookedUp.txHash));
+      }
+      // 내 계약의 최종 승인 / DAO 처리만 완료 목록에 영향
+      const mine = !msg.trade_id || (msg.addresses || []).includes(userAddress);
+      if (reloadFinalized && mine && ["ContractApproved", "VoteFinalized", "reorg", "resync"].includes(msg.event)) {
+        scheduleRefresh("finalized", reloadFinalized);
+      }
+    });
+  };
+  watchChainEvents(null);
 
-  // 🔽 내 완료 계약 버튼 처리
+  // 🔽 내 완료 계약 버튼 처리 (NDJSON 스트리밍 → 도착하는 대로 카드 추가, 더 보기는 커서로 이어서 조회)
   const finalizedBtn = document.getElementById("myFinalizedBtn");
   const finalizedContainer = document.getElementById("myFinalizedContracts");
+  const PAGE_LIMIT = 50;
 
   if (finalizedBtn && finalizedContainer) {
-    finalizedBtn.addEventListener("click", async () => {
-      finalizedContainer.innerHTML = "⏳ 불러오는 중...";
-      try {
-        const res = await fetch("/api/finalized-contracts", {
-          credentials: "include"
-        });
+    let nextCursor = null;
 
-        if (!res.ok) {
-          finalizedContainer.innerHTML = "❌ 계약 목록을 불러오지 못했습니다.";
-          return;
-        }
+    const loadFinalized = async (cursor) => {
+      const status = document.createElement("p");
+      status.textContent = "⏳ 불러오는 중...";
+      if (!cursor) {
+        finalizedContainer.innerHTML = "<h3>📁 완료된 계약 목록</h3>";
+      }
+      document.getElementById("moreFinalizedBtn")?.remove();
+      finalizedContainer.appendChild(status);
 
-        const data = await res.json();
-        const contracts = data.finalized_contracts;
+      let count = 0;
+      try {
+        let url = `/api/finalized-contracts?stream=true&limit=${PAGE_LIMIT}`;
+        if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+        const res = await fetch(url, { credentials: "include" });
 
-        if (contracts.length === 0) {
-          finalizedContainer.innerHTML = "✅ 완료된 계약이 없습니다.";
+        if (!res.ok) {
+          status.textContent = "❌ 계약 목록을 불러오지 못했습니다.";
           return;
         }
 
-        let html = "<h3>📁 완료된 계약 목록</h3>";
-        for (const c of contracts) {
-          html += `
-            <div class="finalized-card" style="border:1px solid #ccc; padding:10px; margin:10px 0;">
-                <p><strong>📄 Trade ID:</strong> ${c.trade_id}</p>
-                <p><strong>🔗 Hash:</strong> ${c.contractHash}</p>
-                <p><strong>📅 등록일:</strong> ${c.datetime}</p>
-                <p><strong>🗳 A 투표:</strong> ${c.approvedA ? "✔ 승인" : "❌ 거절"}</p>
-                <p><strong>🗳 B 투표:</strong> ${c.approvedB ? "✔ 승인" : "❌ 거절"}</p>
-                <p><strong>📁 계약서:</strong> ${c.fileMoved ? "🔒 보관됨 (미리보기 불가)" : "✅ 미리보기 가능"}</p>
-                <p><strong>2차 DAO 처리:</strong> ${c.daoProcessed ? "✅ 처리됨" : "❌ 미처리"}</p>
-                ${
-                  c.daoProcessed
-                    ? `<p><strong>2차 DAO 결과:</strong> ${c.daoPassed ? "✔ 통과" : "❌ 거부"}</p>`
-                    : ""
-                }
-            </div>
-          `;
-        }
-        finalizedContainer.innerHTML = html;
+        nextCursor = null;
+        await readNdjson(res, (item) => {
+          if (!item.trade_id) {
+            nextCursor = item.next_cursor; // 마지막 줄
+            return;
+          }
+          count++;
+          finalizedContainer.insertBefore(renderFinalizedCard(item), status);
+        });
       } catch (err) {
         console.error("❌ 완료 계약 조회 실패:", err);
-        finalizedContainer.innerHTML = "❌ 네트워크 오류 또는 세션 만료";
+        status.textContent = "❌ 네트워크 오류 또는 세션 만료";
+        return;
       }
+
+      status.remove();
+      if (!cursor && count === 0) {
+        finalizedContainer.innerHTML = "✅ 완료된 계약이 없습니다.";
+        return;
+      }
+      if (nextCursor) {
+        const moreBtn = document.createElement("button");
+        moreBtn.id = "moreFinalizedBtn";
+        moreBtn.textContent = "⬇️ 더 보기";
+        moreBtn.addEventListener("click", () => loadFinalized(nextCursor));
+        finalizedContainer.appendChild(moreBtn);
+      }
+    };
+
+    finalizedBtn.addEventListener("click", () => {
+      reloadFinalized = () => loadFinalized(null);
+      loadFinalized(null);
     });
   }
 });
+
+function renderFinalizedCard(c) {
+  const card = document.createElement("div");
+  card.className = "finalized-card";
+  card.style.cssText = "border:1px solid #ccc; padding:10px; margin:10px 0;";
+  card.innerHTML = `
+      <p><strong>📄 Trade ID:</strong> ${c.trade_id}</p>
+      <p><strong>🔗 Hash:</strong> ${c.contractHash}</p>
+      <p><strong>📅 등록일:</strong> ${c.datetime}</p>
+      <p><strong>🗳 A 투표:</strong> ${c.approvedA ? "✔ 승인" : "❌ 거절"}</p>
+      <p><strong>🗳 B 투표:</strong> ${c.approvedB ? "✔ 승인" : "❌ 거절"}</p>
+      <p><strong>📁 계약서:</strong> ${c.fileMoved ? "🔒 보관됨 (미리보기 불가)" : "✅ 미리보기 가능"}</p>
+      <p><strong>2차 DAO 처리:</strong> ${c.daoProcessed ? "✅ 처리됨" : "❌ 미처리"}</p>
+      ${
+        c.daoProcessed
+          ? `<p><strong>2차 DAO 결과:</strong> ${c.daoPassed ? "✔ 통과" : "❌ 거부"}</p>`
+          : ""
+      }
+  `;
+  return card;
+}
+
+// 📡 NDJSON 응답을 한 줄씩 읽어 onItem 호출
+async function readNdjson(res, onItem) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (line.trim()) onItem(JSON.parse(line));
+    }
+  }
+  if (buffer.trim()) onItem(JSON.parse(buffer));
+}
+
+// 같은 블록의 이벤트 여러 개는 한 번의 갱신으로 묶음
+function scheduleRefresh(key, fn, delay = 500) {
+  clearTimeout(refreshTimers[key]);
+  refreshTimers[key] = setTimeout(fn, delay);
+}
+
+// 📡 SSE 구독 (끊기면 브라우저가 Last-Event-ID 로 재연결해 놓친 이벤트를 받음)
+function subscribeChainEvents(url, onEvent) {
+  const source = new EventSource(url, { withCredentials: true });
+  source.onmessage = (e) => {
+    try {
+      onEvent(JSON.parse(e.data));
+    } catch (err) {
+      console.error("❌ 이벤트 처리 실패:", err);
+    }
+  };
+  return source;
+}
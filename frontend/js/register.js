@@ -73,9 +73,11 @@ if (uploadForm) {
         ✅ 등록 완료:<br>
         📌 Trade ID: ${data.trade_id}<br>
         🔗 Tx Hash: <a href="https://sepolia.etherscan.io/tx/${data.tx_hash}" target="_blank">${data.tx_hash}</a><br>
-        🔒 SHA256: ${data.sha256}`;
+        🔒 SHA256: ${data.sha256}<br>
+        ⏳ 상태: <span id="txStatus">블록 포함 대기 중...</span>`;
       registerResult.style.color = "black";
       registerResult.style.display = "block";
+      watchTxStatus(data.tx_status_url, document.getElementById("txStatus"));
     } catch (err) {
       console.error("❌ 네트워크 오류:", err);
       registerResult.innerHTML = `❌ 네트워크 오류 또는 서버 문제 발생`;
@@ -84,3 +86,28 @@ if (uploadForm) {
     }
   });
 }
+
+// ⏳ 트랜잭션 채굴 상태 확인 (서버가 최대 wait 초 동안 상태 변화를 기다렸다가 응답)
+async function watchTxStatus(statusUrl, statusEl) {
+  if (!statusUrl || !statusEl) return;
+  for (let i = 0; i < 20; i++) {
+    try {
+      const res = await fetch(`${statusUrl}?wait=30`, { credentials: "include" });
+      if (!res.ok) break;
+      const tx = await res.json();
+      if (tx.status === "mined") {
+        statusEl.textContent = `✅ 블록 #${tx.block_number}에 포함됨 (${tx.confirmations} confirmations)`;
+        return;
+      }
+      if (tx.status === "failed") {
+        statusEl.textContent = "❌ 트랜잭션 실패";
+        statusEl.style.color = "red";
+        return;
+      }
+    } catch (err) {
+      console.error("❌ 트랜잭션 상태 조회 오류:", err);
+      await new Promise((resolve) => setTimeout(resolve, 3000));
+    }
+  }
+  statusEl.textContent = "⚠️ 상태를 확인하지 못했습니다. Etherscan에서 확인해주세요.";
+}
@@ -1,5 +1,7 @@
 let contract = null;
 let userAddress = null;
+let selectedTradeId = null;
+const refreshTimers = {};
 
 // ✅ 로그인 확인 (쿠키 기반)
 async function checkLoginStatus() {
@@ -44,8 +46,35 @@ window.addEventListener("DOMContentLoaded", async () => {
     console.error("🚨 초기화 실패:", err);
     alert("초기 로딩 중 오류 발생");
   }
+
+  // 📡 내 계약이 등록/승인/거절되면 목록과 보고 있는 계약만 다시 불러옴 (폴링 없음)
+  subscribeChainEvents("/api/events", (msg) => {
+    scheduleRefresh("list", loadEligibleVotes);
+    if (selectedTradeId && (msg.trade_id === selectedTradeId || !msg.trade_id)) {
+      scheduleRefresh("detail", () => showVoteSection(selectedTradeId));
+    }
+  });
 });
 
+// 같은 블록의 이벤트 여러 개는 한 번의 갱신으로 묶음
+function scheduleRefresh(key, fn, delay = 500) {
+  clearTimeout(refreshTimers[key]);
+  refreshTimers[key] = setTimeout(fn, delay);
+}
+
+// 📡 SSE 구독 (끊기면 브라우저가 Last-Event-ID 로 재연결해 놓친 이벤트를 받음)
+function subscribeChainEvents(url, onEvent) {
+  const source = new EventSource(url, { withCredentials: true });
+  source.onmessage = (e) => {
+    try {
+      onEvent(JSON.parse(e.data));
+    } catch (err) {
+      console.error("❌ 이벤트 처리 실패:", err);
+    }
+  };
+  return source;
+}
+
 // ✅ 투표 가능한 계약 목록 불러오기
 async function loadEligibleVotes() {
   const container = document.getElementById("voteListSection");
@@ -114,8 +143,8 @@ async function loadEligibleVotes() {
 // ✅ 투표 상세 정보 표시
 async function showVoteSection(tradeId) {
   const voteSection = document.getElementById("voteSection");
-  const selectedTradeId = document.getElementById("selectedTradeId");
-  selectedTradeId.textContent = tradeId;
+  document.getElementById("selectedTradeId").textContent = tradeId;
+  selectedTradeId = tradeId;
 
   try {
     const res = await fetch(`/api/contract?trade_id=${encodeURIComponent(tradeId)}`, {
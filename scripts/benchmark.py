@@ -0,0 +1,353 @@
+"""오프라인 API 벤치마크.
+
+eth-tester(py-evm) 로 만든 프로세스 내부 체인에 artifacts/ 의 ContractRegistry / SecondDAO 를 배포하고,
+trade N 개와 DAO 투표자 M 명을 지정한 비율대로 시드한 뒤 FastAPI 앱을 ASGI 클라이언트(httpx)로
+직접 호출해 엔드포인트별 지연 시간 백분위수, 처리량, 요청당 RPC 호출 수를 출력한다.
+백엔드는 로컬 포트에 띄운 JSON-RPC 서버를 실제 RPC 엔드포인트처럼 사용하므로 네트워크가 필요 없다.
+
+필요 패키지: pip install "eth-tester[py-evm]" httpx
+
+예)
+    python scripts/benchmark.py --trades 200 --voters 7 --requests 100 --concurrency 8
+    python scripts/benchmark.py --mode live --endpoints finalized,dao-pending --json result.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import jwt
+from eth_tester import EthereumTester, PyEVMBackend
+from hexbytes import HexBytes
+from web3 import EthereumTesterProvider, Web3
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARTIFACTS_DIR = os.path.join(ROOT, "artifacts/contracts")
+JWT_SECRET = "benchmark-" + uuid.uuid4().hex + uuid.uuid4().hex  # HS512 권장 길이(64바이트) 이상
+
+ENDPOINTS = ["register", "contract", "vote-list", "finalized", "dao-all", "dao-pending", "dao-completed"]
+
+# 계정 배치: 0 = 서버 서명 계정, 1 / 2 = 당사자 A / B, 3.. = DAO 투표자
+SERVER, PARTY_A, PARTY_B, FIRST_VOTER = 0, 1, 2, 3
+
+
+# ------------------------------------------------------------------ 로컬 체인
+
+
+def _to_json(value):
+    if isinstance(value, (bytes, HexBytes)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return {k: _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, int) and not isinstance(value, bool):
+        return hex(value)
+    return value
+
+
+class LocalChain:
+    """eth-tester 체인 + HTTP JSON-RPC 서버 (단건 / 배치 요청, 호출 수 집계)."""
+
+    def __init__(self, num_voters: int):
+        backend = PyEVMBackend(genesis_state=PyEVMBackend.generate_genesis_state(num_accounts=FIRST_VOTER + num_voters))
+        self.tester = EthereumTester(backend)
+        self.w3 = Web3(EthereumTesterProvider(self.tester))
+        self.keys = backend.account_keys
+        self.accounts = self.w3.eth.accounts
+        self.voters = self.accounts[FIRST_VOTER:FIRST_VOTER + num_voters]
+        self.lock = threading.Lock()  # eth-tester 는 스레드 안전하지 않음
+        self.rpc_calls = 0      # JSON-RPC 요청 수 (배치 안의 요청 포함)
+        self.http_requests = 0  # HTTP 왕복 수
+        self.server = None
+
+        self.registry = self._deploy("ContractRegistry")
+        self.dao = self._deploy("SecondDAO", self.voters)
+
+    def _deploy(self, name: str, *args):
+        with open(os.path.join(ARTIFACTS_DIR, f"{name}.sol/{name}.json"), encoding="utf-8") as f:
+            artifact = json.load(f)
+        factory = self.w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+        tx_hash = factory.constructor(*args).transact({"from": self.accounts[SERVER]})
+        address = self.w3.eth.wait_for_transaction_receipt(tx_hash)["contractAddress"]
+        return self.w3.eth.contract(address=address, abi=artifact["abi"])
+
+    # ---------------------------------------------------------------- JSON-RPC
+
+    def handle(self, request: dict) -> dict:
+        reply = {"jsonrpc": "2.0", "id": request.get("id")}
+        with self.lock:
+            self.rpc_calls += 1
+            try:
+                if request["method"] == "eth_sendRawTransaction":
+                    reply["result"] = self.tester.send_raw_transaction(request["params"][0])
+                    return reply
+                response = self.w3.manager._make_request(request["method"], request.get("params", []))
+            except Exception as e:
+                reply["error"] = {"code": 3 if request["method"] == "eth_call" else -32000, "message": str(e)}
+                return reply
+        if "error" in response:
+            error = response["error"]
+            reply["error"] = error if isinstance(error, dict) else {"code": -32000, "message": str(error)}
+        else:
+            reply["result"] = _to_json(response.get("result"))
+        return reply
+
+    def serve(self) -> str:
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                chain.http_requests += 1
+                reply = [chain.handle(r) for r in body] if isinstance(body, list) else chain.handle(body)
+                data = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, name="benchmark-rpc", daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def counters(self) -> tuple:
+        return self.rpc_calls, self.http_requests
+
+
+def seed(chain: LocalChain, args) -> list:
+    """trade 를 시드하고 [(trade_id, 등록 tx_hash)] 를 반환한다.
+
+    각 trade 는 rejected / finalized / 당사자 A 만 투표 / 미투표 중 하나가 되며, finalized trade 에는
+    투표자마다 dao_turnout 확률로 DAO 투표(찬성 확률 dao_yes)를 넣는다."""
+    rng = random.Random(args.seed)
+    accounts = chain.accounts
+    trades = []
+    counts = {"rejected": 0, "finalized": 0, "half": 0, "unvoted": 0, "dao_votes": 0}
+    tag = uuid.uuid4().hex[:6]
+    for i in range(args.trades):
+        trade_id = f"TRD-BENCH-{tag}-{i:05d}"
+        tx_hash = chain.registry.functions.registerContract(
+            "%064x" % rng.getrandbits(256), f"ASSET-{i}", trade_id, accounts[PARTY_A], accounts[PARTY_B]
+        ).transact({"from": accounts[SERVER]})
+        roll = rng.random()
+        if roll < args.rejected:
+            chain.registry.functions.voteOnContract(trade_id, True).transact({"from": accounts[PARTY_A]})
+            chain.registry.functions.voteOnContract(trade_id, False).transact({"from": accounts[PARTY_B]})
+            counts["rejected"] += 1
+            continue  # 거절된 trade 는 컨트랙트에서 삭제됨
+        trades.append((trade_id, Web3.to_hex(tx_hash)))
+        if roll < args.rejected + args.finalized:
+            chain.registry.functions.voteOnContract(trade_id, True).transact({"from": accounts[PARTY_A]})
+            chain.registry.functions.voteOnContract(trade_id, True).transact({"from": accounts[PARTY_B]})
+            counts["finalized"] += 1
+            for voter in chain.voters:
+                if rng.random() < args.dao_turnout:
+                    try:
+                        chain.dao.functions.vote(trade_id, rng.random() < args.dao_yes).transact({"from": voter})
+                        counts["dao_votes"] += 1
+                    except Exception:
+                        break  # 앞선 투표로 자동 finalize 된 경우
+        elif rng.random() < 0.5:
+            chain.registry.functions.voteOnContract(trade_id, True).transact({"from": accounts[PARTY_A]})
+            counts["half"] += 1
+        else:
+            counts["unvoted"] += 1
+    print("🌱 Seeded:", ", ".join(f"{k}={v}" for k, v in counts.items()))
+    return trades
+
+
+# ------------------------------------------------------------------ 벤치마크
+
+
+def configure_env(rpc_url: str, chain: LocalChain, workdir: str, args):
+    """backend 모듈은 import 시점에 환경 변수를 읽으므로 import 전에 호출해야 한다."""
+    os.environ.update({
+        "SEPOLIA_RPC_URL": rpc_url,
+        "RPC_URLS": rpc_url,
+        "PRIVATE_KEY": chain.keys[SERVER].to_hex(),
+        "CONTRACT_ADDRESS": chain.registry.address,
+        "DAO_CONTRACT_ADDRESS": chain.dao.address,
+        "CHAIN_ID": str(chain.w3.eth.chain_id),
+        "JWT_SECRET_KEY": JWT_SECRET,
+        "INDEX_DB_PATH": os.path.join(workdir, "chain_index.db"),
+        "FILE_REGISTRY_DB_PATH": os.path.join(workdir, "contract_files.db"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "AUTH_CHALLENGE_DB_PATH": os.path.join(workdir, "auth_challenges.db"),
+        "TOKEN_REVOCATION_DB_PATH": os.path.join(workdir, "revoked_tokens.db"),
+        # 측정 중 백그라운드 동기화가 RPC 호출 수에 섞이지 않도록 시작 시 한 번만 동기화
+        "INDEX_MAX_STALENESS": "0" if args.mode == "live" else "86400",
+        "INDEX_POLL_INTERVAL": "86400",
+    })
+    if args.no_view_cache:
+        os.environ["VIEW_CACHE_TTL"] = "0"
+
+
+def token(address: str) -> str:
+    payload = {"sub": address, "exp": int(time.time()) + 3600, "jti": str(uuid.uuid4())}
+    return jwt.encode(payload, JWT_SECRET, algorithm="HS512")
+
+
+def build_requests(name: str, trades: list, accounts: list, admin: str):
+    """name 엔드포인트의 i 번째 요청을 만드는 함수 → (method, url, kwargs)."""
+    party_a, party_b = accounts[PARTY_A], accounts[PARTY_B]
+    # 요청마다 쿠키를 바꿔야 하므로 클라이언트 쿠키 대신 Cookie 헤더로 전달
+    user_headers = {"Cookie": "access_token=" + token(party_a)}
+    admin_headers = {"Cookie": "access_token=" + token(admin)}
+
+    def make(i):
+        if name == "register":
+            pdf = b"%PDF-1.4\n" + os.urandom(2048)
+            files = {"file": (f"bench-{i}.pdf", pdf, "application/pdf")}
+            return "POST", "/api/register", {"files": files, "data": {"asset_id": f"BENCH-{i}", "party_b": party_b}, "headers": user_headers}
+        if name == "contract":
+            trade_id, tx_hash = trades[i % len(trades)]
+            return "GET", "/api/contract", {"params": {"trade_id": trade_id, "tx_hash": tx_hash}, "headers": user_headers}
+        if name == "vote-list":
+            return "GET", "/api/vote-list", {"headers": user_headers}
+        if name == "finalized":
+            return "GET", "/api/finalized-contracts", {"headers": user_headers}
+        return "GET", "/api/admin/dao-votes/" + name[len("dao-"):], {"headers": admin_headers}
+
+    return make
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_endpoint(client: httpx.AsyncClient, chain: LocalChain, name: str, make, args) -> dict:
+    for i in range(args.warmup):
+        method, url, kwargs = make(i)
+        await client.request(method, url, **kwargs)
+
+    latencies, errors = [], 0
+    queue = iter(range(args.requests))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            method, url, kwargs = make(args.warmup + i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    rpc_before, http_before = chain.counters()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    rpc_after, http_after = chain.counters()
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "endpoint": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p90_ms": ms(percentile(latencies, 90)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "rpc_calls_per_request": round((rpc_after - rpc_before) / max(len(latencies), 1), 2),
+        "rpc_http_per_request": round((http_after - http_before) / max(len(latencies), 1), 2),
+    }
+
+
+async def run_benchmark(chain: LocalChain, trades: list, args) -> list:
+    from backend.main import app
+    from backend.auth import ADMIN_ADDRESSES
+    from backend.indexer import chain_index
+
+    admin = sorted(ADMIN_ADDRESSES)[0]
+    results = []
+    async with app.router.lifespan_context(app):
+        # 시작 시 인덱서 스레드의 첫 동기화가 끝난 뒤 측정 (live 모드에서도 RPC 집계에 섞이지 않도록)
+        while not chain_index.last_synced_at:
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in args.endpoints:
+                make = build_requests(name, trades, chain.accounts, admin)
+                results.append(await run_endpoint(client, chain, name, make, args))
+                print_row(results[-1])
+    return results
+
+
+COLUMNS = [("endpoint", 14), ("requests", 8), ("errors", 6), ("p50_ms", 9), ("p90_ms", 9), ("p99_ms", 9),
+           ("max_ms", 9), ("throughput_rps", 14), ("rpc_calls_per_request", 21), ("rpc_http_per_request", 20)]
+
+
+def print_row(row: dict):
+    print("  ".join(str(row[key]).rjust(width) for key, width in COLUMNS))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 API 벤치마크 (eth-tester + ASGI)")
+    parser.add_argument("--trades", type=int, default=50, help="시드할 trade 수")
+    parser.add_argument("--voters", type=int, default=5, help="DAO 투표자 수")
+    parser.add_argument("--rejected", type=float, default=0.1, help="당사자 B 가 거절하는 trade 비율")
+    parser.add_argument("--finalized", type=float, default=0.6, help="양측이 승인해 DAO 투표로 넘어가는 trade 비율")
+    parser.add_argument("--dao-turnout", type=float, default=0.5, help="finalized trade 에 투표하는 투표자 비율")
+    parser.add_argument("--dao-yes", type=float, default=0.7, help="DAO 투표 중 찬성 비율")
+    parser.add_argument("--requests", type=int, default=50, help="엔드포인트당 측정 요청 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 보내는 요청 수")
+    parser.add_argument("--warmup", type=int, default=2, help="측정 전에 보내는 요청 수")
+    parser.add_argument("--mode", choices=["index", "live"], default="index",
+                        help="index: 이벤트 인덱스로 응답, live: 매 요청 체인 직접 조회")
+    parser.add_argument("--no-view-cache", action="store_true", help="조회 결과 캐시 끄기")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="쉼표로 구분 (" + ", ".join(ENDPOINTS) + ")")
+    parser.add_argument("--seed", type=int, default=1, help="시드 데이터 난수 seed")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+    args.endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"알 수 없는 엔드포인트: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    chain = LocalChain(args.voters)
+    trades = seed(chain, args)
+    print(f"⛓️  Local chain ready: {len(trades)} live trades, {args.voters} voters, "
+          f"block {chain.w3.eth.block_number} ({time.perf_counter() - started:.1f}s)")
+    if not trades and ({"contract"} & set(args.endpoints)):
+        sys.exit("❌ contract 벤치마크에는 거절되지 않은 trade 가 필요합니다.")
+
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as workdir:
+        configure_env(chain.serve(), chain, workdir, args)
+        sys.path.insert(0, ROOT)
+        print(f"🏁 mode={args.mode} requests={args.requests} concurrency={args.concurrency}"
+              f"{' view-cache=off' if args.no_view_cache else ''}")
+        print("  ".join(key.rjust(width) for key, width in COLUMNS))
+        results = asyncio.run(run_benchmark(chain, trades, args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"}, "results": results}, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+# `pytest` 로 바로 실행해도 backend 패키지를 import 할 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# 모듈이 import 될 때 여는 SQLite 파일이 작업 트리에 생기지 않도록
+_workdir = tempfile.mkdtemp(prefix="backend-tests-")
+for name, filename in (
+    ("AUTH_CHALLENGE_DB_PATH", "auth_challenges.db"),
+    ("TOKEN_REVOCATION_DB_PATH", "revoked_tokens.db"),
+    ("FILE_REGISTRY_DB_PATH", "contract_files.db"),
+    ("UPLOAD_DIR", "uploads"),
+    ("INDEX_DB_PATH", "chain_index.db"),
+):
+    os.environ.setdefault(name, os.path.join(_workdir, filename))
+
+# backend.contract 는 import 할 때 설정만 읽고 노드에 연결하지 않는다 (테스트는 가짜 w3 를 넣어 쓴다)
+os.environ.setdefault("SEPOLIA_RPC_URL", "http://127.0.0.1:9")
+os.environ.setdefault("PRIVATE_KEY", "0x" + "11" * 32)
+os.environ.setdefault("CONTRACT_ADDRESS", "0x" + "22" * 20)
+os.environ.setdefault("DAO_CONTRACT_ADDRESS", "0x" + "33" * 20)
+os.environ.setdefault("INDEX_START_BLOCK", "0")
+os.environ.setdefault("JWT_SECRET_KEY", "test-" + "k" * 64)
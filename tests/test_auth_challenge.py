@@ -0,0 +1,73 @@
+import time
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.auth import router
+from backend.challenge_store import ChallengeStore
+
+
+def make_store(tmp_path, ttl=300):
+    return ChallengeStore(str(tmp_path / "challenges.db"), ttl=ttl)
+
+
+def test_get_does_not_delete(tmp_path):
+    store = make_store(tmp_path)
+    nonce = store.issue("0xABC")
+    assert store.get("0xabc") == nonce
+    assert store.get("0xabc") == nonce
+
+
+def test_consume_is_one_shot_and_checks_nonce(tmp_path):
+    store = make_store(tmp_path)
+    nonce = store.issue("0xabc")
+    assert not store.consume("0xabc", "wrong")
+    assert store.consume("0xabc", nonce)
+    assert not store.consume("0xabc", nonce)
+    assert store.get("0xabc") is None
+
+
+def test_reissue_invalidates_previous_nonce(tmp_path):
+    store = make_store(tmp_path)
+    old = store.issue("0xabc")
+    new = store.issue("0xabc")
+    assert not store.consume("0xabc", old)
+    assert store.consume("0xabc", new)
+
+
+def test_expired_nonce_is_not_returned(tmp_path):
+    store = make_store(tmp_path, ttl=0.05)
+    nonce = store.issue("0xabc")
+    time.sleep(0.1)
+    assert store.get("0xabc") is None
+    assert not store.consume("0xabc", nonce)
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(router, prefix="/auth")
+    return TestClient(app)
+
+
+def _sign(account, nonce):
+    return account.sign_message(encode_defunct(text=f"Sign this message: {nonce}")).signature.hex()
+
+
+def test_bad_signature_does_not_burn_victims_challenge():
+    victim, attacker = Account.create(), Account.create()
+    client = _client()
+    nonce = client.get("/auth/nonce", params={"address": victim.address}).json()["nonce"]
+
+    for signature in ("0x1234", _sign(attacker, nonce)):
+        r = client.post("/auth/verify", json={"address": victim.address, "signature": signature})
+        assert r.status_code == 400
+
+    r = client.post("/auth/verify", json={"address": victim.address, "signature": _sign(victim, nonce)})
+    assert r.status_code == 200
+    assert "access_token" in r.cookies
+
+    # 성공한 nonce 는 다시 쓸 수 없다
+    r = client.post("/auth/verify", json={"address": victim.address, "signature": _sign(victim, nonce)})
+    assert r.status_code == 400
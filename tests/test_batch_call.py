@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from web3 import Web3
+
+from backend import contract as chain
+from backend.chain_cache import ViewCallCache
+
+PARTY_A = Web3.to_checksum_address("0x" + "aa" * 20)
+PARTY_B = Web3.to_checksum_address("0x" + "bb" * 20)
+
+
+class FakeBatchNode:
+    """eth_call 배치 요청을 받아 calldata 별로 정해 둔 결과를 돌려주는 노드.
+
+    응답은 id 역순으로 섞어서 돌려주고, reverts 에 있는 calldata 는 항목 단위 error 로 답한다."""
+
+    def __init__(self):
+        self.results = {}   # calldata → 인코딩된 반환값 (hex)
+        self.reverts = set()
+        self.requests = []  # 받은 배치 요청마다 항목 수
+
+    def returns(self, fn, *values):
+        types = [output["type"] for output in fn.abi["outputs"]]
+        self.results[fn._encode_transaction_data()] = "0x" + chain.w3.codec.encode(types, list(values)).hex()
+
+    def reverting(self, fn):
+        self.reverts.add(fn._encode_transaction_data())
+
+    def post(self, body: bytes, pinned: bool = False):
+        payload = json.loads(body)
+        self.requests.append(len(payload))
+        replies = []
+        for item in payload:
+            data = item["params"][0]["data"]
+            if data in self.reverts:
+                replies.append({"jsonrpc": "2.0", "id": item["id"], "error": {"code": 3, "message": "execution reverted"}})
+            else:
+                replies.append({"jsonrpc": "2.0", "id": item["id"], "result": self.results[data]})
+        return list(reversed(replies))
+
+
+@pytest.fixture
+def node(monkeypatch):
+    node = FakeBatchNode()
+    monkeypatch.setattr(chain.rpc_pool, "post", node.post)
+    cache = ViewCallCache()
+    cache.observe_block(1)
+    monkeypatch.setattr(chain, "view_cache", cache)
+    monkeypatch.setattr(chain, "current_head", lambda: 1)
+    return node
+
+
+def test_batch_call_restores_request_order_from_reply_ids(node):
+    calls = [chain.contract.functions.getVoters(f"TRD-{i}") for i in range(5)]
+    for i, fn in enumerate(calls):
+        node.returns(fn, PARTY_A, Web3.to_checksum_address(f"0x{i:040x}"))
+
+    results = chain.batch_call(calls)
+
+    assert [voters[1] for voters in results] == [Web3.to_checksum_address(f"0x{i:040x}") for i in range(5)]
+    assert node.requests == [5]
+
+
+def test_batch_call_maps_item_errors_to_none(node):
+    calls = [chain.contract.functions.getVoteStatus(f"TRD-{i}") for i in range(3)]
+    node.returns(calls[0], True, False, True, False, False)
+    node.reverting(calls[1])
+    node.returns(calls[2], True, True, True, True, True)
+
+    assert chain.batch_call(calls) == [
+        [True, False, True, False, False],
+        None,
+        [True, True, True, True, True],
+    ]
+
+
+def test_batch_call_splits_chunks_and_serves_repeats_from_cache(node):
+    calls = [chain.contract.functions.getVoters(f"TRD-{i}") for i in range(5)]
+    for fn in calls:
+        node.returns(fn, PARTY_A, PARTY_B)
+
+    chain.batch_call(calls, chunk_size=2)
+    assert node.requests == [2, 2, 1]
+
+    # 성공한 결과는 캐시에서, 실패(None)는 캐시하지 않는다
+    node.reverting(calls[4])
+    chain.view_cache.entries.pop(chain._call_key(calls[4]), None)
+    assert chain.batch_call(calls)[4] is None
+    assert node.requests == [2, 2, 1, 1]
+
+
+def test_fetch_trade_views_groups_results_per_trade(node):
+    trade_ids = ["TRD-1", "TRD-2"]
+    for i, trade_id in enumerate(trade_ids):
+        node.returns(chain.contract.functions.getVoters(trade_id), PARTY_A, PARTY_B)
+        node.returns(chain.dao_contract.functions.getVoteResult(trade_id), i, 0, False, False)
+    node.reverting(chain.dao_contract.functions.getVoteResult("TRD-2"))
+
+    views = chain.fetch_trade_views(trade_ids, ["getVoters", "getVoteResult"])
+
+    assert views == {
+        "TRD-1": {"getVoters": [PARTY_A, PARTY_B], "getVoteResult": [0, 0, False, False]},
+        "TRD-2": {"getVoters": [PARTY_A, PARTY_B], "getVoteResult": None},
+    }
+    assert node.requests == [4]
@@ -0,0 +1,58 @@
+import hashlib
+import io
+
+import pytest
+
+from backend.blobstore import BlobStore
+from backend.utils import InvalidPdfError, UploadTooLargeError
+
+BODY = b"%PDF-1.4\n" + b"x" * 5000 + b"\n%%EOF"
+
+
+class CountingReader(io.BytesIO):
+    """read 로 넘겨준 총 바이트 수를 센다 (업로드를 한 번만 읽는지 확인용)."""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_spool_hashes_and_writes_in_one_pass(tmp_path):
+    store = BlobStore(str(tmp_path))
+    src = CountingReader(BODY)
+    sha256, size, tmp = store.spool(src, max_size=len(BODY), chunk_size=1024)
+
+    assert sha256 == hashlib.sha256(BODY).hexdigest()
+    assert size == len(BODY)
+    assert src.bytes_read == len(BODY)
+    assert store.commit(tmp, sha256)
+    with open(store.path_for(sha256), "rb") as f:
+        assert f.read() == BODY
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_commit_of_existing_blob_drops_the_temp_file(tmp_path):
+    store = BlobStore(str(tmp_path))
+    sha256, _, first = store.spool(io.BytesIO(BODY), max_size=len(BODY))
+    assert store.commit(first, sha256)
+
+    _, _, second = store.spool(io.BytesIO(BODY), max_size=len(BODY))
+    assert not store.commit(second, sha256)
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+@pytest.mark.parametrize("body, max_size, error", [
+    (b"not a pdf", 1024, InvalidPdfError),
+    (b"", 1024, InvalidPdfError),
+    (BODY, 100, UploadTooLargeError),
+])
+def test_rejected_upload_leaves_no_temp_file(tmp_path, body, max_size, error):
+    store = BlobStore(str(tmp_path))
+    with pytest.raises(error):
+        store.spool(io.BytesIO(body), max_size=max_size, chunk_size=64)
+    assert list((tmp_path / "tmp").iterdir()) == []
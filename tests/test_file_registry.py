@@ -0,0 +1,72 @@
+import hashlib
+import os
+
+from backend.blobstore import BlobStore
+from backend.file_registry import ContractFileRegistry
+
+
+def make_registry(tmp_path):
+    return ContractFileRegistry(str(tmp_path / "files.db"), BlobStore(str(tmp_path / "uploads")))
+
+
+def store_blob(registry, body=b"%PDF-1.4\n...%%EOF"):
+    sha256 = hashlib.sha256(body).hexdigest()
+    path = registry.blobs.path_for(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(body)
+    return sha256, len(body)
+
+
+def test_view_info_is_served_from_cache(tmp_path):
+    registry = make_registry(tmp_path)
+    sha256, size = store_blob(registry)
+    registry.add("TRD-1", sha256)
+
+    first = registry.view_info("TRD-1")
+    assert first["sha256"] == sha256
+    assert first["stat"].st_size == size
+    assert registry.view_info("TRD-1") is first
+    assert registry.meta_cache.hits == 1
+    assert registry.meta_cache.misses == 1
+
+
+def test_private_flag_invalidates_cache(tmp_path):
+    registry = make_registry(tmp_path)
+    sha256, _ = store_blob(registry)
+    registry.add("TRD-1", sha256)
+    assert not registry.view_info("TRD-1")["private"]
+
+    registry.set_private("TRD-1")
+    assert registry.view_info("TRD-1")["private"]
+
+
+def test_remove_invalidates_cache(tmp_path):
+    registry = make_registry(tmp_path)
+    sha256, _ = store_blob(registry)
+    registry.add("TRD-1", sha256)
+    registry.view_info("TRD-1")
+
+    registry.remove("TRD-1")
+    assert registry.view_info("TRD-1") is None
+
+
+def test_missing_blob_is_not_cached(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.add("TRD-1", "ab" * 32)
+    assert registry.view_info("TRD-1")["stat"] is None
+    assert len(registry.meta_cache.entries) == 0
+
+
+def test_blob_removed_by_another_worker_is_not_served_from_cache(tmp_path):
+    registry = make_registry(tmp_path)
+    sha256, _ = store_blob(registry)
+    registry.add("TRD-1", sha256)
+    assert registry.view_info("TRD-1")["stat"] is not None
+
+    # 다른 워커의 만료 정리: DB 행과 파일은 지워졌지만 이 워커의 캐시는 그대로
+    os.remove(registry.blobs.path_for(sha256))
+    with registry.lock, registry.db:
+        registry.db.execute("DELETE FROM contract_files WHERE trade_id = ?", ("TRD-1",))
+    assert registry.view_info("TRD-1") is None
+    assert len(registry.meta_cache.entries) == 0
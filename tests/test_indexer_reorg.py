@@ -0,0 +1,166 @@
+import os
+
+import pytest
+from web3 import Web3
+
+from backend import indexer
+from backend.indexer import ChainIndex
+
+PARTY_A = "0x" + "aa" * 20
+PARTY_B = "0x" + "bb" * 20
+VOTER = "0x" + "cc" * 20
+
+
+class FakeChain:
+    """블록 해시와 블록별 이벤트만 가진 체인. reorg 는 fork 이후 블록을 새 해시로 바꾼다."""
+
+    def __init__(self, head: int):
+        self.hashes = {n: os.urandom(32) for n in range(head + 1)}
+        self.events = {}  # 블록 → 이벤트 목록
+
+    @property
+    def head(self) -> int:
+        return max(self.hashes)
+
+    def add(self, block: int, name: str, trade_id: str, **payload):
+        event = {
+            "block_number": block,
+            "log_index": len(self.events.get(block, [])),
+            "block_hash": "0x" + self.hashes[block].hex(),
+            "tx_hash": "0x" + os.urandom(32).hex(),
+            "event": name,
+            "trade_id": trade_id,
+            "payload": payload,
+        }
+        self.events.setdefault(block, []).append(event)
+
+    def register(self, block: int, trade_id: str, resolved: bool = True):
+        self.add(block, "ContractRegistered", trade_id, contractHash="ab" * 32, assetId="A", registrant=PARTY_A,
+                 partyA=PARTY_A, partyB=PARTY_B, timestamp=1_700_000_000 + block)
+        if not resolved:
+            # 트랜잭션 입력으로도 getAllTradeIds 로도 tradeId 를 찾지 못한 등록: topic 해시만 남는다
+            event = self.events[block][-1]
+            event["topic"] = Web3.to_hex(Web3.keccak(text=trade_id))
+            event["trade_id"] = None
+
+    def reorg(self, fork_block: int, new_head: int):
+        for n in list(self.hashes):
+            if n > fork_block:
+                del self.hashes[n]
+                self.events.pop(n, None)
+        for n in range(fork_block + 1, new_head + 1):
+            self.hashes[n] = os.urandom(32)
+
+    # ---------------------------------------------------------------- w3.eth 흉내
+
+    @property
+    def block_number(self) -> int:
+        return self.head
+
+    def get_block(self, n):
+        return {"hash": self.hashes[n]}
+
+    def get_logs(self, params):
+        return [e for n in range(params["fromBlock"], params["toBlock"] + 1) for e in self.events.get(n, [])]
+
+
+@pytest.fixture
+def chain(tmp_path, monkeypatch):
+    chain = FakeChain(head=10)
+    monkeypatch.setattr(indexer, "w3", type("W3", (), {"eth": chain})())
+    monkeypatch.setattr(indexer, "INDEX_REORG_DEPTH", 2)
+    return chain
+
+
+@pytest.fixture
+def index(tmp_path, chain, monkeypatch):
+    index = ChainIndex(str(tmp_path / "index.db"))
+    # 로그 디코딩 / 트랜잭션 입력 조회 없이 FakeChain 의 이벤트를 그대로 적용
+    monkeypatch.setattr(index, "_decode_logs", lambda logs: [dict(e, payload=dict(e["payload"])) for e in logs])
+    monkeypatch.setattr(index, "_add_block_timestamps", lambda events: None)
+    return index
+
+
+def trade_ids(index):
+    return [t["trade_id"] for t in index.get_trades()]
+
+
+def test_reorg_rolls_back_orphaned_events(chain, index):
+    published = []
+    index.on_events = published.extend
+    chain.register(3, "TRD-1")
+    chain.register(8, "TRD-2")
+    chain.add(9, "Voted", "TRD-1", voter=VOTER, approved=True)
+    index.sync_once()
+    assert trade_ids(index) == ["TRD-1", "TRD-2"]
+    assert index.has_votes("TRD-1")
+
+    # 블록 7 이후가 바뀌고 TRD-2 / 투표 대신 TRD-3 이 포함됨
+    chain.reorg(fork_block=7, new_head=11)
+    chain.register(9, "TRD-3")
+    index.sync_once()
+
+    assert trade_ids(index) == ["TRD-1", "TRD-3"]
+    assert not index.has_votes("TRD-1")
+    assert index.get_stats(1, 1)["trades"]["registered"] == 2
+    assert {"event": "reorg", "block_number": 7} in published
+    assert index._get_meta("checkpoint_hash") == "0x" + chain.hashes[11].hex()
+
+
+def test_reorg_deeper_than_depth_follows_stored_block_hashes(chain, index):
+    chain.register(2, "TRD-1")
+    chain.register(5, "TRD-2")
+    chain.register(9, "TRD-3")
+    index.sync_once()
+
+    # INDEX_REORG_DEPTH(2) 보다 깊은 reorg: 저장된 이벤트의 블록 해시로 분기점을 더 찾아 내려간다
+    chain.reorg(fork_block=4, new_head=10)
+    chain.register(6, "TRD-4")
+    index.sync_once()
+
+    assert trade_ids(index) == ["TRD-1", "TRD-4"]
+
+
+def test_no_reorg_keeps_checkpoint(chain, index):
+    chain.register(3, "TRD-1")
+    index.sync_once()
+    chain.hashes[11] = os.urandom(32)
+    chain.register(11, "TRD-2")
+    index.sync_once()
+    assert trade_ids(index) == ["TRD-1", "TRD-2"]
+    assert index.get_stats(1, 1)["trades"]["registered"] == 2
+
+
+def test_unresolved_registration_is_kept_and_resolved_by_a_later_event(chain, index, monkeypatch):
+    # 재시도 때도 트랜잭션 응답은 없고, 거절된 trade 는 getAllTradeIds 에서도 빠져 있다
+    monkeypatch.setattr(indexer, "batch_rpc", lambda method, params: [None] * len(params))
+    monkeypatch.setattr(indexer, "batch_call", lambda calls: [None] * len(calls))
+    monkeypatch.setattr(indexer.contract.functions, "getAllTradeIds", lambda: type("Call", (), {"call": lambda self: []})())
+    chain.register(3, "TRD-1")
+    chain.register(4, "TRD-2", resolved=False)
+    index.sync_once()
+    assert trade_ids(index) == ["TRD-1"]
+    assert index._get_meta("checkpoint_block") == "10"
+
+    # 이후 구간의 ContractRejected 가 평문 tradeId 를 알려 주면 보관해 둔 등록을 복원하고 상태를 다시 만든다
+    chain.hashes[11] = os.urandom(32)
+    chain.add(11, "ContractRejected", "TRD-2")
+    index.sync_once()
+    with index.lock:
+        assert index.db.execute("SELECT COUNT(*) FROM unresolved_registrations").fetchone()[0] == 0
+        row = index.db.execute("SELECT status, block_number FROM trades WHERE trade_id = 'TRD-2'").fetchone()
+    assert (row["status"], row["block_number"]) == ("rejected", 4)
+    assert trade_ids(index) == ["TRD-1"]
+
+
+def test_reorg_drops_orphaned_unresolved_registrations(chain, index, monkeypatch):
+    monkeypatch.setattr(indexer, "batch_rpc", lambda method, params: [None] * len(params))
+    monkeypatch.setattr(indexer, "batch_call", lambda calls: [None] * len(calls))
+    monkeypatch.setattr(indexer.contract.functions, "getAllTradeIds", lambda: type("Call", (), {"call": lambda self: []})())
+    chain.register(9, "TRD-1", resolved=False)
+    index.sync_once()
+
+    chain.reorg(fork_block=7, new_head=11)
+    index.sync_once()
+    with index.lock:
+        assert index.db.execute("SELECT COUNT(*) FROM unresolved_registrations").fetchone()[0] == 0
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from backend import rpc_pool as pool_module
+from backend.rpc_pool import RpcEndpointError, RpcPool
+
+RATE_LIMITED = {"code": -32005, "message": "limit exceeded"}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def answer(endpoint, reply):
+    endpoint.session.post = lambda *args, **kwargs: FakeResponse(reply)
+
+
+def batch_reply(*errors):
+    return [
+        {"jsonrpc": "2.0", "id": i, "error": error} if error else {"jsonrpc": "2.0", "id": i, "result": "0x1"}
+        for i, error in enumerate(errors)
+    ]
+
+
+@pytest.mark.parametrize("reply", [
+    {"jsonrpc": "2.0", "id": 0, "error": RATE_LIMITED},
+    batch_reply(None, RATE_LIMITED, None),
+])
+def test_rate_limited_reply_is_an_endpoint_failure(reply):
+    with pytest.raises(RpcEndpointError):
+        RpcPool._check_reply(reply)
+
+
+def test_batch_item_errors_that_are_not_retryable_are_returned():
+    reply = batch_reply(None, {"code": 3, "message": "execution reverted"})
+    assert RpcPool._check_reply(reply) is reply
+
+
+def test_rate_limited_batch_item_fails_over_and_cools_down(monkeypatch):
+    monkeypatch.setattr(pool_module, "RPC_RETRY_BACKOFF", 0)
+    pool = RpcPool(["http://a.example/key", "http://b.example/key"])
+    limited, healthy = pool.endpoints
+    answer(limited, batch_reply(None, RATE_LIMITED))
+    answer(healthy, batch_reply(None, None))
+    monkeypatch.setattr(pool, "_pick_read", lambda exclude=(): next(e for e in pool.endpoints if e not in exclude))
+
+    reply = pool.post(json.dumps([{"id": 0}, {"id": 1}]).encode())
+
+    assert reply == batch_reply(None, None)
+    assert limited.errors == 1 and not limited.healthy(pool_module.time.time())
+    assert healthy.errors == 0
@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+from web3.exceptions import ContractLogicError
+
+from backend.transactions import TxSubmitter
+
+
+class FakeEth:
+    def __init__(self):
+        self.pending_count = 0   # 노드가 알고 있는 pending nonce
+        self.sent = []           # 전송된 nonce
+        self.failures = []       # 다음 전송들에서 낼 예외 (None 이면 정상 전송)
+        self.count_reads = 0
+        self.account = self
+
+    async def get_transaction_count(self, address, block):
+        self.count_reads += 1
+        return self.pending_count
+
+    def sign_transaction(self, tx, key):
+        return type("Signed", (), {"rawTransaction": tx})()
+
+    async def send_raw_transaction(self, tx):
+        await asyncio.sleep(0)
+        error = self.failures.pop(0) if self.failures else None
+        if isinstance(error, asyncio.TimeoutError):
+            # 노드는 받았지만 응답이 늦은 경우
+            self.pending_count = tx["nonce"] + 1
+            raise error
+        if error is not None:
+            raise error
+        self.sent.append(tx["nonce"])
+        self.pending_count = tx["nonce"] + 1
+        return tx["nonce"].to_bytes(32, "big")
+
+
+class FakeW3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+    @staticmethod
+    def to_hex(value):
+        return "0x" + value.hex()
+
+
+class FakeFees:
+    current = None
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def fees(self):
+        return {"gasPrice": 1}
+
+    def stats(self):
+        return {}
+
+
+class FakeFunction:
+    address = "0xcontract"
+    fn_name = "finalizeVote"
+    args = ("TRD-1",)
+
+    def __init__(self, reverts=False):
+        self.reverts = reverts
+        self.estimates = 0
+
+    async def estimate_gas(self, tx):
+        self.estimates += 1
+        if self.reverts:
+            raise ContractLogicError("execution reverted: Already finalized")
+        return 50000
+
+    async def build_transaction(self, tx):
+        return dict(tx)
+
+
+def make_submitter():
+    w3 = FakeW3()
+    return w3, TxSubmitter(w3, "0xabc", "key", 1, fee_oracle=FakeFees())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_get_sequential_nonces():
+    async def scenario():
+        w3, submitter = make_submitter()
+        hashes = await asyncio.gather(*(submitter.submit(FakeFunction(), gas=21000) for _ in range(5)))
+        await submitter.stop()
+        return w3, hashes
+
+    w3, hashes = run(scenario())
+    assert w3.eth.sent == [0, 1, 2, 3, 4]
+    assert len(set(hashes)) == 5
+    assert w3.eth.count_reads == 1
+
+
+def test_cancelled_caller_with_failing_send_does_not_kill_writer():
+    async def scenario():
+        w3, submitter = make_submitter()
+        w3.eth.failures = [ValueError("insufficient funds")]
+        first = asyncio.create_task(submitter.submit(FakeFunction(), gas=21000))
+        await asyncio.sleep(0)
+        first.cancel()  # 전송이 실패하는 동안 호출한 쪽이 취소됨
+        second = await asyncio.wait_for(submitter.submit(FakeFunction(), gas=21000), 1)
+        writer_alive = not submitter._tasks[0].done()
+        await submitter.stop()
+        return w3, second, writer_alive, submitter.failed
+
+    w3, second, writer_alive, failed = run(scenario())
+    assert writer_alive
+    assert failed == 1
+    assert w3.eth.sent == [0]
+    assert second == "0x" + (0).to_bytes(32, "big").hex()
+
+
+def test_rejected_send_reuses_nonce():
+    async def scenario():
+        w3, submitter = make_submitter()
+        w3.eth.failures = [ValueError("insufficient funds")]
+        try:
+            await submitter.submit(FakeFunction(), gas=21000)
+        except ValueError:
+            pass
+        await submitter.submit(FakeFunction(), gas=21000)
+        await submitter.stop()
+        return w3
+
+    w3 = run(scenario())
+    assert w3.eth.sent == [0]
+    assert w3.eth.count_reads == 1
+
+
+def test_ambiguous_send_failure_resyncs_nonce():
+    async def scenario():
+        w3, submitter = make_submitter()
+        w3.eth.failures = [asyncio.TimeoutError()]
+        try:
+            await submitter.submit(FakeFunction(), gas=21000)
+        except asyncio.TimeoutError:
+            pass
+        await submitter.submit(FakeFunction(), gas=21000)
+        await submitter.stop()
+        return w3
+
+    w3 = run(scenario())
+    # 타임아웃된 트랜잭션이 nonce 0 을 썼으므로 다음 전송은 1
+    assert w3.eth.sent == [1]
+    assert w3.eth.count_reads == 2
+
+
+def test_nonce_error_rereads_and_retries_once():
+    async def scenario():
+        w3, submitter = make_submitter()
+        await submitter.submit(FakeFunction(), gas=21000)
+        w3.eth.pending_count = 5  # 같은 계정으로 외부에서 보낸 트랜잭션
+        w3.eth.failures = [ValueError("nonce too low")]
+        await submitter.submit(FakeFunction(), gas=21000)
+        await submitter.stop()
+        return w3
+
+    w3 = run(scenario())
+    assert w3.eth.sent == [0, 5]
+
+
+def test_simulate_skips_cached_estimate_and_catches_revert():
+    async def scenario():
+        w3, submitter = make_submitter()
+        await submitter.submit(FakeFunction())  # 캐시에 추정치가 들어감
+        await submitter.submit(FakeFunction(reverts=True))  # 캐시 적중: revert 를 모르고 전송
+        reverting = FakeFunction(reverts=True)
+        with pytest.raises(ContractLogicError):
+            await submitter.submit(reverting, simulate=True)
+        await submitter.stop()
+        return w3, reverting
+
+    w3, reverting = run(scenario())
+    assert w3.eth.sent == [0, 1]
+    assert reverting.estimates == 1
@@ -0,0 +1,30 @@
+from backend.vote_matrix import VoteMatrix
+
+A, B, C = "0xAAA", "0xBBB", "0xCCC"
+
+
+def test_classify_keeps_caller_order_and_case():
+    matrix = VoteMatrix([A, B, C])
+    matrix.record("T1", A.lower(), True)
+    matrix.record("T1", C, False)
+    assert matrix.classify("T1", [C, B, A]) == ([A], [C], [B])
+    assert matrix.classify("T2", [A]) == ([], [], [A])
+    assert matrix.has_votes("T1") and not matrix.has_votes("T2")
+
+
+def test_votes_recorded_before_voter_list_are_remapped():
+    matrix = VoteMatrix()
+    matrix.record("T1", C, True)   # 목록을 받기 전이라 C 가 0번 비트
+    matrix.record("T1", A, False)
+    matrix.sync_voters([A, B, C])
+    assert matrix.voters == ["0xaaa", "0xbbb", "0xccc"]
+    assert matrix.classify("T1", [A, B, C]) == ([C], [A], [B])
+
+
+def test_subset_is_independent_copy():
+    matrix = VoteMatrix([A, B])
+    matrix.record("T1", A, True)
+    copy = matrix.subset(["T1", "T2"])
+    matrix.record("T1", B, True)
+    assert copy.classify("T1", [A, B]) == ([A], [], [B])
+    assert copy.voted["T2"] == 0